@@ -0,0 +1,175 @@
+"""
+Background saving (worker thread + atomic file writes)
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import map_journal
+
+if TYPE_CHECKING:
+    from map_data import GameMap
+
+
+def atomic_write_json(filepath: str, data: Any, indent: Optional[int] = None):
+    """Write JSON to a temp file next to the target, then rename over it.
+    
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    tmp_path = os.path.join(directory, f".{os.path.basename(filepath)}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+class SaveEvent:
+    """Progress/completion message posted by the worker"""
+    def __init__(self, message: str, color: Tuple[int, int, int] = (100, 255, 100)):
+        self.message = message
+        self.color = color
+
+
+class BackgroundSaver:
+    """Runs save jobs on a single worker thread
+    
+    Jobs receive snapshots taken on the main thread, so the worker never
+    touches live editor state. Messages are queued and handed to the
+    DebugLogger from the main thread in poll() (pygame is not thread-safe).
+    """
+    def __init__(self):
+        self._jobs: "queue.Queue[Optional[Tuple[str, Callable[[], None]]]]" = queue.Queue()
+        self._events: "queue.Queue[SaveEvent]" = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._autosave_map_id: Optional[int] = None
+        self._thread = threading.Thread(target=self._run, name="BackgroundSaver", daemon=True)
+        self._thread.start()
+    
+    @property
+    def busy(self) -> bool:
+        """True while any job is queued or running"""
+        with self._lock:
+            return self._pending > 0
+    
+    def _submit(self, label: str, job: Callable[[], None]):
+        with self._lock:
+            self._pending += 1
+        self._jobs.put((label, job))
+    
+    def _post(self, message: str, color: Tuple[int, int, int] = (100, 255, 100)):
+        self._events.put(SaveEvent(message, color))
+    
+    def _run(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            label, job = item
+            try:
+                job()
+            except Exception as e:
+                self._post(f"{label} failed: {e}", (255, 100, 100))
+            finally:
+                with self._lock:
+                    self._pending -= 1
+    
+    def save_map(self, snapshot: 'GameMap', filepath: str, journal_file: Optional[str] = None):
+        """Serialize and write a map snapshot
+        
+        With journal_file, the journal is emptied once the base file is
+        written (compaction): every record in it is now part of the base.
+        """
+        def job():
+            start = time.perf_counter()
+            snapshot.save_to_file(filepath)
+            if journal_file:
+                map_journal.reset(journal_file)
+            elapsed = (time.perf_counter() - start) * 1000
+            self._post(f"Map saved successfully ({elapsed:.0f} ms)")
+        self._submit("Map save", job)
+    
+    def append_journal(self, journal_file: str, ops: List['map_journal.TileOp'],
+                       commit: bool = False):
+        """Append edits to the journal (commit=True marks them as saved)"""
+        def job():
+            map_journal.append_ops(journal_file, ops, commit)
+            if commit:
+                self._post("Map saved (journal)")
+        self._submit("Journal write", job)
+    
+    def save_sprites(self, sprite_data: Dict[str, Any], filepath: str):
+        """Write already-copied sprite data"""
+        def job():
+            atomic_write_json(filepath, sprite_data, indent=2)
+            self._post("Sprites saved")
+        self._submit("Sprite save", job)
+    
+    def autosave(self, snapshot: 'GameMap', dirty_chunks: Set[Tuple[int, int]],
+                 dirpath: str, map_id: int, source: Optional[str] = None):
+        """Write only the chunks changed since the last autosave
+        
+        map_id identifies the live map; when it changes (map loaded or
+        replaced), the folder is cleared so no stale chunks survive.
+        meta.json records map_id and source (the file the map was loaded
+        from or saved to, None for a new map) so recovery can tell which
+        map the autosave belongs to.
+        """
+        full_rewrite = map_id != self._autosave_map_id
+        self._autosave_map_id = map_id
+        if full_rewrite:
+            dirty_chunks = set(dirty_chunks) | set(snapshot.chunks.keys())
+        
+        def job():
+            os.makedirs(dirpath, exist_ok=True)
+            if full_rewrite:
+                for name in os.listdir(dirpath):
+                    if name.startswith("chunk_"):
+                        os.remove(os.path.join(dirpath, name))
+            keys: List[Tuple[int, int]] = sorted(dirty_chunks)
+            for index, (cx, cy) in enumerate(keys, 1):
+                path = os.path.join(dirpath, f"chunk_{cx}_{cy}.json")
+                tiles = snapshot.chunk_to_list((cx, cy))
+                if tiles:
+                    atomic_write_json(path, tiles)
+                elif os.path.exists(path):
+                    os.remove(path)
+                if index % 16 == 0 and index < len(keys):
+                    self._post(f"Autosave: {index}/{len(keys)} chunks", (180, 180, 180))
+            # Meta last: its mtime marks a complete autosave
+            meta = dict(snapshot.meta_dict(), source=source, generation=map_id)
+            atomic_write_json(os.path.join(dirpath, "meta.json"), meta)
+            self._post(f"Autosaved {len(keys)} chunk(s)", (180, 220, 180))
+        self._submit("Autosave", job)
+    
+    def clear_autosave(self, dirpath: str):
+        """Delete the autosave (after an explicit save or load); the next autosave is a full one"""
+        self._autosave_map_id = None
+        
+        def job():
+            if not os.path.isdir(dirpath):
+                return
+            # Meta first: a half-deleted folder is never taken for a complete autosave
+            for name in sorted(os.listdir(dirpath), key=lambda name: name != "meta.json"):
+                if name == "meta.json" or name.startswith("chunk_"):
+                    os.remove(os.path.join(dirpath, name))
+        self._submit("Autosave cleanup", job)
+    
+    def poll(self, log: Callable[[str, Tuple[int, int, int]], None]):
+        """Forward queued worker messages to the logger (call from main thread)"""
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            log(event.message, event.color)
+    
+    def shutdown(self, timeout: Optional[float] = None):
+        """Finish queued jobs and stop the worker"""
+        self._jobs.put(None)
+        self._thread.join(timeout)
@@ -0,0 +1,135 @@
+"""
+Tile renderer benchmark (headless)
+
+Fills the whole view with tiles and times MapEditor.render_tiles against
+the previous per-tile path (set_clip + blit + border rect per tile), then
+compares blit throughput from the raw SRCALPHA atlas and the atlas
+converted to the display format. The editor runs in a temporary folder
+with fixed synthetic sprites, so results do not depend on the sprites.json
+or map files of the current directory.
+    
+    python bench_render.py [frames]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from editor import MapEditor
+from item_types import ItemType, get_item_definition, ITEM_TYPES_BY_CODE
+from pixel_editor import PixelSprite
+
+BENCH_KINDS = [ItemType.BUSH, ItemType.STONE]
+
+
+def render_tiles_per_tile(editor: MapEditor, sprite_cache):
+    """Reference: the per-tile loop render_tiles used before batching"""
+    tile_size = editor.game_map.tile_size
+    start_tile_x = max(0, editor.camera.x // tile_size)
+    start_tile_y = max(0, editor.camera.y // tile_size)
+    end_tile_x = min(editor.game_map.width, (editor.camera.x + editor.view_panel_width) // tile_size + 1)
+    end_tile_y = min(editor.game_map.height, (editor.camera.y + editor.view_panel_height) // tile_size + 1)
+    
+    for tile_x in range(start_tile_x, end_tile_x):
+        for tile_y in range(start_tile_y, end_tile_y):
+            item_type = ITEM_TYPES_BY_CODE[editor.game_map.get_code(tile_x, tile_y)]
+            if item_type:
+                screen_x = editor.view_panel_x + (tile_x * tile_size) - editor.camera.x
+                screen_y = editor.view_panel_y + (tile_y * tile_size) - editor.camera.y
+                clip_rect = pygame.Rect(editor.view_panel_x, editor.view_panel_y,
+                                        editor.view_panel_width, editor.view_panel_height)
+                editor.screen.set_clip(clip_rect)
+                cached_sprite = sprite_cache.get(item_type.value)
+                if cached_sprite:
+                    editor.screen.blit(cached_sprite, (screen_x, screen_y))
+                else:
+                    item_def = get_item_definition(item_type)
+                    pygame.draw.rect(editor.screen, item_def.color,
+                                     (screen_x, screen_y, tile_size, tile_size))
+                pygame.draw.rect(editor.screen, (255, 255, 255),
+                                 (screen_x, screen_y, tile_size, tile_size), 1)
+                editor.screen.set_clip(None)
+
+
+def synthetic_sprite(color) -> PixelSprite:
+    """16x16 checkerboard of `color` and transparent pixels (same for every run)"""
+    sprite = PixelSprite(16, 16)
+    for y in range(16):
+        for x in range(16):
+            if (x // 4 + y // 4) % 2 == 0:
+                sprite.set_pixel(x, y, color)
+    return sprite
+
+
+def time_frames(render, frames: int) -> float:
+    """Average milliseconds per call"""
+    render()  # warm up
+    start = time.perf_counter()
+    for _ in range(frames):
+        render()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def blit_throughput(editor: MapEditor, source: pygame.Surface, frames: int) -> float:
+    """Tile blits per millisecond from one atlas surface"""
+    area = editor.sprite_atlas_32.get_rect(BENCH_KINDS[0].value)
+    tile_size = editor.game_map.tile_size
+    blit_list = [(source, (x, y), area)
+                 for y in range(0, editor.screen_height, tile_size)
+                 for x in range(0, editor.screen_width, tile_size)]
+    ms = time_frames(lambda: editor.screen.blits(blit_list, False), frames)
+    return len(blit_list) / ms
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # No sprites.json / map_save.json: nothing of the caller's is read or written
+        run(frames)
+
+
+def run(frames: int):
+    editor = MapEditor(1200, 800)
+    for item_type, color in zip(BENCH_KINDS, [(40, 160, 60), (128, 128, 128)]):
+        editor.sprite_library.set_sprite(item_type, synthetic_sprite(color))
+    editor._rebuild_sprite_cache()
+    assert all(item_type.value in editor.sprite_atlas_32 for item_type in BENCH_KINDS), \
+        "benchmark sprites missing from the atlas"
+    game_map = editor.game_map
+    kinds = BENCH_KINDS
+    for y in range(game_map.height):
+        for x in range(game_map.width):
+            game_map.set_tile(x, y, kinds[(x + y) % len(kinds)])
+    
+    sprite_cache = {}
+    for item_type in kinds:
+        sprite = editor.sprite_library.get_sprite(item_type)
+        if sprite:
+            sprite_cache[item_type.value] = sprite.render_to_surface(32)
+    
+    visible = ((editor.view_panel_width // game_map.tile_size + 1) *
+               (editor.view_panel_height // game_map.tile_size + 1))
+    per_tile = time_frames(lambda: render_tiles_per_tile(editor, sprite_cache), frames)
+    batched = time_frames(editor.render_tiles, frames)
+    print(f"Visible tiles: ~{visible}, frames: {frames}")
+    print(f"Per-tile blit + border: {per_tile:.3f} ms/frame")
+    print(f"Batched Surface.blits:  {batched:.3f} ms/frame")
+    print(f"Speedup: {per_tile / batched:.2f}x")
+    
+    atlas = editor.sprite_atlas_32
+    atlas.ensure_prepared()
+    mode = f"convert() + colorkey {atlas.colorkey}" if atlas.colorkey else "convert_alpha()"
+    raw = blit_throughput(editor, atlas.master, frames)
+    prepared = blit_throughput(editor, atlas.surface, frames)
+    print(f"Raw SRCALPHA atlas:     {raw:.0f} blits/ms")
+    print(f"Display-format atlas:   {prepared:.0f} blits/ms ({mode})")
+    print(f"Speedup: {prepared / raw:.2f}x")
+    editor.saver.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
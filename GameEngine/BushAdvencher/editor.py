@@ -1,13 +1,32 @@
 """
 맵 에디터 메인 클래스
 """
+import json
+import os
+import time
 import pygame
-from typing import Optional, Tuple, Dict
-from map_data import GameMap
-from item_types import ItemType, get_item_definition, ITEM_REGISTRY
+from typing import Any, Callable, Optional, Tuple, Dict, List
+from map_data import GameMap, MapView, CHUNK_SIZE
+from item_types import ItemType, get_item_definition, ITEM_REGISTRY, ITEM_TYPES_BY_CODE, PLAYER_START_CODE
 from player import Player
+from encounters import EncounterSystem, load_encounter_tables
+from fov import FogOfWar
+from map_analysis import Reachability, analyze as analyze_reachability
 from pixel_editor import PixelEditorPanel, PixelSpriteLibrary, PixelSprite
 from debug_log import DebugLogger
+from sprite_atlas import SpriteAtlas
+from async_save import BackgroundSaver
+from file_watch import FileWatcher
+from event_pipeline import allow_only, coalesce_motion
+from session_record import SessionRecorder, HeldKeys, held_mask, read_session, frame_time_stats
+import map_journal
+import paint_tools
+
+
+def frame_key(item_value: str, frame: int) -> str:
+    """Atlas key of one animation frame (frame 0 uses the plain item key)"""
+    return item_value if frame == 0 else f"{item_value}#{frame}"
+
 
 class Camera:
     """카메라 (뷰 오프셋)"""
@@ -44,6 +63,9 @@ class EditorMode:
     PLAY = "play"
     PIXEL_DESIGN = "pixel_design"
 
+# Mode codes in session recordings
+EDITOR_MODES = [EditorMode.EDIT, EditorMode.PLAY, EditorMode.PIXEL_DESIGN]
+
 class MapEditor:
     """맵 에디터"""
     def __init__(self, screen_width: int = 1200, screen_height: int = 800):
@@ -68,6 +90,8 @@ class MapEditor:
         
         # 맵
         self.game_map = GameMap(50, 50, 32)
+        # 플레이 모드에서 쓰는 copy-on-write 뷰 (플레이 중 변경은 편집 맵에 남지 않음)
+        self.play_map: Optional[MapView] = None
         
         # 선택된 아이템 (브러시 모드)
         self.selected_item: Optional[ItemType] = None
@@ -75,6 +99,7 @@ class MapEditor:
         # 뷰에서 드래그 중인지 여부
         self.is_painting = False
         self.is_erasing = False  # 우클릭 드래그로 지우기
+        self.last_paint_tile: Optional[Tuple[int, int]] = None  # 드래그 경로 연결용
         
         # 뷰 패널 드래그 (카메라 이동)
         self.is_dragging_view = False
@@ -87,6 +112,20 @@ class MapEditor:
         # 플레이어 (플레이 모드용)
         self.player: Optional[Player] = None
         
+        # 덤불 인카운터 (플레이 모드마다 같은 시드로 시작 -> 세션 재생 시 같은 결과)
+        self.encounter_tables = load_encounter_tables()
+        self.encounter_seed = 0
+        self.encounters: Optional[EncounterSystem] = None
+        
+        # 시야/안개 (플레이 모드, 플레이어가 타일을 옮길 때만 다시 계산)
+        self.fog_radius = 8
+        self.fog: Optional[FogOfWar] = None
+        
+        # 도달 불가 타일 표시 (R 키, 편집 모드) - 맵이 바뀌면 드래그가 끝난 뒤 다시 분석
+        self.show_reachability = False
+        self.reachability: Optional[Reachability] = None
+        self._reachability_key = None
+        
         # 폰트
         self.font = pygame.font.Font(None, 24)
         self.small_font = pygame.font.Font(None, 18)
@@ -101,96 +140,220 @@ class MapEditor:
             self.view_panel_width, self.view_panel_height
         )
         self.editing_item_type: Optional[ItemType] = None
+        self.editing_frame = 0  # Animation frame open in the pixel editor
         
-        # Performance optimization: sprite cache
-        self.sprite_cache_32: Dict[str, pygame.Surface] = {}  # 32px sprites for map
-        self.sprite_cache_40: Dict[str, pygame.Surface] = {}  # 40px sprites for panel
+        # Tile animation: one global clock; every tile of a type shows the same frame
+        self.animation_clock_ms = 0
+        self.animation_frames: Dict[str, int] = {}  # Sprite key -> frame shown this tick
+        
+        # Performance optimization: sprite cache (one atlas surface per size)
+        self.sprite_atlas_32 = SpriteAtlas(32)  # 32px map tiles (border baked in), one cell per frame
+        self.sprite_atlas_40 = SpriteAtlas(40)  # 40px sprites for panel
+        self.cached_frame_counts: Dict[str, int] = {}  # Frames rasterized into sprite_atlas_32
         self._rebuild_sprite_cache()
         
         # Debug logger
         self.logger = DebugLogger(screen_width, screen_height)
+        
+        # Background saving (worker thread) + periodic chunk autosave
+        self.map_path = "map_save.json"
+        self.autosave_dir = "map_save.autosave"
+        self.autosave_interval_ms = 30000
+        self.last_autosave_ticks = pygame.time.get_ticks()
+        self.map_generation = 0  # Bumped whenever self.game_map is replaced
+        self.map_source: Optional[str] = None  # File the map was loaded from / saved to (None = new map)
+        self.saver = BackgroundSaver()
+        
+        # Hot reload of externally edited sprites.json (parsed on the watcher thread)
+        self.sprite_watcher = FileWatcher(self.sprite_library.filepath, PixelSpriteLibrary.read_entries)
+        
+        # Edit journal: Ctrl+S appends instead of rewriting map_save.json
+        self.journal_path = map_journal.journal_path(self.map_path)
+        self.journal_synced = False  # True when the journal's base is map_save.json of this map
+        self.journal_records = 0  # Records written since the last compaction
+        self.journal_compact_threshold = 4096
+        
+        # Input: one handler per event type (only these types are queued) and per shortcut key
+        self.event_handlers = {
+            pygame.QUIT: self.on_quit,
+            pygame.KEYDOWN: self.on_key_down,
+            pygame.MOUSEBUTTONDOWN: self.on_mouse_button_down,
+            pygame.MOUSEBUTTONUP: self.on_mouse_button_up,
+            pygame.MOUSEWHEEL: self.on_mouse_wheel,
+            pygame.MOUSEMOTION: self.on_mouse_motion,
+        }
+        self.key_handlers = {
+            pygame.K_ESCAPE: self._key_escape,
+            pygame.K_p: self._key_play,
+            pygame.K_s: self._key_save,
+            pygame.K_o: self._key_load,
+            pygame.K_z: self._key_undo,
+            pygame.K_r: self._key_reachability,
+            pygame.K_y: self._key_yes,
+            pygame.K_n: self._key_no,
+        }
+        allow_only(self.event_handlers)
+        self.mouse_pos = pygame.mouse.get_pos()  # Last position seen in mouse events
+        
+        # Session recording (main.py --record) for replaying real sessions as benchmarks
+        self.recorder: Optional[SessionRecorder] = None
+        
+        # Yes/no question shown over the view: (question, on_yes, on_no)
+        self.prompt: Optional[Tuple[str, Callable[[], None], Callable[[], None]]] = None
+        
+        # Unsaved edits left by a crashed (or unsaved) session
+        self.offer_recovery()
     
-    def handle_events(self):
-        """이벤트 처리"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if self.mode == EditorMode.PLAY:
-                        self.switch_to_edit_mode()
-                    else:
-                        self.running = False
-                
-                elif event.key == pygame.K_p:
-                    self.toggle_play_mode()
-                
-                elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                    self.save_map()
-                
-                elif event.key == pygame.K_o and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                    self.load_map()
-                
-                # Undo/Redo in pixel design mode
-                elif event.key == pygame.K_z and self.mode == EditorMode.PIXEL_DESIGN:
-                    mods = pygame.key.get_mods()
-                    if mods & pygame.KMOD_SHIFT and mods & pygame.KMOD_CTRL:
-                        # Shift+Ctrl+Z: Redo
-                        if self.pixel_editor.redo():
-                            self.logger.log("Redo", (255, 255, 100))
-                    elif mods & pygame.KMOD_CTRL:
-                        # Ctrl+Z: Undo
-                        if self.pixel_editor.undo():
-                            self.logger.log("Undo", (255, 255, 100))
-                
-                # 플레이 모드는 update에서 연속 키 입력 처리
-            
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left click
-                    x, y = event.pos
-                    # Check toolbar first
-                    if y < self.toolbar_height:
-                        self.handle_mouse_down(event.pos)
-                    # Then check item panel
-                    elif x < self.item_panel_width:
-                        self.handle_item_panel_click(x, y)
-                    elif self.mode == EditorMode.PIXEL_DESIGN:
-                        result = self.pixel_editor.handle_mouse_down(event.pos)
-                        if result == "reset":
-                            if self.pixel_editor.reset_to_default():
-                                self.logger.log("Reset to default", (255, 200, 100))
-                    else:
-                        self.handle_mouse_down(event.pos)
-                elif event.button == 3:  # Right click
-                    if self.mode == EditorMode.EDIT:
-                        self.handle_right_mouse_down(event.pos)
-            
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:
-                    if self.mode == EditorMode.PIXEL_DESIGN:
-                        self.pixel_editor.handle_mouse_up(event.pos)
-                    else:
-                        self.is_painting = False
-                        self.is_dragging_view = False
-                        self.drag_start_camera_pos = None
-                        self.drag_start_mouse_pos = None
-                elif event.button == 3:
-                    self.is_erasing = False
-            
-            elif event.type == pygame.MOUSEMOTION:
-                if self.mode == EditorMode.PIXEL_DESIGN:
-                    self.pixel_editor.handle_mouse_motion(event.pos)
-                elif self.mode == EditorMode.EDIT:
-                    # View drag (camera movement)
-                    if self.is_dragging_view:
-                        self.handle_view_drag(event.pos)
-                    # Item painting
-                    elif self.is_painting and self.selected_item:
-                        self.paint_at_mouse(event.pos)
-                    # Erasing tiles
-                    elif self.is_erasing:
-                        self.erase_at_mouse(event.pos)
+    def handle_events(self, events: Optional[List[pygame.event.Event]] = None):
+        """이벤트 처리 (프레임당 한 번, 연속된 마우스 이동은 하나로 합쳐서 처리)"""
+        if events is None:
+            events = pygame.event.get()
+        handlers = self.event_handlers
+        for event in coalesce_motion(events):
+            handler = handlers.get(event.type)  # Events queued before allow_only() may slip through
+            if handler:
+                handler(event)
+    
+    def on_quit(self, event: pygame.event.Event):
+        self.running = False
+    
+    def on_key_down(self, event: pygame.event.Event):
+        """Key shortcuts from the key table; other keys edit animation frames in pixel design mode"""
+        handler = self.key_handlers.get(event.key)
+        if handler and handler(event.mod):
+            return
+        # Animation frames in pixel design mode
+        if self.mode == EditorMode.PIXEL_DESIGN and not event.mod & pygame.KMOD_CTRL:
+            self.handle_frame_key(event.key)
+        # 플레이 모드는 update에서 연속 키 입력 처리
+    
+    def _key_escape(self, mods: int) -> bool:
+        if self.mode == EditorMode.PLAY:
+            self.switch_to_edit_mode()
+        else:
+            self.running = False
+        return True
+    
+    def _key_play(self, mods: int) -> bool:
+        self.toggle_play_mode()
+        return True
+    
+    def _key_save(self, mods: int) -> bool:
+        if not mods & pygame.KMOD_CTRL:
+            return False
+        # Shift+Ctrl+S: full rewrite (compacts the journal)
+        self.save_map(full=bool(mods & pygame.KMOD_SHIFT))
+        return True
+    
+    def _key_load(self, mods: int) -> bool:
+        if not mods & pygame.KMOD_CTRL:
+            return False
+        self.load_map()
+        return True
+    
+    def _key_yes(self, mods: int) -> bool:
+        return self.answer_prompt(True)
+    
+    def _key_no(self, mods: int) -> bool:
+        return self.answer_prompt(False)
+    
+    def ask(self, question: str, on_yes: Callable[[], None], on_no: Callable[[], None]):
+        """Show a yes/no question (answered with Y / N)"""
+        self.prompt = (question, on_yes, on_no)
+        self.logger.log(f"{question} (Y/N)", (255, 255, 100))
+    
+    def answer_prompt(self, yes: bool) -> bool:
+        if self.prompt is None:
+            return False
+        _, on_yes, on_no = self.prompt
+        self.prompt = None
+        (on_yes if yes else on_no)()
+        return True
+    
+    def _key_reachability(self, mods: int) -> bool:
+        """R: toggle the unreachable tile overlay (edit mode)"""
+        if self.mode != EditorMode.EDIT:
+            return False
+        self.show_reachability = not self.show_reachability
+        if self.show_reachability:
+            self.logger.log(f"Reachability: {self.refresh_reachability().summary()}", (255, 200, 100))
+        return True
+    
+    def _key_undo(self, mods: int) -> bool:
+        """Undo/Redo in pixel design mode"""
+        if self.mode != EditorMode.PIXEL_DESIGN:
+            return False
+        if mods & pygame.KMOD_SHIFT and mods & pygame.KMOD_CTRL:
+            # Shift+Ctrl+Z: Redo
+            if self.pixel_editor.redo():
+                self.logger.log("Redo", (255, 255, 100))
+        elif mods & pygame.KMOD_CTRL:
+            # Ctrl+Z: Undo
+            if self.pixel_editor.undo():
+                self.logger.log("Undo", (255, 255, 100))
+        return True
+    
+    def on_mouse_button_down(self, event: pygame.event.Event):
+        self.mouse_pos = event.pos
+        if event.button == 1:  # Left click
+            x, y = event.pos
+            # Check toolbar first
+            if y < self.toolbar_height:
+                self.handle_mouse_down(event.pos)
+            # Then check item panel
+            elif x < self.item_panel_width:
+                self.handle_item_panel_click(x, y)
+            elif self.mode == EditorMode.PIXEL_DESIGN:
+                result = self.pixel_editor.handle_mouse_down(event.pos)
+                if result == "reset":
+                    if self.pixel_editor.reset_to_default():
+                        self.logger.log("Reset to default", (255, 200, 100))
+                elif result == "resize":
+                    sprite = self.pixel_editor.current_sprite
+                    self.logger.log(f"Sprite size: {sprite.width}x{sprite.height}", (255, 255, 100))
+            else:
+                self.handle_mouse_down(event.pos)
+        elif event.button == 2:  # Middle click
+            if self.mode == EditorMode.PIXEL_DESIGN:
+                self.pixel_editor.start_pan(event.pos)
+        elif event.button == 3:  # Right click
+            if self.mode == EditorMode.EDIT:
+                self.handle_right_mouse_down(event.pos)
+    
+    def on_mouse_button_up(self, event: pygame.event.Event):
+        self.mouse_pos = event.pos
+        if event.button == 1:
+            if self.mode == EditorMode.PIXEL_DESIGN:
+                self.pixel_editor.handle_mouse_up(event.pos)
+            else:
+                self.is_painting = False
+                self.is_dragging_view = False
+                self.drag_start_camera_pos = None
+                self.drag_start_mouse_pos = None
+        elif event.button == 2:
+            self.pixel_editor.end_pan()
+        elif event.button == 3:
+            self.is_erasing = False
+    
+    def on_mouse_wheel(self, event: pygame.event.Event):
+        if self.mode == EditorMode.PIXEL_DESIGN:
+            self.pixel_editor.handle_mouse_wheel(self.mouse_pos, event.y)
+    
+    def on_mouse_motion(self, event: pygame.event.Event):
+        """Coalesced motion: painting follows event.path, dragging only needs the last position"""
+        self.mouse_pos = event.pos
+        if self.mode == EditorMode.PIXEL_DESIGN:
+            self.pixel_editor.handle_mouse_path(event.path)
+        elif self.mode == EditorMode.EDIT:
+            # View drag (camera movement)
+            if self.is_dragging_view:
+                self.handle_view_drag(event.pos)
+            # Item painting
+            elif self.is_painting and self.selected_item:
+                self.paint_path(event.path, self.selected_item)
+            # Erasing tiles
+            elif self.is_erasing:
+                self.paint_path(event.path, None)
     
     def handle_mouse_down(self, pos: Tuple[int, int]):
         """Mouse down handler"""
@@ -218,6 +381,7 @@ class MapEditor:
             if self.selected_item:
                 # Item painting
                 self.is_painting = True
+                self.last_paint_tile = None
                 self.paint_at_mouse(pos)
             else:
                 # View drag (camera movement)
@@ -275,6 +439,7 @@ class MapEditor:
         
         self.mode = EditorMode.PIXEL_DESIGN
         self.editing_item_type = self.selected_item
+        self.editing_frame = 0
         
         # Get item definition for default color
         item_def = get_item_definition(self.selected_item)
@@ -291,36 +456,103 @@ class MapEditor:
         self.pixel_editor.set_sprite(sprite, item_def.color)
         self.logger.log(f"Design mode: {item_def.name}", (255, 255, 100))
     
+    def handle_frame_key(self, key: int):
+        """[ / ]: previous/next frame, N: duplicate frame, Delete: remove frame, - / =: frame duration"""
+        item_type = self.editing_item_type
+        if not item_type:
+            return
+        frames = self.sprite_library.get_frames(item_type)
+        if key == pygame.K_LEFTBRACKET:
+            self.select_frame((self.editing_frame - 1) % len(frames))
+        elif key == pygame.K_RIGHTBRACKET:
+            self.select_frame((self.editing_frame + 1) % len(frames))
+        elif key == pygame.K_n:
+            self.select_frame(self.sprite_library.add_frame(item_type, self.editing_frame))
+            self.logger.log(f"Added frame {self.editing_frame + 1}", (255, 255, 100))
+        elif key == pygame.K_DELETE:
+            if self.sprite_library.remove_frame(item_type, self.editing_frame):
+                self.select_frame(min(self.editing_frame, len(self.sprite_library.get_frames(item_type)) - 1))
+                self.logger.log("Removed frame", (255, 200, 100))
+        elif key in (pygame.K_MINUS, pygame.K_EQUALS):
+            animation = self.sprite_library.get_animation(item_type)
+            if animation:
+                step = -10 if key == pygame.K_MINUS else 10
+                animation.set_duration(self.editing_frame, animation.durations[self.editing_frame] + step)
+    
+    def select_frame(self, index: int):
+        """Open one animation frame of the edited sprite in the pixel editor"""
+        self.editing_frame = index
+        frame = self.sprite_library.get_frames(self.editing_item_type)[index]
+        self.pixel_editor.set_sprite(frame, get_item_definition(self.editing_item_type).color)
+    
     def exit_pixel_design_mode(self):
         """Exit pixel design mode and save sprites"""
         self.mode = EditorMode.EDIT
-        self.editing_item_type = None
         # Auto-save sprites when exiting design mode
         self.save_sprites()
-        # Rebuild sprite cache for performance
-        self._rebuild_sprite_cache()
+        # Only the edited sprite changed: update its atlas cells
+        if self.editing_item_type:
+            self._update_sprite_cache(self.editing_item_type)
+        self.editing_item_type = None
+        self.editing_frame = 0
         self.logger.log("Exited design mode", (100, 255, 100))
     
     def save_sprites(self):
-        """Save sprite library"""
-        try:
-            self.sprite_library.save()
-            self.logger.log("Sprites saved", (100, 255, 100))
-        except Exception as e:
-            self.logger.log(f"Save failed: {e}", (255, 100, 100))
+        """Save sprite library (written on the worker thread)"""
+        self.saver.save_sprites(self.sprite_library.to_dict(), self.sprite_library.filepath)
+    
+    def reload_changed_sprites(self):
+        """Apply sprite file changes picked up by the watcher (changed entries only)"""
+        changed = []
+        for entries in self.sprite_watcher.poll(self.logger.log):
+            changed.extend(self.sprite_library.apply_entries(entries))
+        if not changed:
+            return
+        changed = set(changed)
+        for item_type, item_def in ITEM_REGISTRY.items():
+            if item_def.sprite in changed:
+                self._update_sprite_cache(item_type)
+        self.logger.log(f"Reloaded {len(changed)} sprite(s)", (100, 200, 255))
     
     def _rebuild_sprite_cache(self):
         """Rebuild sprite cache for performance optimization"""
-        self.sprite_cache_32.clear()
-        self.sprite_cache_40.clear()
+        self.sprite_atlas_32.clear()
+        self.sprite_atlas_40.clear()
+        self.cached_frame_counts.clear()
         
         for item_type in ITEM_REGISTRY.keys():
+            self._update_sprite_cache(item_type)
+    
+    def _update_sprite_cache(self, item_type: ItemType):
+        """Re-rasterize one sprite (all its animation frames) into the atlases"""
+        sprite = self.sprite_library.get_sprite(item_type)
+        frames = self.sprite_library.get_frames(item_type)
+        # Cache 32px map tile for every item (custom sprite or default color)
+        self.sprite_atlas_32.set(item_type.value, self._make_tile_surface(item_type))
+        for frame in range(1, len(frames)):
+            self.sprite_atlas_32.set(frame_key(item_type.value, frame),
+                                     self._make_tile_surface(item_type, frames[frame]))
+        # Frame 0 (the default tile above) always stays, even without a custom sprite
+        for frame in range(max(1, len(frames)), self.cached_frame_counts.get(item_type.value, 1)):
+            self.sprite_atlas_32.remove(frame_key(item_type.value, frame))
+        self.cached_frame_counts[item_type.value] = max(1, len(frames))
+        if sprite:
+            # Cache 40px version for panel rendering
+            self.sprite_atlas_40.set(item_type.value, sprite.render_to_surface(40))
+        else:
+            self.sprite_atlas_40.remove(item_type.value)
+    
+    def _make_tile_surface(self, item_type: ItemType, sprite: Optional[PixelSprite] = None) -> pygame.Surface:
+        """Map tile variant: sprite (or default color) with the tile border baked in"""
+        if sprite is None:
             sprite = self.sprite_library.get_sprite(item_type)
-            if sprite:
-                # Cache 32px version for map rendering
-                self.sprite_cache_32[item_type.value] = sprite.render_to_surface(32)
-                # Cache 40px version for panel rendering
-                self.sprite_cache_40[item_type.value] = sprite.render_to_surface(40)
+        if sprite:
+            surface = sprite.render_to_surface(32)
+        else:
+            surface = pygame.Surface((32, 32), pygame.SRCALPHA)
+            surface.fill(get_item_definition(item_type).color)
+        pygame.draw.rect(surface, (255, 255, 255), surface.get_rect(), 1)
+        return surface
     
     def handle_right_mouse_down(self, pos: Tuple[int, int]):
         """Handle right mouse down - start erasing"""
@@ -332,39 +564,50 @@ class MapEditor:
         # Right click on view panel - start erasing
         if x >= self.view_panel_x and y >= self.view_panel_y:
             self.is_erasing = True
+            self.last_paint_tile = None
             self.erase_at_mouse(pos)
     
     def erase_at_mouse(self, pos: Tuple[int, int]):
         """Erase tile at mouse position (drag erasing)"""
-        x, y = pos
-        
-        # Ignore if outside view panel
-        if x < self.view_panel_x or y < self.view_panel_y:
-            return
-        
-        # Convert view coordinates to tile coordinates
-        view_x = x - self.view_panel_x + self.camera.x
-        view_y = y - self.view_panel_y + self.camera.y
-        tile_x = view_x // self.game_map.tile_size
-        tile_y = view_y // self.game_map.tile_size
-        
-        self.game_map.set_tile(tile_x, tile_y, None)
+        self.paint_path([pos], None)
     
     def paint_at_mouse(self, pos: Tuple[int, int]):
         """마우스 위치에 선택된 아이템 배치 (브러시)"""
+        self.paint_path([pos], self.selected_item)
+    
+    def view_to_tile(self, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Screen position -> tile coordinates (None outside the view panel)"""
         x, y = pos
         
         # 뷰 패널 밖이면 무시
         if x < self.view_panel_x or y < self.view_panel_y:
-            return
+            return None
         
         # 뷰 좌표를 타일 좌표로 변환
         view_x = x - self.view_panel_x + self.camera.x
         view_y = y - self.view_panel_y + self.camera.y
-        tile_x = view_x // self.game_map.tile_size
-        tile_y = view_y // self.game_map.tile_size
-        
-        self.game_map.set_tile(tile_x, tile_y, self.selected_item)
+        return view_x // self.game_map.tile_size, view_y // self.game_map.tile_size
+    
+    def paint_path(self, path: List[Tuple[int, int]], item_type: Optional[ItemType]):
+        """Set tiles along a mouse path (None erases)
+        
+        Consecutive points, and the last tile of the previous call, are
+        joined by a line so fast strokes leave no gaps between motion events.
+        """
+        for pos in path:
+            tile = self.view_to_tile(pos)
+            if tile is None:
+                self.last_paint_tile = None
+                continue
+            if tile == self.last_paint_tile:
+                continue
+            if self.last_paint_tile:
+                points = paint_tools.line_points(*self.last_paint_tile, *tile)[1:]
+            else:
+                points = [tile]
+            for tile_x, tile_y in points:
+                self.game_map.set_tile(tile_x, tile_y, item_type)
+            self.last_paint_tile = tile
     
     def handle_view_drag(self, pos: Tuple[int, int]):
         """View drag for camera movement"""
@@ -393,6 +636,11 @@ class MapEditor:
         self.camera.x = max(min_x, min(new_camera_x, max_x))
         self.camera.y = max(min_y, min(new_camera_y, max_y))
     
+    @property
+    def active_map(self) -> GameMap:
+        """The map on screen: the play view in play mode, the edited map otherwise"""
+        return self.play_map if self.play_map is not None else self.game_map
+    
     def toggle_play_mode(self):
         """플레이 모드 토글"""
         if self.mode == EditorMode.EDIT:
@@ -407,59 +655,261 @@ class MapEditor:
             return
         
         self.mode = EditorMode.PLAY
-        start_x, start_y = self.game_map.player_start
-        self.player = Player(start_x, start_y, self.game_map.tile_size)
+        self.play_map = self.game_map.play_view()
+        start_x, start_y = self.play_map.player_start
+        self.player = Player(start_x, start_y, self.play_map.tile_size)
+        self.player.on_enter_tile = self.on_player_enter_tile
+        self.encounters = EncounterSystem(self.encounter_seed, self.encounter_tables)
+        self.fog = FogOfWar(self.play_map.width, self.play_map.height, self.fog_radius)
         self.logger.log("Play mode started", (100, 255, 100))
     
     def switch_to_edit_mode(self):
         """Switch to edit mode"""
         self.mode = EditorMode.EDIT
         self.player = None
+        self.encounters = None
+        self.fog = None
+        self.play_map = None  # Drop everything changed during play
         self.camera.x = 0
         self.camera.y = 0
     
-    def save_map(self):
-        """Save map and sprites"""
+    def on_player_enter_tile(self, tile_x: int, tile_y: int):
+        """Encounter roll for the tile the player just entered"""
+        encounter = self.encounters.check(self.play_map, tile_x, tile_y)
+        if encounter:
+            self.logger.log(f"A wild {encounter.monster} appeared! ({encounter.table.name})", (255, 200, 100))
+    
+    def save_map(self, full: bool = False):
+        """Save map and sprites (snapshot now, write on the worker thread)
+        
+        Normally only the edits since the last save are appended to the
+        journal. The whole file is rewritten (journal compacted) when the
+        journal has no valid base yet, grows past the threshold, or on request.
+        The autosave is deleted afterwards: everything in it is saved now.
+        """
+        if self.prompt is not None:
+            self.logger.log("Answer the question first (Y/N)", (255, 200, 100))
+            return
+        if (full or not self.journal_synced or
+                self.journal_records >= self.journal_compact_threshold):
+            self.game_map.take_pending_ops()
+            self.saver.save_map(self.game_map.snapshot(), self.map_path, self.journal_path)
+            self.journal_synced = True
+            self.journal_records = 0
+            self.logger.log("Saving map...", (180, 180, 180))
+        else:
+            self.flush_journal(commit=True)
+        self.map_source = os.path.abspath(self.map_path)
+        self.saver.clear_autosave(self.autosave_dir)
+        self.save_sprites()
+    
+    def flush_journal(self, commit: bool = False):
+        """Append pending set_tile ops to the journal (crash recovery)"""
+        ops = self.game_map.take_pending_ops()
+        if not self.journal_synced:
+            return  # Nothing to replay them onto; next save is a full write
+        if ops or commit:
+            self.saver.append_journal(self.journal_path, ops, commit)
+            self.journal_records += len(ops)
+    
+    def autosave(self):
+        """Write chunks changed since the last autosave"""
+        self.last_autosave_ticks = pygame.time.get_ticks()
+        if self.prompt is not None:
+            return  # Would overwrite the autosave the question is about
+        dirty = self.game_map.take_dirty_chunks()
+        if not dirty:
+            return
+        self.saver.autosave(self.game_map.snapshot(), dirty, self.autosave_dir, self.map_generation,
+                            self.map_source)
+    
+    def _read_autosave_meta(self) -> Optional[Dict[str, Any]]:
         try:
-            self.game_map.save_to_file("map_save.json")
-            self.sprite_library.save()
-            self.logger.log("Map saved successfully", (100, 255, 100))
+            with open(os.path.join(self.autosave_dir, "meta.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _recoverable_autosave(self) -> bool:
+        """Autosave of this editor's map (or of a new, never saved map) holding unsaved edits
+        
+        Autosaves of another map file are ignored. For this map file it
+        must be newer than the saved map + journal.
+        """
+        meta = self._read_autosave_meta()
+        if meta is None:
+            return False
+        source = meta.get("source")
+        if source is None:
+            return True
+        if source != os.path.abspath(self.map_path):
+            return False
+        if not os.path.exists(self.map_path):
+            return True
+        saved_mtime = os.path.getmtime(self.map_path)
+        if os.path.exists(self.journal_path):
+            saved_mtime = max(saved_mtime, os.path.getmtime(self.journal_path))
+        meta_mtime = os.path.getmtime(os.path.join(self.autosave_dir, "meta.json"))
+        return meta_mtime > saved_mtime
+    
+    def _journal_unsaved_edits(self) -> int:
+        """set_tile records after the journal's last commit (edits of a crashed session)"""
+        if not os.path.exists(self.map_path):
+            return 0
+        try:
+            return len(map_journal.read_ops(self.journal_path)[1])
+        except (OSError, ValueError):
+            return 0
+    
+    def offer_recovery(self):
+        """At startup: ask before restoring unsaved edits (journal first, then the autosave)"""
+        unsaved = self._journal_unsaved_edits()
+        if unsaved:
+            self.ask(f"{unsaved} unsaved edit(s) found in the map journal. Recover them?",
+                     self.recover_journal, self.discard_journal)
+        elif self._recoverable_autosave():
+            self.ask("Unsaved edits found in the autosave. Recover them?",
+                     self.recover_autosave, self.discard_autosave)
+    
+    def recover_journal(self):
+        self.load_map(recover=True)
+    
+    def discard_journal(self):
+        try:
+            dropped = map_journal.drop_uncommitted(self.journal_path)
+        except (OSError, ValueError) as e:
+            self.logger.log(f"Journal cleanup failed: {e}", (255, 100, 100))
+            return
+        self.logger.log(f"{dropped} unsaved edit(s) discarded", (180, 180, 180))
+        # The journal is newer now: an autosave of this map is stale, one of a new map is not
+        self.offer_recovery()
+    
+    def recover_autosave(self):
+        try:
+            meta = self._read_autosave_meta()
+            self.game_map = GameMap.load_from_autosave(self.autosave_dir)
         except Exception as e:
-            self.logger.log(f"Save failed: {e}", (255, 100, 100))
+            self.logger.log(f"Recovery failed: {e}", (255, 100, 100))
+            return
+        self.journal_synced = False  # The journal's base is not this map: next save is a full write
+        self.map_source = meta.get("source")
+        self.map_generation += 1
+        self.logger.log("Map recovered from autosave", (100, 255, 100))
+    
+    def discard_autosave(self):
+        self.saver.clear_autosave(self.autosave_dir)
+        self.logger.log("Autosave discarded", (180, 180, 180))
     
-    def load_map(self):
-        """Load map"""
+    def load_map(self, recover: bool = False):
+        """Load the saved map (unsaved edits in the editor and in the autosave are dropped)
+        
+        Journal records after the last commit are cut off, so a later save
+        cannot commit them by accident. With recover=True (crash recovery)
+        they are replayed instead and stay unsaved until the next save.
+        """
+        if self.saver.busy:
+            self.logger.log("Save in progress, try again", (255, 200, 100))
+            return
+        if self.prompt is not None:
+            self.logger.log("Answer the question first (Y/N)", (255, 200, 100))
+            return
         try:
-            self.game_map = GameMap.load_from_file("map_save.json")
+            self.game_map, unsaved = GameMap.load_with_journal(self.map_path, recover)
+            if not recover:
+                map_journal.drop_uncommitted(self.journal_path)
+            # A journal started under another items.json order is replayed but never appended to:
+            # the next save rewrites the map and starts a new journal
+            self.journal_synced = map_journal.matches_registry(self.journal_path)
+            self.journal_records = sum(map(len, map_journal.read_ops(self.journal_path)))
+            message = "Map loaded successfully"
+            if recover and unsaved:
+                message += f" ({unsaved} unsaved edit(s) recovered)"
+            self.map_generation += 1
+            self.map_source = os.path.abspath(self.map_path)
+            self.saver.clear_autosave(self.autosave_dir)
+            if self.mode == EditorMode.PLAY:
+                # Player, encounters and fog belong to the old map: start a new play session
+                self.switch_to_edit_mode()
+                self.switch_to_play_mode()
             self.sprite_library.load()
             self._rebuild_sprite_cache()
-            self.logger.log("Map loaded successfully", (100, 255, 100))
+            self.logger.log(message, (100, 255, 100))
         except FileNotFoundError:
             self.logger.log("No saved map found", (255, 200, 100))
         except Exception as e:
             self.logger.log(f"Load failed: {e}", (255, 100, 100))
     
-    def update(self):
-        """게임 로직 업데이트"""
+    def update(self, frame_ms: Optional[int] = None, keys=None):
+        """게임 로직 업데이트
+        
+        frame_ms: time since the previous frame (default: the clock's last tick),
+        keys: held key state (default: pygame.key.get_pressed()); replay passes recorded values.
+        """
+        # Background save progress -> debug log
+        self.saver.poll(self.logger.log)
+        
+        # Append this frame's edits to the journal
+        self.flush_journal()
+        
+        # Sprite hot reload (held back while a sprite is open in the pixel editor)
+        if self.mode != EditorMode.PIXEL_DESIGN:
+            self.reload_changed_sprites()
+        
+        # Global animation clock (ms since the previous frame)
+        self.animation_clock_ms += self.clock.get_time() if frame_ms is None else frame_ms
+        self.advance_animations()
+        
+        # Periodic incremental autosave
+        if pygame.time.get_ticks() - self.last_autosave_ticks >= self.autosave_interval_ms:
+            self.autosave()
+        
         if self.mode == EditorMode.PLAY and self.player:
             # 키 입력 상태 가져오기
-            keys = pygame.key.get_pressed()
-            self.player.update(keys, self.game_map)
+            if keys is None:
+                keys = pygame.key.get_pressed()
+            self.player.update(keys, self.play_map)
+            
+            # 시야: 다른 타일로 옮겼거나 플레이 중 맵이 바뀐 경우에만 다시 계산
+            if self.play_map.take_dirty_chunks():
+                self.fog.invalidate()
+            self.fog.update(self.play_map, self.player.tile_x, self.player.tile_y)
             
             # 카메라를 플레이어 중심으로
-            map_pixel_width = self.game_map.width * self.game_map.tile_size
-            map_pixel_height = self.game_map.height * self.game_map.tile_size
+            map_pixel_width = self.play_map.width * self.play_map.tile_size
+            map_pixel_height = self.play_map.height * self.play_map.tile_size
             self.camera.update(
-                int(self.player.pixel_x + self.game_map.tile_size // 2),
-                int(self.player.pixel_y + self.game_map.tile_size // 2),
+                int(self.player.pixel_x + self.play_map.tile_size // 2),
+                int(self.player.pixel_y + self.play_map.tile_size // 2),
                 map_pixel_width,
                 map_pixel_height,
                 self.view_panel_width,
                 self.view_panel_height
             )
     
+    def advance_animations(self) -> List[str]:
+        """Update the shared frame index of every animated type
+        
+        Returns the sprite keys whose frame changed this tick; anything
+        cached per tile type only needs refreshing for these.
+        """
+        animations = self.sprite_library.animations
+        changed = []
+        for key, animation in animations.items():
+            frame = animation.frame_index(self.animation_clock_ms)
+            if self.animation_frames.get(key) != frame:
+                self.animation_frames[key] = frame
+                changed.append(key)
+        for key in [key for key in self.animation_frames if key not in animations]:
+            del self.animation_frames[key]
+            changed.append(key)
+        return changed
+    
     def render(self):
         """화면 렌더링"""
+        # Sprite atlases in display pixel format (re-converted if the mode changed)
+        self.sprite_atlas_32.ensure_prepared()
+        self.sprite_atlas_40.ensure_prepared()
+        
         self.screen.fill((40, 40, 40))
         
         # 툴바 렌더링
@@ -474,11 +924,23 @@ class MapEditor:
         # 선택된 아이템 커서 프리뷰
         self.render_cursor_preview()
         
+        # Open yes/no question
+        if self.prompt:
+            self.render_prompt()
+        
         # Debug logger (render on top of everything)
         self.logger.render(self.screen)
         
         pygame.display.flip()
     
+    def render_prompt(self):
+        """Question banner at the top of the view panel"""
+        text = self.font.render(f"{self.prompt[0]}  [Y] Yes  [N] No", True, (255, 255, 100))
+        rect = text.get_rect(midtop=(self.view_panel_x + self.view_panel_width // 2, self.view_panel_y + 10))
+        pygame.draw.rect(self.screen, (20, 20, 20), rect.inflate(20, 12))
+        pygame.draw.rect(self.screen, (255, 255, 100), rect.inflate(20, 12), 1)
+        self.screen.blit(text, rect)
+    
     def render_toolbar(self):
         """툴바 렌더링"""
         # 배경
@@ -574,10 +1036,23 @@ class MapEditor:
             item_list_start_y = button_y + button_height + 10
             y_offset = item_list_start_y + self.item_scroll_offset
             
+            visible_items = []
             for item_type in ITEM_REGISTRY.keys():
                 if y_offset > self.toolbar_height and y_offset < self.screen_height:
-                    self.render_item_in_panel(item_type, 10, y_offset)
+                    visible_items.append((item_type, y_offset))
                 y_offset += 60
+            
+            # All cached sprites in one batched blit from the atlas
+            sprite_blits = []
+            for item_type, item_y in visible_items:
+                entry = self.sprite_atlas_40.blit_item(item_type.value, (10, item_y))
+                if entry:
+                    sprite_blits.append(entry)
+            if sprite_blits:
+                self.screen.blits(sprite_blits, False)
+            
+            for item_type, item_y in visible_items:
+                self.render_item_in_panel(item_type, 10, item_y)
         else:
             # Show editing item name
             if self.editing_item_type:
@@ -585,6 +1060,21 @@ class MapEditor:
                 info_y = button_y + button_height + 20
                 info_text = self.small_font.render(f"Editing: {item_def.name}", True, (255, 255, 0))
                 self.screen.blit(info_text, (10, info_y))
+                
+                # Animation frame info and keys
+                frames = self.sprite_library.get_frames(self.editing_item_type)
+                animation = self.sprite_library.get_animation(self.editing_item_type)
+                frame_info = f"Frame {self.editing_frame + 1}/{len(frames)}"
+                if animation:
+                    frame_info += f" ({animation.durations[self.editing_frame]} ms)"
+                lines = [(frame_info, (255, 255, 255)),
+                         ("[ ]: Prev/Next frame", (180, 180, 180)),
+                         ("N: Duplicate frame", (180, 180, 180)),
+                         ("Del: Remove frame", (180, 180, 180)),
+                         ("- / =: Duration -/+10 ms", (180, 180, 180))]
+                for text, color in lines:
+                    info_y += 22
+                    self.screen.blit(self.small_font.render(text, True, color), (10, info_y))
         
         # Divider line
         pygame.draw.line(self.screen, (100, 100, 100),
@@ -592,7 +1082,7 @@ class MapEditor:
                         (self.item_panel_width, self.screen_height), 2)
     
     def render_item_in_panel(self, item_type: ItemType, x: int, y: int):
-        """Render item in panel (with caching for performance)"""
+        """Render item border and labels (sprites are batch-blitted by render_item_panel)"""
         item_def = get_item_definition(item_type)
         
         # Highlight if selected
@@ -600,11 +1090,8 @@ class MapEditor:
         border_color = (255, 255, 0) if is_selected else (255, 255, 255)
         border_width = 3 if is_selected else 2
         
-        # Use cached sprite if available
-        cached_sprite = self.sprite_cache_40.get(item_type.value)
-        if cached_sprite:
-            self.screen.blit(cached_sprite, (x, y))
-        else:
+        # Items without a custom sprite
+        if item_type.value not in self.sprite_atlas_40:
             # Render default color box
             pygame.draw.rect(self.screen, item_def.color, (x, y, 40, 40))
         
@@ -643,6 +1130,14 @@ class MapEditor:
             # Tile rendering
             self.render_tiles()
             
+            # Unreachable walkable tiles (edit mode, R)
+            if self.mode == EditorMode.EDIT and self.show_reachability:
+                self.render_reachability()
+            
+            # Fog of war (play mode)
+            if self.mode == EditorMode.PLAY and self.fog:
+                self.render_fog()
+            
             # Render player (play mode)
             if self.mode == EditorMode.PLAY and self.player:
                 # Clip to view panel
@@ -655,6 +1150,48 @@ class MapEditor:
                 
                 self.screen.set_clip(None)
     
+    def visible_tile_range(self, game_map: GameMap) -> Tuple[int, int, int, int]:
+        """Tiles [start, end) of the map inside the view panel: (start_x, start_y, end_x, end_y)"""
+        tile_size = game_map.tile_size
+        return (max(0, self.camera.x // tile_size),
+                max(0, self.camera.y // tile_size),
+                min(game_map.width, (self.camera.x + self.view_panel_width) // tile_size + 1),
+                min(game_map.height, (self.camera.y + self.view_panel_height) // tile_size + 1))
+    
+    def blit_tile_overlay(self, overlay_source, game_map: GameMap):
+        """Blit a cached per-tile overlay (FogOfWar / Reachability) for the tiles in view"""
+        start_x, start_y, end_x, end_y = self.visible_tile_range(game_map)
+        if start_x >= end_x or start_y >= end_y:
+            return
+        
+        tile_size = game_map.tile_size
+        overlay = overlay_source.overlay(start_x, start_y, end_x, end_y, tile_size)
+        self.screen.set_clip(pygame.Rect(self.view_panel_x, self.view_panel_y,
+                                         self.view_panel_width, self.view_panel_height))
+        self.screen.blit(overlay, (self.view_panel_x + start_x * tile_size - self.camera.x,
+                                   self.view_panel_y + start_y * tile_size - self.camera.y))
+        self.screen.set_clip(None)
+    
+    def render_fog(self):
+        """Blit the cached fog overlay for the tiles in view"""
+        self.blit_tile_overlay(self.fog, self.play_map)
+    
+    def refresh_reachability(self) -> Reachability:
+        """Reachability of the edited map (reanalysed only after the map changed)"""
+        key = (self.map_generation, self.game_map.revision)
+        if self.reachability is None or key != self._reachability_key:
+            self.reachability = analyze_reachability(self.game_map)
+            self._reachability_key = key
+        return self.reachability
+    
+    def render_reachability(self):
+        """Tint walkable tiles the player cannot reach from the start"""
+        # Not while a stroke is being painted: one analysis when it ends
+        if self.reachability is None or not (self.is_painting or self.is_erasing):
+            self.refresh_reachability()
+        if self.reachability.start is not None:
+            self.blit_tile_overlay(self.reachability, self.game_map)
+    
     def render_grid(self):
         """Render grid lines (only within map bounds)"""
         tile_size = self.game_map.tile_size
@@ -688,7 +1225,11 @@ class MapEditor:
                                (self.view_panel_x + self.view_panel_width, screen_y), 1)
     
     def render_tiles(self):
-        """Render placed tiles (only within view panel bounds)"""
+        """Render placed tiles (only within view panel bounds)
+        
+        Visible tiles are collected per chunk into one (atlas, dest, area)
+        list and drawn with a single Surface.blits call under one clip.
+        """
         tile_size = self.game_map.tile_size
         
         # Calculate visible tile range
@@ -696,50 +1237,58 @@ class MapEditor:
         start_tile_y = max(0, self.camera.y // tile_size)
         end_tile_x = min(self.game_map.width, (self.camera.x + self.view_panel_width) // tile_size + 1)
         end_tile_y = min(self.game_map.height, (self.camera.y + self.view_panel_height) // tile_size + 1)
+        if start_tile_x >= end_tile_x or start_tile_y >= end_tile_y:
+            return
         
-        for tile_x in range(start_tile_x, end_tile_x):
-            for tile_y in range(start_tile_y, end_tile_y):
-                tile = self.game_map.get_tile(tile_x, tile_y)
-                if tile and tile.item_type:
-                    # Hide player start in play mode
-                    if self.mode == EditorMode.PLAY and tile.item_type == ItemType.PLAYER_START:
+        offset_x = self.view_panel_x - self.camera.x
+        offset_y = self.view_panel_y - self.camera.y
+        atlas = self.sprite_atlas_32.surface
+        areas = self._tile_areas_by_code()
+        if self.mode == EditorMode.PLAY:
+            areas[PLAYER_START_CODE] = None  # Hide player start in play mode
+        
+        blit_list = []
+        chunks = self.active_map.chunks
+        for chunk_y in range(start_tile_y // CHUNK_SIZE, (end_tile_y - 1) // CHUNK_SIZE + 1):
+            for chunk_x in range(start_tile_x // CHUNK_SIZE, (end_tile_x - 1) // CHUNK_SIZE + 1):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if not chunk:
+                    continue
+                for (tile_x, tile_y), code in chunk.items():
+                    if not (start_tile_x <= tile_x < end_tile_x and start_tile_y <= tile_y < end_tile_y):
                         continue
-                    
-                    # Calculate tile screen position
-                    screen_x = self.view_panel_x + (tile_x * tile_size) - self.camera.x
-                    screen_y = self.view_panel_y + (tile_y * tile_size) - self.camera.y
-                    
-                    # Only render if within view panel bounds
-                    if (screen_x + tile_size > self.view_panel_x and 
-                        screen_x < self.view_panel_x + self.view_panel_width and
-                        screen_y + tile_size > self.view_panel_y and
-                        screen_y < self.view_panel_y + self.view_panel_height):
-                        
-                        # Clip to view panel boundaries
-                        clip_rect = pygame.Rect(self.view_panel_x, self.view_panel_y,
-                                              self.view_panel_width, self.view_panel_height)
-                        self.screen.set_clip(clip_rect)
-                        
-                        # Use cached sprite for performance
-                        cached_sprite = self.sprite_cache_32.get(tile.item_type.value)
-                        if cached_sprite:
-                            self.screen.blit(cached_sprite, (screen_x, screen_y))
-                        else:
-                            item_def = get_item_definition(tile.item_type)
-                            pygame.draw.rect(self.screen, item_def.color,
-                                           (screen_x, screen_y, tile_size, tile_size))
-                        
-                        pygame.draw.rect(self.screen, (255, 255, 255),
-                                       (screen_x, screen_y, tile_size, tile_size), 1)
-                        
-                        self.screen.set_clip(None)
+                    area = areas[code]
+                    if area:
+                        blit_list.append((atlas,
+                                          (offset_x + tile_x * tile_size, offset_y + tile_y * tile_size),
+                                          area))
+        
+        if not blit_list:
+            return
+        
+        # Clip to view panel boundaries
+        clip_rect = pygame.Rect(self.view_panel_x, self.view_panel_y,
+                                self.view_panel_width, self.view_panel_height)
+        self.screen.set_clip(clip_rect)
+        self.screen.blits(blit_list, False)
+        self.screen.set_clip(None)
+    
+    def _tile_areas_by_code(self) -> List[Optional[pygame.Rect]]:
+        """Atlas cell of every item code for this frame (animated types use their current frame)"""
+        rects = self.sprite_atlas_32.rects
+        frames = self.animation_frames
+        areas: List[Optional[pygame.Rect]] = [None]
+        for item_type in ITEM_TYPES_BY_CODE[1:]:
+            frame = frames.get(ITEM_REGISTRY[item_type].sprite, 0)
+            areas.append(rects.get(frame_key(item_type.value, frame)) or rects.get(item_type.value))
+        return areas
     
     def render_cursor_preview(self):
         """Render selected item cursor preview"""
         if not self.selected_item or self.mode != EditorMode.EDIT:
             return
         
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        mouse_x, mouse_y = self.mouse_pos
         
         # Show snap preview when over view panel
         if mouse_x >= self.view_panel_x and mouse_y >= self.view_panel_y:
@@ -769,12 +1318,63 @@ class MapEditor:
             pygame.draw.rect(self.screen, (255, 255, 0),
                            (mouse_x - 15, mouse_y - 15, 30, 30), 2)
     
+    def start_recording(self, path: str):
+        """Record this session's input frame by frame (see session_record)"""
+        self.stop_recording()
+        self.recorder = SessionRecorder(path)
+        self.logger.log(f"Recording session: {path}", (255, 100, 100))
+    
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.logger.log(f"Recorded {self.recorder.frames} frames: {self.recorder.path}", (180, 180, 180))
+            self.recorder = None
+    
+    def replay(self, path: str) -> Dict[str, float]:
+        """Run a recorded session as fast as possible and return frame time stats
+        
+        Every recorded frame goes through handle_events/update/render with its
+        recorded events, frame time and held keys. Time based autosave is off
+        (it would fire at different frames). "diverged_at" is the first frame
+        whose mode differs from the recording, or -1.
+        """
+        frames = read_session(path)
+        self.autosave_interval_ms = float("inf")
+        frame_times = []
+        diverged_at = -1
+        for index, frame in enumerate(frames):
+            start = time.perf_counter()
+            self.handle_events(frame.events)
+            self.update(frame.frame_ms, HeldKeys(frame.held))
+            self.render()
+            frame_times.append(time.perf_counter() - start)
+            if diverged_at < 0 and EDITOR_MODES[frame.mode] != self.mode:
+                diverged_at = index
+            if not self.running:
+                break
+        stats = frame_time_stats(frame_times)
+        stats["recorded_s"] = frames[-1].time_ms / 1000 if frames else 0.0
+        stats["diverged_at"] = diverged_at
+        return stats
+    
     def run(self):
         """메인 루프"""
         while self.running:
-            self.handle_events()
-            self.update()
+            frame_ms = self.clock.get_time()
+            events = pygame.event.get()
+            keys = pygame.key.get_pressed()
+            recorder = self.recorder
+            if recorder:
+                recorder.record_events(events)
+            self.handle_events(events)
+            self.update(frame_ms, keys)
             self.render()
+            if recorder:
+                recorder.end_frame(frame_ms, held_mask(keys), EDITOR_MODES.index(self.mode))
             self.clock.tick(60)
         
+        # Flush pending saves before exiting
+        self.stop_recording()
+        self.sprite_watcher.shutdown()
+        self.saver.shutdown()
         pygame.quit()
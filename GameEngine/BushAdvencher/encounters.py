@@ -0,0 +1,250 @@
+"""
+Random monster encounters in bush regions
+
+Encounter tiles (items.json "encounter": true, i.e. bushes) are grouped into
+4-connected regions that GameMap keeps labelled on every tile change, so
+during play an encounter check is a dict lookup plus one RNG roll no matter
+how large the map is.
+
+Each region uses the encounter table of its size tier (encounters.json:
+the table with the largest `min_size` not above the region's tile count),
+so a lone bush only has meadow monsters and a big forest has its own.
+Rolls come from a seeded RNG, so a replayed session meets the same monsters.
+"""
+import json
+import os
+import random
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from map_data import GameMap
+
+ENCOUNTER_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "encounters.json")
+
+Pos = Tuple[int, int]
+
+
+class BushRegions:
+    """Connected regions of encounter tiles (region labels, updated per set_tile)
+    
+    Each tile maps directly to its region id, and each region keeps its
+    tiles, so find() is one lookup. Whenever regions merge or split, only
+    the smaller side is relabelled: joining regions moves the smaller one
+    into the larger, and a removed tile is checked for a split by searching
+    from its neighbours at the same pace until they meet again. A side that
+    runs out first is cut off and gets a new label. That costs about as much
+    as the smaller side, not the whole region.
+    Each region also keeps an anchor, one of its tiles, as a stable name.
+    """
+    def __init__(self):
+        self.region_of: Dict[Pos, int] = {}
+        self.tiles: Dict[int, Set[Pos]] = {}
+        self.anchors: Dict[int, Pos] = {}
+        self._next_id = 0
+    
+    def __len__(self) -> int:
+        return len(self.tiles)
+    
+    def copy(self) -> 'BushRegions':
+        regions = BushRegions()
+        regions.region_of = dict(self.region_of)
+        regions.tiles = {rid: set(tiles) for rid, tiles in self.tiles.items()}
+        regions.anchors = dict(self.anchors)
+        regions._next_id = self._next_id
+        return regions
+    
+    def find(self, pos: Pos) -> Optional[int]:
+        """Region id of a tile (None = not an encounter tile)"""
+        return self.region_of.get(pos)
+    
+    def size(self, rid: int) -> int:
+        return len(self.tiles[rid])
+    
+    def _new_region(self, tiles: Set[Pos], anchor: Pos) -> int:
+        rid = self._next_id
+        self._next_id += 1
+        self.tiles[rid] = tiles
+        self.anchors[rid] = anchor
+        for pos in tiles:
+            self.region_of[pos] = rid
+        return rid
+    
+    def _merge(self, a: int, b: int) -> int:
+        """Merge two regions (the smaller one is relabelled), returns the survivor"""
+        if len(self.tiles[a]) < len(self.tiles[b]):
+            a, b = b, a
+        moved = self.tiles.pop(b)
+        for tile in moved:
+            self.region_of[tile] = a
+        self.tiles[a] |= moved
+        del self.anchors[b]
+        return a
+    
+    def add(self, pos: Pos):
+        """An encounter tile was placed: join it with its neighbours' regions"""
+        region_of = self.region_of
+        if pos in region_of:
+            return
+        x, y = pos
+        rid = None
+        for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            other = region_of.get(n)
+            if other is None or other == rid:
+                continue
+            rid = other if rid is None else self._merge(rid, other)
+        if rid is None:
+            self._new_region({pos}, pos)
+            return
+        self.tiles[rid].add(pos)
+        region_of[pos] = rid
+    
+    def remove(self, pos: Pos):
+        """An encounter tile was removed: split its region if that cut it apart"""
+        region_of = self.region_of
+        rid = region_of.pop(pos, None)
+        if rid is None:
+            return
+        tiles = self.tiles[rid]
+        tiles.discard(pos)
+        if not tiles:
+            del self.tiles[rid]
+            del self.anchors[rid]
+            return
+        x, y = pos
+        starts = [n for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)) if region_of.get(n) == rid]
+        if self.anchors[rid] == pos:
+            self.anchors[rid] = starts[0]
+        if len(starts) > 1:
+            self._split(rid, starts)
+    
+    def _split(self, rid: int, starts: List[Pos]):
+        """Search from each start in turn, one tile per step, merging searches that meet.
+        
+        A search that runs out of tiles before meeting the others is a
+        separate piece: it gets a new region. It is never larger than the
+        pieces still being searched. The search stops as soon as one piece
+        is left, which keeps the old id.
+        """
+        region_of = self.region_of
+        owner: Dict[Pos, int] = {}  # Tile -> search that reached it first
+        merged_into = list(range(len(starts)))
+        queues = {}
+        members = {}
+        for i, start in enumerate(starts):
+            owner[start] = i
+            queues[i] = deque([start])
+            members[i] = [start]
+        
+        def group(i: int) -> int:
+            while merged_into[i] != i:
+                i = merged_into[i]
+            return i
+        
+        while len(queues) > 1:
+            for i in list(queues):
+                if i not in queues:
+                    continue  # Merged into another search this round
+                queue = queues[i]
+                if not queue:
+                    # Cut off from the rest: relabel this piece only
+                    piece = set(members.pop(i))
+                    del queues[i]
+                    self.tiles[rid] -= piece
+                    self._new_region(piece, starts[i])
+                    if len(queues) == 1:
+                        break
+                    continue
+                x, y = queue.popleft()
+                for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                    if region_of.get(n) != rid:
+                        continue
+                    other = owner.get(n)
+                    if other is None:
+                        owner[n] = i
+                        members[i].append(n)
+                        queue.append(n)
+                        continue
+                    other = group(other)
+                    if other != i:
+                        # The two searches met: same piece
+                        merged_into[other] = i
+                        queue.extend(queues.pop(other))
+                        members[i].extend(members.pop(other))
+                if len(queues) == 1:
+                    break
+        
+        survivor = next(iter(queues))
+        if region_of[self.anchors[rid]] != rid:
+            self.anchors[rid] = starts[survivor]
+
+
+class EncounterTable:
+    """Encounter rate and weighted monster list for one region size tier"""
+    def __init__(self, table_id: str, name: str, min_size: int, rate: float, monsters: List[Tuple[str, int]]):
+        self.table_id = table_id
+        self.name = name
+        self.min_size = min_size  # Smallest region (tiles) that uses this table
+        self.rate = rate  # Chance per step onto an encounter tile
+        self.monsters = [monster for monster, _ in monsters]
+        self.cum_weights = []
+        total = 0
+        for _, weight in monsters:
+            total += weight
+            self.cum_weights.append(total)
+    
+    def pick(self, rng: random.Random) -> str:
+        return rng.choices(self.monsters, cum_weights=self.cum_weights)[0]
+
+
+def load_encounter_tables(filepath: str = ENCOUNTER_DATA_FILE) -> List[EncounterTable]:
+    """Encounter tables sorted by min_size (format checked)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data: List[Dict[str, Any]] = json.load(f)["tables"]
+    tables = []
+    for entry in data:
+        monsters = [(monster["id"], int(monster.get("weight", 1))) for monster in entry["monsters"]]
+        rate = float(entry["rate"])
+        if not monsters or any(weight <= 0 for _, weight in monsters) or not 0 <= rate <= 1:
+            raise ValueError(f"{filepath}: invalid encounter table {entry.get('id')!r}")
+        tables.append(EncounterTable(entry["id"], entry.get("name", entry["id"]),
+                                     int(entry.get("min_size", 1)), rate, monsters))
+    tables.sort(key=lambda table: table.min_size)
+    return tables
+
+
+class Encounter:
+    """A monster met on a tile"""
+    def __init__(self, monster: str, table: EncounterTable, anchor: Pos, pos: Pos):
+        self.monster = monster
+        self.table = table
+        self.anchor = anchor  # Region name (one of its tiles)
+        self.pos = pos
+
+
+class EncounterSystem:
+    """Rolls encounters when the player steps onto an encounter tile"""
+    def __init__(self, seed: int = 0, tables: Optional[List[EncounterTable]] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tables = load_encounter_tables() if tables is None else tables
+    
+    def table_for(self, size: int) -> Optional[EncounterTable]:
+        """Table of the largest size tier a region of `size` tiles reaches"""
+        found = None
+        for table in self.tables:
+            if table.min_size > size:
+                break
+            found = table
+        return found
+    
+    def check(self, game_map: 'GameMap', x: int, y: int) -> Optional[Encounter]:
+        """Called once per tile the player enters"""
+        regions = game_map.bush_regions
+        rid = regions.find((x, y)) if regions is not None else None
+        if rid is None:
+            return None
+        table = self.table_for(regions.size(rid))
+        if table is None or self.rng.random() >= table.rate:
+            return None
+        return Encounter(table.pick(self.rng), table, regions.anchors[rid], (x, y))
@@ -0,0 +1,44 @@
+"""
+Per-frame input event pipeline
+
+Events are read once per frame and runs of consecutive MOUSEMOTION events
+are merged into one event, so a high polling rate mouse costs one handler
+call per frame instead of one per report. The merged event keeps every
+position of the run in `path` (oldest first) for tools that paint along
+the stroke. Only event types the editor handles are let into the queue.
+"""
+import pygame
+from typing import Iterable, List
+
+
+def allow_only(event_types: Iterable[int]):
+    """Block every event type except event_types (SDL drops the rest before queueing)"""
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(list(event_types))
+
+
+def _merge_motion(run: List[pygame.event.Event]) -> pygame.event.Event:
+    last = run[-1]
+    if len(run) == 1:
+        rel = last.rel
+    else:
+        rel = (sum(event.rel[0] for event in run), sum(event.rel[1] for event in run))
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=last.pos, rel=rel, buttons=last.buttons,
+                              path=[event.pos for event in run])
+
+
+def coalesce_motion(events: Iterable[pygame.event.Event]) -> List[pygame.event.Event]:
+    """Merge each run of MOUSEMOTION events; other events keep their order"""
+    coalesced = []
+    run = []
+    for event in events:
+        if event.type == pygame.MOUSEMOTION:
+            run.append(event)
+            continue
+        if run:
+            coalesced.append(_merge_motion(run))
+            run = []
+        coalesced.append(event)
+    if run:
+        coalesced.append(_merge_motion(run))
+    return coalesced
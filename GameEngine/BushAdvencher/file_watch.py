@@ -0,0 +1,62 @@
+"""
+File watching by mtime polling (background thread, no external services)
+"""
+import os
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class FileWatcher:
+    """Polls one file's mtime/size and loads it on a background thread when it changes
+    
+    The loader runs on the watcher thread, so parsing a large file never
+    stalls a frame. Loaded results are queued and picked up from the main
+    thread with poll().
+    """
+    def __init__(self, filepath: str, loader: Callable[[str], Any], interval: float = 0.5):
+        self.filepath = filepath
+        self.loader = loader
+        self.interval = interval
+        self._results: "queue.Queue[Tuple[Any, Optional[Exception]]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._last_stat = self._stat()  # Current file counts as already loaded
+        self._thread = threading.Thread(target=self._run, name="FileWatcher", daemon=True)
+        self._thread.start()
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            current = self._stat()
+            if current is None or current == self._last_stat:
+                continue
+            self._last_stat = current
+            try:
+                self._results.put((self.loader(self.filepath), None))
+            except Exception as e:
+                # Typically a half-written file: the next write triggers another load
+                self._results.put((None, e))
+    
+    def poll(self, log: Callable[[str, Tuple[int, int, int]], None]) -> List[Any]:
+        """Loaded results since the last call, oldest first (call from main thread)"""
+        results = []
+        while True:
+            try:
+                result, error = self._results.get_nowait()
+            except queue.Empty:
+                return results
+            if error is not None:
+                log(f"Reload of {self.filepath} failed: {error}", (255, 100, 100))
+            else:
+                results.append(result)
+    
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stop polling"""
+        self._stop.set()
+        self._thread.join(timeout)
@@ -0,0 +1,164 @@
+"""
+Field of view and fog of war for play mode
+
+Sight is computed with recursive shadowcasting (eight octants, each scanned
+row by row outwards, with blocked slope ranges skipped). Opaque tiles come
+from item_types.OPAQUE (items.json "opaque", default: not walkable). Opaque
+tiles are visible themselves but hide what is behind them. The map edge
+blocks sight too.
+
+FogOfWar only recomputes when the player is on a new tile or the map
+changed. Visible tiles are kept as one byte per map tile (index
+y * width + x), explored tiles as one bit per map tile; a recompute only
+clears and relights the square around the player. The overlay for
+the tiles on screen is built once per sight or view change: one pixel per
+tile, then scaled to tile size. Between changes it is only blitted at the
+camera offset.
+"""
+import pygame
+from typing import Optional, Tuple, TYPE_CHECKING
+from item_types import OPAQUE
+
+if TYPE_CHECKING:
+    from map_data import GameMap
+
+Pos = Tuple[int, int]
+
+# Overlay alpha: never seen / seen before but out of sight now
+FOG_UNEXPLORED_ALPHA = 255
+FOG_EXPLORED_ALPHA = 150
+
+# Octant transforms (xx, xy, yx, yy): octant coordinates -> map offsets
+_OCTANTS = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+
+def compute_fov(game_map: 'GameMap', origin_x: int, origin_y: int, radius: int,
+                visible: Optional[bytearray] = None) -> bytearray:
+    """Tiles visible from the origin within radius (the origin included)
+    
+    Returns a bitmap with 1 at y * width + x for every visible tile. Pass
+    `visible` to fill an existing bitmap (tiles are only set, never cleared).
+    """
+    width, height = game_map.width, game_map.height
+    if visible is None:
+        visible = bytearray(width * height)
+    visible[origin_y * width + origin_x] = 1
+    get_code = game_map.get_code
+    radius_squared = radius * radius
+    
+    def opaque(x: int, y: int) -> bool:
+        return not (0 <= x < width and 0 <= y < height) or OPAQUE[get_code(x, y)] == 1
+    
+    def cast(row: int, start: float, end: float, xx: int, xy: int, yx: int, yy: int):
+        # start/end: slopes of the lit sector (start >= end), row: distance from the origin
+        if start < end:
+            return
+        new_start = start
+        for distance in range(row, radius + 1):
+            dy = -distance
+            blocked = False
+            for dx in range(-distance, 1):
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                x = origin_x + dx * xx + dy * xy
+                y = origin_y + dx * yx + dy * yy
+                if dx * dx + dy * dy <= radius_squared and 0 <= x < width and 0 <= y < height:
+                    visible[y * width + x] = 1
+                if blocked:
+                    if opaque(x, y):
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif opaque(x, y) and distance < radius:
+                    # The rest of this sector continues past the blocker on the next row
+                    blocked = True
+                    cast(distance + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+    
+    for octant in _OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return visible
+
+
+class FogOfWar:
+    """Visible tiles around the player plus an explored bitmap for one play session"""
+    def __init__(self, width: int, height: int, radius: int = 8):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.explored = bytearray((width * height + 7) >> 3)  # bit (y * width + x)
+        self.visible = bytearray(width * height)  # byte (y * width + x): in sight now
+        self.origin: Optional[Pos] = None
+        self._lit: Optional[Tuple[int, int, int, int]] = None  # Tile box the visible tiles are in
+        self.version = 0  # Bumped on every recompute (overlay cache key)
+        self.recomputes = 0
+        self._overlay: Optional[pygame.Surface] = None
+        self._overlay_key = None
+    
+    def is_visible(self, x: int, y: int) -> bool:
+        return self.visible[y * self.width + x] == 1
+    
+    def _sight_box(self, x: int, y: int) -> Tuple[int, int, int, int]:
+        """Tiles [x0, x1) x [y0, y1) within radius of (x, y), clipped to the map"""
+        r = self.radius
+        return max(0, x - r), max(0, y - r), min(self.width, x + r + 1), min(self.height, y + r + 1)
+    
+    def is_explored(self, x: int, y: int) -> bool:
+        index = y * self.width + x
+        return bool(self.explored[index >> 3] & (1 << (index & 7)))
+    
+    def invalidate(self):
+        """The map changed: recompute on the next update()"""
+        self.origin = None
+    
+    def update(self, game_map: 'GameMap', x: int, y: int) -> bool:
+        """Recompute sight if the player moved to another tile (True if it did)"""
+        if (x, y) == self.origin:
+            return False
+        self.origin = (x, y)
+        visible, explored, width = self.visible, self.explored, self.width
+        if self._lit is not None:
+            x0, y0, x1, y1 = self._lit
+            for row in range(y0, y1):
+                visible[row * width + x0:row * width + x1] = bytes(x1 - x0)
+        compute_fov(game_map, x, y, self.radius, visible)
+        self._lit = x0, y0, x1, y1 = self._sight_box(x, y)
+        for row in range(y0, y1):
+            for index in range(row * width + x0, row * width + x1):
+                if visible[index]:
+                    explored[index >> 3] |= 1 << (index & 7)
+        self.version += 1
+        self.recomputes += 1
+        return True
+    
+    def overlay(self, start_x: int, start_y: int, end_x: int, end_y: int, tile_size: int) -> pygame.Surface:
+        """Fog surface for tiles [start, end) (cached until sight or the tile range changes)"""
+        key = (self.version, start_x, start_y, end_x, end_y, tile_size)
+        if key == self._overlay_key:
+            return self._overlay
+        columns, rows = end_x - start_x, end_y - start_y
+        pixels = bytearray(columns * rows * 4)  # Black, alpha set per tile below
+        visible, explored = self.visible, self.explored
+        alpha = 3
+        for y in range(start_y, end_y):
+            row = y * self.width
+            for index in range(row + start_x, row + end_x):
+                if not visible[index]:
+                    seen = explored[index >> 3] & (1 << (index & 7))
+                    pixels[alpha] = FOG_EXPLORED_ALPHA if seen else FOG_UNEXPLORED_ALPHA
+                alpha += 4
+        # Converted to the display format first: blitting a foreign pixel format is many times slower
+        small = pygame.image.frombuffer(bytes(pixels), (columns, rows), 'RGBA').convert_alpha()
+        self._overlay = pygame.transform.scale(small, (columns * tile_size, rows * tile_size))
+        self._overlay_key = key
+        return self._overlay
@@ -1,22 +1,57 @@
 """
 아이템 타입 정의
+
+정의는 items.json에서 읽어 온다. 각 타입에는 파일 순서대로 1부터 작은 정수
+코드가 붙고 (0 = 빈 타일), 자주 쓰는 속성은 코드로 바로 인덱싱하는 표로
+컴파일된다 (WALKABLE[code], ITEM_COLORS[code] ...).
+새 타입은 파일 끝에 추가할 것 (편집 저널이 코드로 기록됨).
 """
+import json
+import os
 from enum import Enum
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+ITEM_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "items.json")
+
+# 코드에서 직접 참조하는 타입
+REQUIRED_ITEMS = ["player_start"]
+
+
+def load_item_data(filepath: str = ITEM_DATA_FILE) -> List[Dict[str, Any]]:
+    """아이템 정의 파일 읽기 (형식 검사 포함)"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        items = json.load(f)["items"]
+    seen = set()
+    for item in items:
+        item_id = item["id"]
+        if not item_id.isidentifier() or item_id in seen:
+            raise ValueError(f"{filepath}: invalid or duplicate item id {item_id!r}")
+        seen.add(item_id)
+    for item_id in REQUIRED_ITEMS:
+        if item_id not in seen:
+            raise ValueError(f"{filepath}: missing required item {item_id!r}")
+    return items
 
-class ItemType(Enum):
-    PLAYER_START = "player_start"
-    BUSH = "bush"
-    STONE = "stone"
+
+_ITEM_DATA = load_item_data()
+
+# 아이템 타입 (items.json의 id -> ItemType.ID)
+ItemType = Enum("ItemType", [(item["id"].upper(), item["id"]) for item in _ITEM_DATA])
 
 class ItemDefinition:
     """아이템의 정의(타입, 색상, 충돌 가능 여부 등)"""
-    def __init__(self, item_type: ItemType, name: str, color: tuple, walkable: bool, unique: bool = False):
+    def __init__(self, item_type: ItemType, name: str, color: tuple, walkable: bool, unique: bool = False,
+                 code: int = 0, sprite: Optional[str] = None, encounter: bool = False,
+                 opaque: Optional[bool] = None):
         self.item_type = item_type
         self.name = name
         self.color = color  # RGB
         self.walkable = walkable  # 플레이어가 지나갈 수 있는지
         self.unique = unique  # 맵에 하나만 배치 가능한지
+        self.code = code  # 맵 저장용 정수 코드 (1부터)
+        self.sprite = sprite or item_type.value  # sprites.json 키 (여러 타입이 공유 가능)
+        self.encounter = encounter  # 밟으면 몬스터가 나올 수 있는지 (덤불)
+        self.opaque = (not walkable) if opaque is None else opaque  # 시야를 가리는지 (기본: 못 지나가는 타일)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -26,29 +61,37 @@ class ItemDefinition:
             "unique": self.unique
         }
 
-# 아이템 정의 레지스트리
-ITEM_REGISTRY = {
-    ItemType.PLAYER_START: ItemDefinition(
-        ItemType.PLAYER_START,
-        "Player Start",
-        (255, 0, 0),  # 빨간색
-        True,
-        unique=True  # 맵에 하나만 배치 가능
-    ),
-    ItemType.BUSH: ItemDefinition(
-        ItemType.BUSH,
-        "Bush",
-        (34, 139, 34),  # 어두운 녹색
-        True  # 지나갈 수 있음
-    ),
-    ItemType.STONE: ItemDefinition(
-        ItemType.STONE,
-        "Stone",
-        (128, 128, 128),  # 회색
-        False  # 지나갈 수 없음
+# 아이템 정의 레지스트리 (파일 순서 = 코드 순서)
+ITEM_REGISTRY: Dict[ItemType, ItemDefinition] = {
+    ItemType(item["id"]): ItemDefinition(
+        ItemType(item["id"]),
+        item.get("name", item["id"]),
+        tuple(item["color"]),
+        bool(item.get("walkable", True)),
+        unique=bool(item.get("unique", False)),
+        code=code,
+        sprite=item.get("sprite"),
+        encounter=bool(item.get("encounter", False)),
+        opaque=item.get("opaque")
     )
+    for code, item in enumerate(_ITEM_DATA, start=1)
 }
 
+# 코드로 인덱싱하는 표 (0 = 빈 타일)
+ITEM_TYPES_BY_CODE: List[Optional[ItemType]] = [None] + list(ITEM_REGISTRY)
+ITEM_CODES: Dict[ItemType, int] = {item_type: item_def.code for item_type, item_def in ITEM_REGISTRY.items()}
+WALKABLE = bytearray([1] + [item_def.walkable for item_def in ITEM_REGISTRY.values()])  # 빈 타일은 이동 가능
+UNIQUE = bytearray([0] + [item_def.unique for item_def in ITEM_REGISTRY.values()])
+ENCOUNTER = bytearray([0] + [item_def.encounter for item_def in ITEM_REGISTRY.values()])
+OPAQUE = bytearray([0] + [bool(item_def.opaque) for item_def in ITEM_REGISTRY.values()])
+ITEM_COLORS: List[Tuple[int, int, int]] = [(0, 0, 0)] + [item_def.color for item_def in ITEM_REGISTRY.values()]
+
+PLAYER_START_CODE = ITEM_CODES[ItemType.PLAYER_START]
+
 def get_item_definition(item_type: ItemType) -> ItemDefinition:
     """아이템 타입으로 정의 가져오기"""
     return ITEM_REGISTRY[item_type]
+
+def item_code(item_type: Optional[ItemType]) -> int:
+    """아이템 타입 -> 정수 코드 (None = 0)"""
+    return 0 if item_type is None else ITEM_CODES[item_type]
@@ -1,10 +1,45 @@
 """
 BushAdvencher Map Editor
 메인 실행 파일
+    
+    python main.py                     편집기 실행
+    python main.py --record FILE       세션 입력을 FILE에 녹화하며 실행
+    python main.py --replay FILE       녹화된 세션을 화면 없이 최대 속도로 재생, 프레임 시간 통계 출력
 """
-from editor import MapEditor
+import os
+import sys
+
+
+def replay_main(path: str):
+    """Replay a session on copies of the map/sprite files (the real ones are never written)"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from editor import MapEditor
+    from session_record import replay_workdir
+    import map_journal
+    
+    path = os.path.abspath(path)
+    files = ["map_save.json", map_journal.journal_path("map_save.json"), "sprites.json"]
+    with replay_workdir(files):
+        editor = MapEditor(1200, 800)
+        stats = editor.replay(path)
+        editor.sprite_watcher.shutdown()
+        editor.saver.shutdown()
+    print(f"Replayed {stats['frames']} frames ({stats.get('recorded_s', 0):.1f}s recorded) "
+          f"in {stats.get('total_s', 0):.2f}s")
+    if stats["frames"]:
+        print(f"frame ms: mean {stats['mean_ms']:.2f}  p50 {stats['p50_ms']:.2f}  "
+              f"p95 {stats['p95_ms']:.2f}  p99 {stats['p99_ms']:.2f}  max {stats['max_ms']:.2f}")
+    if stats["diverged_at"] >= 0:
+        print(f"WARNING: mode diverged from the recording at frame {stats['diverged_at']}")
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--replay":
+        replay_main(sys.argv[2])
+        sys.exit()
+    
+    from editor import MapEditor
+    
     print("=" * 50)
     print("BushAdvencher Map Editor")
     print("=" * 50)
@@ -28,4 +63,6 @@ if __name__ == "__main__":
     print()
     
     editor = MapEditor(1200, 800)
+    if len(sys.argv) > 2 and sys.argv[1] == "--record":
+        editor.start_recording(sys.argv[2])
     editor.run()
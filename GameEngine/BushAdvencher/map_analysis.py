@@ -0,0 +1,195 @@
+"""
+Map reachability analysis: which walkable tiles the player can reach
+
+The walkability grid is one byte per tile, built from the placed tiles
+only (empty tiles are walkable). Reachable tiles are flood-filled from the
+player start run by run: each run is found with bytearray find/rfind and
+cleared with one slice assignment, so the work grows with the number of
+runs, not the number of tiles. Whatever is still set afterwards is walkable
+but walled off. Those leftovers are grouped into pockets (connected
+regions) so a designer can jump to them.
+
+Batch check of saved maps (edit journals included), exit status 1 if any
+map has unreachable tiles or no player start:
+
+    python map_analysis.py <map.json | directory> ...
+"""
+import json
+import os
+import sys
+from typing import List, Optional, Tuple
+
+import pygame
+
+from item_types import WALKABLE
+from map_data import GameMap
+
+Pos = Tuple[int, int]
+
+# Overlay: red over unreachable walkable tiles
+UNREACHABLE_COLOR = (255, 40, 40)
+UNREACHABLE_ALPHA = 110
+_ALPHA_TABLE = bytes([0, UNREACHABLE_ALPHA]) + bytes(254)
+
+
+def walkable_grid(game_map: GameMap) -> bytearray:
+    """1 per walkable tile, row-major (index = y * width + x)"""
+    width = game_map.width
+    grid = bytearray([WALKABLE[0]]) * (width * game_map.height)
+    for chunk in game_map.chunks.values():
+        for (x, y), code in chunk.items():
+            grid[y * width + x] = WALKABLE[code]
+    return grid
+
+
+def _fill(grid: bytearray, width: int, start: int) -> int:
+    """Clear the 4-connected region of 1s containing grid[start]; returns tiles cleared"""
+    size = len(grid)
+    cleared = 0
+    stack = [start]
+    while stack:
+        i = stack.pop()
+        if not grid[i]:
+            continue  # Reached from another run already
+        row = i - i % width
+        row_end = row + width
+        left = grid.rfind(0, row, i)
+        left = row if left < 0 else left + 1
+        right = grid.find(0, i, row_end)
+        if right < 0:
+            right = row_end
+        grid[left:right] = bytes(right - left)
+        cleared += right - left
+        # Seed one tile of every run above/below that touches [left, right)
+        for offset in (-width, width):
+            j = left + offset
+            end = right + offset
+            if j < 0 or end > size:
+                continue
+            while True:
+                j = grid.find(1, j, end)
+                if j < 0:
+                    break
+                stack.append(j)
+                j = grid.find(0, j, end)
+                if j < 0:
+                    break
+    return cleared
+
+
+class Reachability:
+    """Result of analyze(): reach from the player start and the walled-off pockets"""
+    def __init__(self, width: int, height: int, start: Optional[Pos], walkable: int, reachable: int,
+                 unreachable: bytearray, pockets: List[Tuple[Pos, int]]):
+        self.width = width
+        self.height = height
+        self.start = start  # Player start (None: not placed)
+        self.walkable = walkable  # Walkable tiles (empty ones included)
+        self.reachable = reachable
+        self.unreachable = unreachable  # 1 per walkable tile the player cannot reach
+        self.pockets = pockets  # (first tile, size) per walled-off region, largest first
+        self._overlay: Optional[pygame.Surface] = None
+        self._overlay_key = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.start is not None and not self.pockets
+    
+    def summary(self) -> str:
+        if self.start is None:
+            return "no player start"
+        if not self.pockets:
+            return f"all {self.walkable} walkable tiles reachable"
+        largest, size = self.pockets[0]
+        return (f"{self.walkable - self.reachable} unreachable tile(s) in {len(self.pockets)} pocket(s), "
+                f"largest {size} at {largest}")
+    
+    def overlay(self, start_x: int, start_y: int, end_x: int, end_y: int, tile_size: int) -> pygame.Surface:
+        """Overlay for tiles [start, end) (cached until the tile range changes)"""
+        key = (start_x, start_y, end_x, end_y, tile_size)
+        if key == self._overlay_key:
+            return self._overlay
+        columns, rows = end_x - start_x, end_y - start_y
+        alpha = b"".join(self.unreachable[y * self.width + start_x:y * self.width + end_x]
+                         for y in range(start_y, end_y)).translate(_ALPHA_TABLE)
+        count = columns * rows
+        pixels = bytearray(count * 4)
+        for channel, value in enumerate(UNREACHABLE_COLOR):
+            pixels[channel::4] = bytes([value]) * count
+        pixels[3::4] = alpha
+        small = pygame.image.frombuffer(bytes(pixels), (columns, rows), 'RGBA').convert_alpha()
+        self._overlay = pygame.transform.scale(small, (columns * tile_size, rows * tile_size))
+        self._overlay_key = key
+        return self._overlay
+
+
+def analyze(game_map: GameMap) -> Reachability:
+    """Flood fill from the player start over the walkability grid"""
+    width, height = game_map.width, game_map.height
+    grid = walkable_grid(game_map)
+    walkable = grid.count(1)
+    start = game_map.player_start
+    reachable = 0
+    if start is not None and grid[start[1] * width + start[0]]:
+        reachable = _fill(grid, width, start[1] * width + start[0])
+    # grid now holds exactly the walkable tiles left unreached
+    pockets = []
+    if start is not None:
+        scratch = bytearray(grid)
+        i = scratch.find(1)
+        while i >= 0:
+            pockets.append(((i % width, i // width), _fill(scratch, width, i)))
+            i = scratch.find(1, i)
+        pockets.sort(key=lambda pocket: -pocket[1])
+    return Reachability(width, height, start, walkable, reachable, grid, pockets)
+
+
+def _map_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".json"))
+        else:
+            files.append(path)
+    return files
+
+
+def _is_map_file(path: str) -> bool:
+    """Saved map (sprites.json, items.json ... are skipped)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(data, dict) and {"width", "height", "tiles"} <= data.keys()
+
+
+def main(argv: List[str]) -> int:
+    if not argv:
+        print("usage: python map_analysis.py <map.json | directory> ...")
+        return 2
+    failed = 0
+    checked = 0
+    for path in _map_files(argv):
+        if not _is_map_file(path):
+            continue
+        checked += 1
+        try:
+            game_map, _ = GameMap.load_with_journal(path)
+        except Exception as e:
+            print(f"{path}: load failed: {e}")
+            failed += 1
+            continue
+        result = analyze(game_map)
+        status = "OK  " if result.ok else "FAIL"
+        print(f"{status} {path} ({game_map.width}x{game_map.height}): {result.summary()}")
+        for (x, y), size in result.pockets[1:5]:
+            print(f"       pocket of {size} at ({x}, {y})")
+        if not result.ok:
+            failed += 1
+    print(f"{checked} map(s) checked, {failed} with problems")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,8 +2,20 @@
 맵 데이터 구조 및 저장/불러오기
 """
 import json
-from typing import List, Dict, Any, Optional, Tuple
-from item_types import ItemType
+import os
+from collections import ChainMap
+from typing import List, Dict, Any, Optional, Tuple, Set
+from item_types import ItemType, ITEM_TYPES_BY_CODE, WALKABLE, UNIQUE, ENCOUNTER, PLAYER_START_CODE, item_code
+from encounters import BushRegions
+from async_save import atomic_write_json
+import map_journal
+
+# 청크 한 변의 타일 개수 (스냅샷/자동 저장 단위)
+CHUNK_SIZE = 16
+
+ChunkKey = Tuple[int, int]
+# 청크: 타일 좌표 -> 아이템 코드 (item_types.ITEM_TYPES_BY_CODE 인덱스)
+Chunk = Dict[Tuple[int, int], int]
 
 class MapTile:
     """맵의 한 타일"""
@@ -24,57 +36,171 @@ class MapTile:
         item_type = ItemType(data["item_type"]) if data["item_type"] else None
         return MapTile(data["x"], data["y"], item_type)
 
+def _tile_dict(pos: Tuple[int, int], code: int) -> Dict[str, Any]:
+    """청크 항목 하나를 저장 형식으로 (MapTile.to_dict와 같은 형식)"""
+    return {"x": pos[0], "y": pos[1], "item_type": ITEM_TYPES_BY_CODE[code].value}
+
 class GameMap:
     """게임 맵 데이터"""
     def __init__(self, width: int, height: int, tile_size: int = 32):
         self.width = width  # 타일 개수
         self.height = height
         self.tile_size = tile_size  # 픽셀 단위
-        self.tiles: Dict[Tuple[int, int], MapTile] = {}
-        self.player_start: Optional[Tuple[int, int]] = None
+        # 유일 아이템 코드 -> 배치 위치 (플레이어 스타트 등)
+        self.unique_tiles: Dict[int, Tuple[int, int]] = {}
+        
+        # 타일은 CHUNK_SIZE x CHUNK_SIZE 청크 단위로, 아이템 코드로 보관
+        self.chunks: Dict[ChunkKey, Chunk] = {}
+        # 스냅샷과 공유 중인 청크 (쓰기 전에 복제해야 함)
+        self._shared_chunks: Set[ChunkKey] = set()
+        # 마지막 자동 저장 이후 변경된 청크
+        self.dirty_chunks: Set[ChunkKey] = set()
+        # 저널에 아직 기록되지 않은 set_tile 호출
+        self.pending_ops: List[map_journal.TileOp] = []
+        # set_tile마다 증가 (분석 결과 캐시 무효화용)
+        self.revision = 0
+        # 인카운터 타일(덤불)의 연결 영역 (None = 추적 안 함, 저장용 스냅샷)
+        self.bush_regions: Optional[BushRegions] = BushRegions()
+    
+    @staticmethod
+    def chunk_key(x: int, y: int) -> ChunkKey:
+        """타일 좌표가 속한 청크 키"""
+        return (x // CHUNK_SIZE, y // CHUNK_SIZE)
+    
+    @property
+    def player_start(self) -> Optional[Tuple[int, int]]:
+        """플레이어 스타트 위치"""
+        return self.unique_tiles.get(PLAYER_START_CODE)
+    
+    def _writable_chunk(self, key: ChunkKey) -> Chunk:
+        """쓰기 가능한 청크 가져오기 (공유 중이면 복제)"""
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = {}
+            self.chunks[key] = chunk
+        elif key in self._shared_chunks:
+            # Copy-on-write: 스냅샷이 보고 있는 청크는 건드리지 않는다
+            chunk = dict(chunk)
+            self.chunks[key] = chunk
+            self._shared_chunks.discard(key)
+        self.dirty_chunks.add(key)
+        return chunk
+    
+    def _remove_tile(self, x: int, y: int):
+        """타일 제거 (빈 청크 정리 포함)"""
+        key = self.chunk_key(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is None or (x, y) not in chunk:
+            return
+        chunk = self._writable_chunk(key)
+        code = chunk.pop((x, y))
+        if UNIQUE[code] and self.unique_tiles.get(code) == (x, y):
+            del self.unique_tiles[code]
+        if ENCOUNTER[code] and self.bush_regions is not None:
+            self._writable_regions().remove((x, y))
+        if not chunk:
+            self._drop_chunk(key)
+    
+    def _drop_chunk(self, key: ChunkKey):
+        """비어 버린 청크 정리"""
+        del self.chunks[key]
+    
+    def _writable_regions(self) -> BushRegions:
+        """갱신할 덤불 영역"""
+        return self.bush_regions
     
     def set_tile(self, x: int, y: int, item_type: Optional[ItemType]) -> bool:
         """타일에 아이템 배치"""
         if not (0 <= x < self.width and 0 <= y < self.height):
             return False
         
-        # 플레이어 스타트는 하나만 배치 가능
-        if item_type == ItemType.PLAYER_START:
-            # 기존 플레이어 스타트 제거
-            if self.player_start:
-                old_x, old_y = self.player_start
-                if (old_x, old_y) in self.tiles:
-                    del self.tiles[(old_x, old_y)]
-            self.player_start = (x, y)
+        code = item_code(item_type)
+        if self.get_code(x, y) == code:
+            return True  # 같은 아이템을 다시 칠하거나 빈 타일을 지움: 변경 없음
         
-        if item_type is None:
-            # 타일 제거
-            if (x, y) in self.tiles:
-                # 플레이어 스타트였다면 초기화
-                if self.tiles[(x, y)].item_type == ItemType.PLAYER_START:
-                    self.player_start = None
-                del self.tiles[(x, y)]
-        else:
-            self.tiles[(x, y)] = MapTile(x, y, item_type)
+        # 기존 타일 제거 (유일 아이템 위치 정리 포함)
+        self._remove_tile(x, y)
         
+        if code:
+            # 유일 아이템(플레이어 스타트 등)은 하나만 배치 가능: 기존 것 제거
+            if UNIQUE[code] and code in self.unique_tiles:
+                self._remove_tile(*self.unique_tiles[code])
+            self._put_code(x, y, code, self._writable_chunk(self.chunk_key(x, y)))
+        
+        self.pending_ops.append((x, y, item_type))
+        self.revision += 1
         return True
     
+    def _put_code(self, x: int, y: int, code: int, chunk: Chunk):
+        chunk[(x, y)] = code
+        if UNIQUE[code]:
+            self.unique_tiles[code] = (x, y)
+        if ENCOUNTER[code] and self.bush_regions is not None:
+            self._writable_regions().add((x, y))
+    
+    def get_code(self, x: int, y: int) -> int:
+        """타일의 아이템 코드 (빈 타일 = 0)"""
+        chunk = self.chunks.get((x // CHUNK_SIZE, y // CHUNK_SIZE))
+        if chunk is None:
+            return 0
+        return chunk.get((x, y), 0)
+    
     def get_tile(self, x: int, y: int) -> Optional[MapTile]:
         """타일 가져오기"""
-        return self.tiles.get((x, y))
+        code = self.get_code(x, y)
+        if not code:
+            return None
+        return MapTile(x, y, ITEM_TYPES_BY_CODE[code])
     
     def is_walkable(self, x: int, y: int) -> bool:
-        """해당 위치로 이동 가능한지 확인"""
+        """해당 위치로 이동 가능한지 확인 (코드로 표 조회)"""
         if not (0 <= x < self.width and 0 <= y < self.height):
             return False
+        return WALKABLE[self.get_code(x, y)] == 1
+    
+    def snapshot(self) -> 'GameMap':
+        """현재 상태의 스냅샷 (청크 공유, 이후 쓰기 시 복제)
         
-        tile = self.get_tile(x, y)
-        if tile is None:
-            return True  # 빈 타일은 이동 가능
-        
-        from item_types import get_item_definition
-        item_def = get_item_definition(tile.item_type)
-        return item_def.walkable
+        청크 수에 비례하는 얕은 복사만 하므로 메인 루프에서 바로 호출할 수 있다.
+        """
+        snap = GameMap(self.width, self.height, self.tile_size)
+        snap.unique_tiles = dict(self.unique_tiles)
+        snap.bush_regions = None  # 저장에만 쓰므로 영역은 추적하지 않는다
+        snap.chunks = dict(self.chunks)
+        keys = set(self.chunks.keys())
+        snap._shared_chunks = set(keys)
+        self._shared_chunks |= keys
+        return snap
+    
+    def play_view(self) -> 'MapView':
+        """플레이 모드용 copy-on-write 뷰 (맵 크기와 무관하게 O(1))"""
+        return MapView(self)
+    
+    def take_dirty_chunks(self) -> Set[ChunkKey]:
+        """변경된 청크 목록을 가져오고 초기화"""
+        dirty = self.dirty_chunks
+        self.dirty_chunks = set()
+        return dirty
+    
+    def take_pending_ops(self) -> List[map_journal.TileOp]:
+        """저널에 기록할 set_tile 목록을 가져오고 초기화"""
+        ops = self.pending_ops
+        self.pending_ops = []
+        return ops
+    
+    def chunk_to_list(self, key: ChunkKey) -> List[Dict[str, Any]]:
+        """청크 하나를 직렬화 (빈 청크는 빈 리스트)"""
+        chunk = self.chunks.get(key, {})
+        return [_tile_dict(pos, code) for pos, code in chunk.items()]
+    
+    def meta_dict(self) -> Dict[str, Any]:
+        """타일을 제외한 맵 메타데이터"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "tile_size": self.tile_size,
+            "player_start": list(self.player_start) if self.player_start else None
+        }
     
     def to_dict(self) -> Dict[str, Any]:
         """맵을 딕셔너리로 변환 (저장용)"""
@@ -82,27 +208,31 @@ class GameMap:
             "width": self.width,
             "height": self.height,
             "tile_size": self.tile_size,
-            "tiles": [tile.to_dict() for tile in self.tiles.values()],
+            "tiles": [_tile_dict(pos, code)
+                      for chunk in self.chunks.values()
+                      for pos, code in chunk.items()],
             "player_start": list(self.player_start) if self.player_start else None
         }
     
+    def _put_tile(self, tile: MapTile):
+        """불러오기용 타일 배치 (규칙 검사 없이)"""
+        code = item_code(tile.item_type)
+        if code:
+            key = self.chunk_key(tile.x, tile.y)
+            self._put_code(tile.x, tile.y, code, self.chunks.setdefault(key, {}))
+    
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> 'GameMap':
         """딕셔너리에서 맵 로드"""
         game_map = GameMap(data["width"], data["height"], data["tile_size"])
         for tile_data in data["tiles"]:
-            tile = MapTile.from_dict(tile_data)
-            game_map.tiles[(tile.x, tile.y)] = tile
-        
-        if data.get("player_start"):
-            game_map.player_start = tuple(data["player_start"])
-        
+            game_map._put_tile(MapTile.from_dict(tile_data))
+        # player_start는 타일에서 복원됨 ("player_start" 항목은 호환용)
         return game_map
     
     def save_to_file(self, filepath: str):
-        """맵을 JSON 파일로 저장"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        """맵을 JSON 파일로 저장 (임시 파일 + rename으로 원자적 저장)"""
+        atomic_write_json(filepath, self.to_dict(), indent=2)
     
     @staticmethod
     def load_from_file(filepath: str) -> 'GameMap':
@@ -110,3 +240,79 @@ class GameMap:
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return GameMap.from_dict(data)
+    
+    @staticmethod
+    def load_with_journal(filepath: str, recover: bool = False) -> Tuple['GameMap', int]:
+        """JSON 파일 + 편집 저널의 저장된(commit) 기록을 재생해서 로드
+        
+        recover=True면 마지막 commit 이후의 미저장 편집도 재생한다 (크래시 복구).
+        반환: (맵, 저널에 남은 미저장 편집 수)
+        """
+        game_map = GameMap.load_from_file(filepath)
+        committed, uncommitted = map_journal.read_ops(map_journal.journal_path(filepath))
+        for x, y, item_type in (committed + uncommitted if recover else committed):
+            game_map.set_tile(x, y, item_type)
+        # 재생한 편집은 이미 저널에 있음
+        game_map.pending_ops.clear()
+        game_map.dirty_chunks.clear()
+        return game_map, len(uncommitted)
+    
+    @staticmethod
+    def load_from_autosave(dirpath: str) -> 'GameMap':
+        """청크 단위 자동 저장 폴더에서 맵 로드"""
+        with open(os.path.join(dirpath, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        game_map = GameMap(meta["width"], meta["height"], meta["tile_size"])
+        for name in os.listdir(dirpath):
+            if not (name.startswith("chunk_") and name.endswith(".json")):
+                continue
+            with open(os.path.join(dirpath, name), 'r', encoding='utf-8') as f:
+                for tile_data in json.load(f):
+                    game_map._put_tile(MapTile.from_dict(tile_data))
+        return game_map
+
+class MapView(GameMap):
+    """원본 맵 위에 겹친 copy-on-write 뷰 (플레이 모드용)
+    
+    만들 때 청크를 복사하지 않고 원본 청크를 그대로 읽는다. 처음 쓰는 청크만
+    복제해 자기 쪽(overlay)에 두므로 플레이 중 변경은 원본 맵에 절대 반영되지
+    않고, 뷰를 버리면 그대로 사라진다 (저장/저널 대상이 아니다).
+    뷰를 쓰는 동안 원본 맵은 수정하지 않는다고 가정한다 (플레이 중 편집 불가).
+    """
+    def __init__(self, base: GameMap):
+        super().__init__(base.width, base.height, base.tile_size)
+        self.base = base
+        # 플레이 중 복제/변경된 청크 (빈 청크도 남겨서 원본 청크를 가린다)
+        self.overlay: Dict[ChunkKey, Chunk] = {}
+        self.chunks = ChainMap(self.overlay, base.chunks)
+        # 유일 아이템 종류 수만큼만 복사 (맵 크기와 무관)
+        self.unique_tiles = dict(base.unique_tiles)
+        # 덤불 영역도 공유하다가 플레이 중 덤불이 바뀌면 그때 복제
+        self.bush_regions = base.bush_regions
+        self._regions_shared = True
+    
+    def _writable_regions(self) -> BushRegions:
+        if self._regions_shared:
+            self.bush_regions = self.bush_regions.copy()
+            self._regions_shared = False
+        return self.bush_regions
+    
+    def _writable_chunk(self, key: ChunkKey) -> Chunk:
+        """쓰기 가능한 청크 가져오기 (원본 청크면 뷰 쪽으로 복제)"""
+        chunk = self.overlay.get(key)
+        if chunk is None:
+            chunk = dict(self.base.chunks.get(key, {}))
+            self.overlay[key] = chunk
+        self.dirty_chunks.add(key)
+        return chunk
+    
+    def _drop_chunk(self, key: ChunkKey):
+        # 원본에 있는 청크는 지우면 다시 보이므로 빈 청크로 남겨 가린다
+        if key not in self.base.chunks:
+            del self.overlay[key]
+    
+    def set_tile(self, x: int, y: int, item_type: Optional[ItemType]) -> bool:
+        placed = super().set_tile(x, y, item_type)
+        # 뷰의 변경은 저장/저널 대상이 아니므로 기록을 쌓아 두지 않는다
+        self.pending_ops.clear()
+        return placed
@@ -0,0 +1,156 @@
+"""
+Append-only edit journal for GameMap (binary set_tile records)
+
+File layout: header, then fixed-size records
+    header: 4-byte magic | item id list length (u16) | item ids (UTF-8, "\n"-separated)
+    record: kind (u8) | x (i32) | y (i32) | item code (u16)
+kind 0 = set_tile, kind 1 = commit marker (written on Ctrl+S).
+Item codes are the registry codes from item_types (0 = empty tile). The
+header lists the item id of every code as it was when the journal was
+started, so replay still finds the right items after items.json has been
+reordered; records are only ever appended under the same registry.
+Records after the last commit marker are unsaved edits: a normal load
+ignores them and they are only replayed when crash recovery is accepted.
+A torn trailing record (crash mid-append) is ignored.
+"""
+import os
+import struct
+from typing import List, Optional, Tuple
+from item_types import ItemType, ITEM_TYPES_BY_CODE, item_code
+
+JOURNAL_MAGIC = b"BAJ3"
+HEADER_LENGTH = struct.Struct("<H")
+RECORD = struct.Struct("<BiiH")
+KIND_SET_TILE = 0
+KIND_COMMIT = 1
+
+TileOp = Tuple[int, int, Optional[ItemType]]
+
+
+def journal_path(map_path: str) -> str:
+    """Journal file that lives next to the map file"""
+    return map_path + ".journal"
+
+
+def _registry_ids() -> List[str]:
+    """Item id of every code from 1 up, in the current registry order"""
+    return [item_type.value for item_type in ITEM_TYPES_BY_CODE[1:]]
+
+
+def _header() -> bytes:
+    ids = "\n".join(_registry_ids()).encode('utf-8')
+    return JOURNAL_MAGIC + HEADER_LENGTH.pack(len(ids)) + ids
+
+
+def _parse_header(data: bytes, path: str) -> Tuple[List[str], int]:
+    """-> (item ids by code from 1 up, offset of the first record)"""
+    start = len(JOURNAL_MAGIC) + HEADER_LENGTH.size
+    if not data.startswith(JOURNAL_MAGIC) or len(data) < start:
+        raise ValueError(f"Not a map journal: {path}")
+    length, = HEADER_LENGTH.unpack_from(data, len(JOURNAL_MAGIC))
+    if len(data) < start + length:
+        raise ValueError(f"Not a map journal: {path}")
+    ids = bytes(data[start:start + length]).decode('utf-8')
+    return (ids.split("\n") if ids else []), start + length
+
+
+def _read(path: str) -> Optional[Tuple[bytes, List[str], int]]:
+    """-> (file contents, header item ids, first record offset), None if there is no journal"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if not data:
+        return None  # Created but never written
+    ids, offset = _parse_header(data, path)
+    return data, ids, offset
+
+
+def matches_registry(path: str) -> bool:
+    """True if records can be appended (no journal yet, or started under the current item order)"""
+    read = _read(path)
+    return read is None or read[1] == _registry_ids()
+
+
+def append_ops(path: str, ops: List[TileOp], commit: bool = False):
+    """Append set_tile records (and optionally a commit marker)"""
+    parts = [RECORD.pack(KIND_SET_TILE, x, y, item_code(item_type))
+             for x, y, item_type in ops]
+    if commit:
+        parts.append(RECORD.pack(KIND_COMMIT, 0, 0, 0))
+    if not parts:
+        return
+    read = _read(path)
+    if read is not None and read[1] != _registry_ids():
+        raise ValueError(f"Journal was started with another item order: {path}")
+    with open(path, 'ab') as f:
+        if read is None:
+            f.write(_header())
+        else:
+            # Drop a torn record left by a crash so new records stay aligned
+            data, _, offset = read
+            torn = (len(data) - offset) % RECORD.size
+            if torn:
+                f.truncate(len(data) - torn)
+        f.write(b"".join(parts))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _records(data: bytes, offset: int):
+    body = memoryview(data)[offset:]
+    return RECORD.iter_unpack(body[:len(body) - len(body) % RECORD.size])
+
+
+def read_ops(path: str) -> Tuple[List[TileOp], List[TileOp]]:
+    """Read the journal -> (committed ops, uncommitted ops)"""
+    read = _read(path)
+    if read is None:
+        return [], []
+    data, ids, offset = read
+    # Journal codes -> current item types, matched by id
+    items: List[Optional[ItemType]] = [None]
+    for item_id in ids:
+        try:
+            items.append(ItemType(item_id))
+        except ValueError:
+            raise ValueError(f"Unknown item in journal: {item_id!r}") from None
+    
+    committed: List[TileOp] = []
+    tail: List[TileOp] = []
+    for kind, x, y, code in _records(data, offset):
+        if kind == KIND_COMMIT:
+            committed.extend(tail)
+            tail = []
+        elif code < len(items):
+            tail.append((x, y, items[code]))
+        else:
+            raise ValueError(f"Unknown item code in journal: {code}")
+    return committed, tail
+
+
+def drop_uncommitted(path: str) -> int:
+    """Cut the records after the last commit marker (unsaved edits that
+    were not recovered), returns how many set_tile records were dropped"""
+    read = _read(path)
+    if read is None:
+        return 0
+    data, _, offset = read
+    end = offset
+    for index, (kind, _, _, _) in enumerate(_records(data, offset)):
+        if kind == KIND_COMMIT:
+            end = offset + (index + 1) * RECORD.size
+    dropped = (len(data) - end) // RECORD.size
+    if end < len(data):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+    return dropped
+
+
+def reset(path: str):
+    """Drop all records (after the base file has been rewritten)"""
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,201 @@
+"""
+Paint tools over the PixelSprite RGBA buffer
+
+Pixels are handled as one 32-bit word each (memoryview cast to 'I'), so
+whole spans are written with a single slice assignment instead of a
+per-pixel Python loop.
+"""
+import re
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pixel_editor import PixelSprite
+
+Point = Tuple[int, int]
+
+TOOLS = ["pen", "line", "rect", "ellipse", "fill"]
+BRUSH_SIZES = [1, 2, 3, 5]
+
+
+def color_word(color: Optional[Tuple[int, int, int]]) -> int:
+    """Pack a color (None = transparent) the way it sits in the buffer"""
+    if color is None:
+        return 0
+    return array('I', bytes((color[0], color[1], color[2], 255)))[0]
+
+
+def _words(sprite: 'PixelSprite') -> memoryview:
+    return memoryview(sprite.data).cast('I')
+
+
+def fill_span(sprite: 'PixelSprite', y: int, x0: int, x1: int, word: int):
+    """Set pixels x0..x1 (inclusive) of row y, clipped to the sprite"""
+    if not (0 <= y < sprite.height):
+        return
+    x0 = max(0, x0)
+    x1 = min(sprite.width - 1, x1)
+    if x0 > x1:
+        return
+    start = y * sprite.width
+    _words(sprite)[start + x0:start + x1 + 1] = array('I', [word]) * (x1 - x0 + 1)
+
+
+def stamp(sprite: 'PixelSprite', x: int, y: int, size: int, word: int):
+    """Square brush of size x size pixels centred on (x, y)"""
+    half = (size - 1) // 2
+    for row in range(y - half, y - half + size):
+        fill_span(sprite, row, x - half, x - half + size - 1, word)
+
+
+def line_points(x0: int, y0: int, x1: int, y1: int) -> List[Point]:
+    """Bresenham line from (x0, y0) to (x1, y1), both ends included"""
+    points = []
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    while True:
+        points.append((x0, y0))
+        if x0 == x1 and y0 == y1:
+            return points
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+
+
+def rect_points(x0: int, y0: int, x1: int, y1: int) -> List[Point]:
+    """Outline of the rectangle with corners (x0, y0) and (x1, y1)"""
+    left, right = min(x0, x1), max(x0, x1)
+    top, bottom = min(y0, y1), max(y0, y1)
+    points = [(x, top) for x in range(left, right + 1)]
+    if bottom != top:
+        points += [(x, bottom) for x in range(left, right + 1)]
+    points += [(left, y) for y in range(top + 1, bottom)]
+    if right != left:
+        points += [(right, y) for y in range(top + 1, bottom)]
+    return points
+
+
+def ellipse_points(x0: int, y0: int, x1: int, y1: int) -> List[Point]:
+    """Outline of the ellipse inscribed in the box (x0, y0)-(x1, y1)
+
+    Integer midpoint algorithm that also handles even widths/heights
+    (A. Zingl, "A Rasterizing Algorithm for Drawing Curves").
+    """
+    x0, x1 = min(x0, x1), max(x0, x1)
+    y0, y1 = min(y0, y1), max(y0, y1)
+    a = x1 - x0
+    b = y1 - y0
+    b1 = b & 1
+    dx = 4 * (1 - a) * b * b
+    dy = 4 * (b1 + 1) * a * a
+    err = dx + dy + b1 * a * a
+    y0 += (b + 1) // 2
+    y1 = y0 - b1
+    a *= 8 * a
+    b1 = 8 * b * b
+
+    points = []
+    while True:
+        points += [(x1, y0), (x0, y0), (x0, y1), (x1, y1)]
+        e2 = 2 * err
+        if e2 <= dy:
+            y0 += 1
+            y1 -= 1
+            dy += a
+            err += dy
+        if e2 >= dx or 2 * err > dy:
+            x0 += 1
+            x1 -= 1
+            dx += b1
+            err += dx
+        if x0 > x1:
+            break
+    # Flat ellipses: finish the tips
+    while y0 - y1 < b:
+        points += [(x0 - 1, y0), (x1 + 1, y0), (x0 - 1, y1), (x1 + 1, y1)]
+        y0 += 1
+        y1 -= 1
+    return points
+
+
+def stroke(sprite: 'PixelSprite', points: List[Point], size: int, word: int):
+    """Stamp the brush at every point"""
+    if size == 1:
+        width, height = sprite.width, sprite.height
+        words = _words(sprite)
+        for x, y in points:
+            if 0 <= x < width and 0 <= y < height:
+                words[y * width + x] = word
+    else:
+        for x, y in points:
+            stamp(sprite, x, y, size, word)
+
+
+def _run_pattern(target: int) -> 're.Pattern':
+    """Regex that splits a row into word-aligned runs: group 1 = target pixels"""
+    word = re.escape(array('I', [target]).tobytes())
+    return re.compile(b"(?s)((?:" + word + b")+)|(?:(?!" + word + b")....)+")
+
+
+def flood_fill(sprite: 'PixelSprite', x: int, y: int, word: int) -> int:
+    """Scanline flood fill (4-connected) from (x, y); returns pixels filled
+
+    Works on runs instead of pixels: each row's runs of the target color
+    are found once with a regex over the raw buffer, then filled with one
+    slice assignment and used to seed the neighbouring rows.
+    """
+    width, height = sprite.width, sprite.height
+    if not (0 <= x < width and 0 <= y < height):
+        return 0
+    words = _words(sprite)
+    target = words[y * width + x]
+    if target == word:
+        return 0
+
+    pattern = _run_pattern(target)
+    row_bytes = width * 4
+    runs = {}  # row -> (starts, ends) of unfilled target runs, ends inclusive
+
+    def row_runs(row: int) -> Tuple[List[int], List[int]]:
+        if row not in runs:
+            starts, ends = [], []
+            base = row * row_bytes
+            for match in pattern.finditer(sprite.data, base, base + row_bytes):
+                if match.group(1):
+                    starts.append((match.start() - base) // 4)
+                    ends.append((match.end() - base) // 4 - 1)
+            runs[row] = (starts, ends)
+        return runs[row]
+
+    filled = 0
+    stack = [(x, y)]
+    while stack:
+        sx, sy = stack.pop()
+        starts, ends = row_runs(sy)
+        i = bisect_right(starts, sx) - 1
+        if i < 0 or ends[i] < sx:
+            continue  # Already filled
+        left = starts.pop(i)
+        right = ends.pop(i)
+        row = sy * width
+        words[row + left:row + right + 1] = array('I', [word]) * (right - left + 1)
+        filled += right - left + 1
+
+        # Seed every run above/below that touches this span
+        for ny in (sy - 1, sy + 1):
+            if 0 <= ny < height:
+                n_starts, n_ends = row_runs(ny)
+                j = max(0, bisect_right(n_starts, left) - 1)
+                while j < len(n_starts) and n_starts[j] <= right:
+                    if n_ends[j] >= left:
+                        stack.append((n_starts[j], ny))
+                    j += 1
+    return filled
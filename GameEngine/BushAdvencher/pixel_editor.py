@@ -2,56 +2,79 @@
 Pixel art editor for custom item sprites
 """
 import pygame
+from bisect import bisect_right
 from typing import List, Dict, Any, Optional, Tuple
 import json
-from item_types import ItemType
+import hashlib
+import numpy
+from item_types import ItemType, get_item_definition
+from async_save import atomic_write_json
+import paint_tools
+
+# Supported sprite sizes (pixels per side)
+MIN_SPRITE_SIZE = 16
+MAX_SPRITE_SIZE = 256
+SPRITE_SIZES = [16, 32, 64, 128, 256]
+
+# Animation frame durations (ms)
+DEFAULT_FRAME_DURATION = 150
+MIN_FRAME_DURATION = 20
+MAX_FRAME_DURATION = 5000
 
 class PixelSprite:
     """Pixel art sprite data"""
     def __init__(self, width: int = 32, height: int = 32):
         self.width = width
         self.height = height
-        # Grid of RGB colors (None = transparent)
-        self.pixels: List[List[Optional[Tuple[int, int, int]]]] = [
-            [None for _ in range(width)] for _ in range(height)
-        ]
+        # Flat RGBA buffer, 4 bytes per pixel (alpha 0 = transparent)
+        self.data = bytearray(width * height * 4)
     
     def set_pixel(self, x: int, y: int, color: Optional[Tuple[int, int, int]]):
         """Set pixel color"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.pixels[y][x] = color
+            i = (y * self.width + x) * 4
+            if color:
+                self.data[i:i + 4] = bytes((color[0], color[1], color[2], 255))
+            else:
+                self.data[i:i + 4] = b"\x00\x00\x00\x00"
     
     def get_pixel(self, x: int, y: int) -> Optional[Tuple[int, int, int]]:
         """Get pixel color"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.pixels[y][x]
+            i = (y * self.width + x) * 4
+            if self.data[i + 3]:
+                return (self.data[i], self.data[i + 1], self.data[i + 2])
         return None
     
     def clear(self):
         """Clear all pixels"""
-        self.pixels = [[None for _ in range(self.width)] for _ in range(self.height)]
+        self.data = bytearray(self.width * self.height * 4)
     
     def fill(self, color: Tuple[int, int, int]):
         """Fill with solid color"""
-        self.pixels = [[color for _ in range(self.width)] for _ in range(self.height)]
+        self.data = bytearray(bytes((color[0], color[1], color[2], 255)) * (self.width * self.height))
     
     def copy(self) -> 'PixelSprite':
         """Create a deep copy of this sprite"""
         new_sprite = PixelSprite(self.width, self.height)
-        new_sprite.pixels = [
-            [pixel for pixel in row]
-            for row in self.pixels
-        ]
+        new_sprite.data = bytearray(self.data)
         return new_sprite
     
+    def restore(self, other: 'PixelSprite'):
+        """Take over size and pixels of another sprite (undo/redo)"""
+        self.width = other.width
+        self.height = other.height
+        self.data = bytearray(other.data)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON"""
         return {
             "width": self.width,
             "height": self.height,
             "pixels": [
-                [list(pixel) if pixel else None for pixel in row]
-                for row in self.pixels
+                [list(pixel) if pixel else None
+                 for pixel in (self.get_pixel(x, y) for x in range(self.width))]
+                for y in range(self.height)
             ]
         }
     
@@ -59,75 +82,267 @@ class PixelSprite:
     def from_dict(data: Dict[str, Any]) -> 'PixelSprite':
         """Create from dictionary"""
         sprite = PixelSprite(data["width"], data["height"])
-        sprite.pixels = [
-            [tuple(pixel) if pixel else None for pixel in row]
-            for row in data["pixels"]
-        ]
+        for y, row in enumerate(data["pixels"]):
+            for x, pixel in enumerate(row):
+                if pixel:
+                    sprite.set_pixel(x, y, tuple(pixel))
         return sprite
     
+    def to_surface(self) -> pygame.Surface:
+        """1 surface pixel per sprite pixel (SRCALPHA)"""
+        return pygame.image.frombuffer(self.data, (self.width, self.height), "RGBA").copy()
+    
+    def _box_downsample(self, target_w: int, target_h: int) -> bytearray:
+        """Average each block of source pixels into one target pixel
+        
+        Colors are weighted by alpha so transparent pixels don't darken edges.
+        Blocks are uneven when the sizes are not integer multiples (source
+        pixel x goes to target pixel x * target // source).
+        """
+        pixels = numpy.frombuffer(self.data, dtype=numpy.uint8).reshape(self.height, self.width, 4)
+        # r*a, g*a, b*a, a per source pixel (255 * 255 fits in 16 bits)
+        weighted = numpy.empty(pixels.shape, dtype=numpy.uint16)
+        numpy.multiply(pixels[:, :, :3], pixels[:, :, 3:], out=weighted[:, :, :3], dtype=numpy.uint16)
+        weighted[:, :, 3] = pixels[:, :, 3]
+        sums = weighted
+        block_sizes = []
+        for axis, source, target in ((0, self.height, target_h), (1, self.width, target_w)):
+            # First source row/column of every target block (same split as x * target // source)
+            starts = numpy.array([-(-k * source // target) for k in range(target)])
+            sizes = numpy.diff(numpy.append(starts, source))
+            sums = numpy.add.reduceat(sums, numpy.minimum(starts, source - 1), axis=axis, dtype=numpy.int64)
+            # reduceat returns the start element for empty blocks (target larger than source)
+            empty = sizes == 0
+            if empty.any():
+                index = [slice(None)] * 3
+                index[axis] = empty
+                sums[tuple(index)] = 0
+            block_sizes.append(sizes)
+        
+        alpha_sum = sums[:, :, 3]
+        counts = numpy.maximum(numpy.outer(*block_sizes), 1)
+        out = numpy.zeros((target_h, target_w, 4), dtype=numpy.uint8)
+        out[:, :, :3] = sums[:, :, :3] // numpy.maximum(alpha_sum, 1)[:, :, None]
+        out[:, :, 3] = alpha_sum // counts
+        out[alpha_sum == 0] = 0
+        return bytearray(out.tobytes())
+    
+    def resized(self, width: int, height: int) -> 'PixelSprite':
+        """Resampled copy (nearest when enlarging, box filter when shrinking)"""
+        new_sprite = PixelSprite(width, height)
+        if width <= self.width and height <= self.height:
+            new_sprite.data = self._box_downsample(width, height)
+        else:
+            scaled = pygame.transform.scale(self.to_surface(), (width, height))
+            new_sprite.data = bytearray(pygame.image.tostring(scaled, "RGBA"))
+        return new_sprite
+    
     def render_to_surface(self, size: int) -> pygame.Surface:
-        """Render to pygame surface with precise pixel alignment"""
-        surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        pixel_size = size / self.width  # Use float for precise calculation
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                color = self.pixels[y][x]
-                if color:
-                    # Calculate exact pixel boundaries
-                    px = int(x * pixel_size)
-                    py = int(y * pixel_size)
-                    pw = int((x + 1) * pixel_size) - px
-                    ph = int((y + 1) * pixel_size) - py
-                    
-                    rect = pygame.Rect(px, py, pw, ph)
-                    pygame.draw.rect(surface, color, rect)
-        
-        return surface
+        """Render to a size x size surface
+        
+        Enlarging uses nearest-neighbour (crisp pixel art); shrinking a
+        high-detail sprite to the tile size uses a box filter.
+        """
+        if size < self.width or size < self.height:
+            data = self._box_downsample(size, size)
+            return pygame.image.frombuffer(data, (size, size), "RGBA").copy()
+        return pygame.transform.scale(self.to_surface(), (size, size))
+
+
+class SpriteAnimation:
+    """Frames of an animated sprite with per-frame durations (ms)
+    
+    The frame shown at a given time only depends on the clock, so every
+    tile of one item type shows the same frame.
+    """
+    def __init__(self, frames: List[PixelSprite], durations: List[int]):
+        self.frames = frames
+        self.durations = durations
+        self._update_timeline()
+    
+    def _update_timeline(self):
+        """Cumulative frame end times for frame lookup by bisection"""
+        self.frame_ends: List[int] = []
+        total = 0
+        for duration in self.durations:
+            total += duration
+            self.frame_ends.append(total)
+        self.total_ms = total
+    
+    def frame_index(self, time_ms: int) -> int:
+        """Frame shown at time_ms of the looping animation"""
+        return bisect_right(self.frame_ends, time_ms % self.total_ms)
+    
+    def insert_frame(self, index: int, frame: PixelSprite, duration: int):
+        """Insert a frame before `index`"""
+        self.frames.insert(index, frame)
+        self.durations.insert(index, duration)
+        self._update_timeline()
+    
+    def remove_frame(self, index: int):
+        """Delete one frame"""
+        del self.frames[index]
+        del self.durations[index]
+        self._update_timeline()
+    
+    def set_duration(self, index: int, duration: int):
+        """Change how long one frame is shown (clamped)"""
+        self.durations[index] = max(MIN_FRAME_DURATION, min(MAX_FRAME_DURATION, duration))
+        self._update_timeline()
 
 
 class PixelSpriteLibrary:
-    """Manage all custom sprites"""
+    """Manage all custom sprites
+    
+    `sprites` holds the first (or only) frame of every sprite; animated
+    sprites also have an entry in `animations` whose frame 0 is that sprite.
+    Entries are keyed by the item definition's sprite key, so several item
+    types can share one sprite.
+    """
     def __init__(self, filepath: str = "sprites.json"):
         self.filepath = filepath
         self.sprites: Dict[str, PixelSprite] = {}
+        self.animations: Dict[str, SpriteAnimation] = {}
+        # Digest of each entry as last loaded/saved (hot reload skips unchanged entries)
+        self._entry_digests: Dict[str, str] = {}
         self.load()
     
     def get_sprite(self, item_type: ItemType) -> Optional[PixelSprite]:
         """Get sprite for item type"""
-        return self.sprites.get(item_type.value)
+        return self.sprites.get(self.sprite_key(item_type))
+    
+    @staticmethod
+    def sprite_key(item_type: ItemType) -> str:
+        """Library key of an item type's sprite"""
+        return get_item_definition(item_type).sprite
     
     def set_sprite(self, item_type: ItemType, sprite: PixelSprite):
         """Set sprite for item type"""
-        self.sprites[item_type.value] = sprite
+        key = self.sprite_key(item_type)
+        self.sprites[key] = sprite
+        animation = self.animations.get(key)
+        if animation:
+            animation.frames[0] = sprite
+    
+    def get_animation(self, item_type: ItemType) -> Optional[SpriteAnimation]:
+        """Animation of an item type (None if it has a single frame)"""
+        return self.animations.get(self.sprite_key(item_type))
+    
+    def get_frames(self, item_type: ItemType) -> List[PixelSprite]:
+        """All frames of an item's sprite (empty if it has none)"""
+        key = self.sprite_key(item_type)
+        animation = self.animations.get(key)
+        if animation:
+            return animation.frames
+        sprite = self.sprites.get(key)
+        return [sprite] if sprite else []
+    
+    def add_frame(self, item_type: ItemType, index: int) -> int:
+        """Duplicate frame `index` right after itself; returns the new frame's index"""
+        key = self.sprite_key(item_type)
+        animation = self.animations.get(key)
+        if not animation:
+            animation = SpriteAnimation([self.sprites[key]], [DEFAULT_FRAME_DURATION])
+            self.animations[key] = animation
+        animation.insert_frame(index + 1, animation.frames[index].copy(), animation.durations[index])
+        return index + 1
+    
+    def remove_frame(self, item_type: ItemType, index: int) -> bool:
+        """Delete one frame (the last remaining frame is kept)"""
+        key = self.sprite_key(item_type)
+        animation = self.animations.get(key)
+        if not animation:
+            return False
+        animation.remove_frame(index)
+        self.sprites[key] = animation.frames[0]
+        if len(animation.frames) == 1:
+            del self.animations[key]
+        return True
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy all sprites into plain JSON data (safe to hand to another thread)
+        
+        Animated sprites store frame 0 as usual plus the other frames and
+        all durations, so single-frame files are unchanged.
+        """
+        data = {}
+        for key, sprite in self.sprites.items():
+            sprite_data = sprite.to_dict()
+            animation = self.animations.get(key)
+            if animation:
+                sprite_data["frames"] = [frame.to_dict() for frame in animation.frames[1:]]
+                sprite_data["durations"] = list(animation.durations)
+            data[key] = sprite_data
+        # The file will hold exactly this data: don't hot-reload our own save
+        self._entry_digests = {key: self._digest(sprite_data) for key, sprite_data in data.items()}
+        return data
+    
+    @staticmethod
+    def _digest(sprite_data: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(sprite_data, sort_keys=True).encode()).hexdigest()
+    
+    @staticmethod
+    def read_entries(filepath: str) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Parse a sprite file -> {key: (digest, sprite data)} (safe off the main thread)"""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        return {
+            key: (PixelSpriteLibrary._digest(sprite_data), sprite_data)
+            for key, sprite_data in data.items()
+        }
+    
+    def _load_entry(self, key: str, sprite_data: Dict[str, Any]):
+        """Build one sprite (and its animation frames) from JSON data"""
+        sprite = PixelSprite.from_dict(sprite_data)
+        self.sprites[key] = sprite
+        self.animations.pop(key, None)
+        if sprite_data.get("frames"):
+            frames = [sprite] + [PixelSprite.from_dict(frame) for frame in sprite_data["frames"]]
+            durations = [max(MIN_FRAME_DURATION, min(MAX_FRAME_DURATION, int(ms)))
+                         for ms in sprite_data.get("durations") or []]
+            durations = (durations + [DEFAULT_FRAME_DURATION] * len(frames))[:len(frames)]
+            self.animations[key] = SpriteAnimation(frames, durations)
+    
+    def apply_entries(self, entries: Dict[str, Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Hot reload: rebuild only entries whose digest changed; returns changed keys
+        
+        Entries gone from the file are dropped, unless they were never
+        saved (a sprite just created in the editor).
+        """
+        changed = []
+        for key, (digest, sprite_data) in entries.items():
+            if self._entry_digests.get(key) == digest:
+                continue
+            self._load_entry(key, sprite_data)
+            self._entry_digests[key] = digest
+            changed.append(key)
+        for key in [key for key in self._entry_digests if key not in entries]:
+            del self._entry_digests[key]
+            self.sprites.pop(key, None)
+            self.animations.pop(key, None)
+            changed.append(key)
+        return changed
     
     def save(self):
         """Save all sprites to JSON"""
-        data = {
-            key: sprite.to_dict()
-            for key, sprite in self.sprites.items()
-        }
-        with open(self.filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(self.filepath, self.to_dict(), indent=2)
         print(f"Sprites saved: {self.filepath}")
     
     def load(self):
         """Load sprites from JSON"""
+        self.sprites = {}
+        self.animations = {}
+        self._entry_digests = {}
         try:
-            with open(self.filepath, 'r') as f:
-                data = json.load(f)
-            
-            self.sprites = {
-                key: PixelSprite.from_dict(sprite_data)
-                for key, sprite_data in data.items()
-            }
+            self.apply_entries(self.read_entries(self.filepath))
             print(f"Sprites loaded: {self.filepath}")
         except FileNotFoundError:
             print("No sprite file found, starting fresh")
-            self.sprites = {}
         except Exception as e:
             print(f"Failed to load sprites: {e}")
             self.sprites = {}
+            self.animations = {}
+            self._entry_digests = {}
 
 
 class PixelEditorPanel:
@@ -143,8 +358,18 @@ class PixelEditorPanel:
         self.canvas_x = x + (width - self.canvas_size) // 2
         self.canvas_y = y + 60
         
-        self.grid_size = 32  # 32x32 pixel grid
-        self.pixel_size = self.canvas_size // self.grid_size
+        # Grid follows the edited sprite (16..256 per side)
+        self.grid_width = 32
+        self.grid_height = 32
+        self.pixel_size = self.canvas_size // self.grid_width  # Zoom: screen px per sprite pixel
+        self.max_pixel_size = 64
+        
+        # Pan: top-left sprite pixel shown on the canvas
+        self.view_x = 0
+        self.view_y = 0
+        self.is_panning = False
+        self.pan_start_mouse: Optional[Tuple[int, int]] = None
+        self.pan_start_view: Optional[Tuple[int, int]] = None
         
         # Current sprite being edited
         self.current_sprite: Optional[PixelSprite] = None
@@ -172,9 +397,27 @@ class PixelEditorPanel:
         
         # Drawing state
         self.is_drawing = False
+        self.tool = "pen"
+        self.brush_size = 1
+        self.last_grid: Optional[Tuple[int, int]] = None  # Last pen position (gaps are bridged with a line)
+        self.shape_anchor: Optional[Tuple[int, int]] = None  # Start point of a line/rect/ellipse drag
         
         # Reset button rect (set in render)
         self.reset_button_rect: Optional[pygame.Rect] = None
+        # Sprite size buttons (set in render)
+        self.size_button_rects: List[Tuple[int, pygame.Rect]] = []
+        # Tool and brush size buttons (set in render)
+        self.tool_button_rects: List[Tuple[str, pygame.Rect]] = []
+        self.brush_button_rects: List[Tuple[int, pygame.Rect]] = []
+        
+        # Cached canvas: sprite pixels pre-scaled on the canvas background.
+        # Painting fills only the touched cell; undo/redo/reset rebuild it.
+        self.canvas_bg_color = (60, 60, 60)
+        self.grid_line_color = (80, 80, 80)
+        self._canvas_surface: Optional[pygame.Surface] = None
+        self._canvas_dirty = True
+        self._grid_overlay: Optional[pygame.Surface] = None
+        self._small_font: Optional[pygame.font.Font] = None
     
     def set_sprite(self, sprite: PixelSprite, default_color: Optional[Tuple[int, int, int]] = None):
         """Set the sprite to edit"""
@@ -183,6 +426,133 @@ class PixelEditorPanel:
         self.undo_stack.clear()
         self.redo_stack.clear()
         self.stroke_start_state = None
+        self._reset_view()
+    
+    def _fit_pixel_size(self) -> int:
+        """Zoom at which the whole sprite fits the canvas"""
+        return max(1, self.canvas_size // max(self.grid_width, self.grid_height))
+    
+    def _visible_cells(self) -> Tuple[int, int]:
+        """Number of sprite pixels shown horizontally/vertically at the current zoom"""
+        cells = self.canvas_size // self.pixel_size
+        return min(self.grid_width, cells), min(self.grid_height, cells)
+    
+    def _clamp_view(self):
+        cols, rows = self._visible_cells()
+        self.view_x = max(0, min(self.view_x, self.grid_width - cols))
+        self.view_y = max(0, min(self.view_y, self.grid_height - rows))
+    
+    def _reset_view(self):
+        """Fit the (possibly resized) sprite to the canvas"""
+        if self.current_sprite:
+            self.grid_width = self.current_sprite.width
+            self.grid_height = self.current_sprite.height
+        self.pixel_size = self._fit_pixel_size()
+        self.view_x = 0
+        self.view_y = 0
+        self._canvas_dirty = True
+        self._grid_overlay = None
+    
+    def _set_zoom(self, pixel_size: int, anchor: Tuple[int, int]):
+        """Change zoom keeping the sprite pixel under anchor (screen pos) in place"""
+        pixel_size = max(self._fit_pixel_size(), min(pixel_size, self.max_pixel_size))
+        if pixel_size == self.pixel_size:
+            return
+        offset_x = anchor[0] - self.canvas_x
+        offset_y = anchor[1] - self.canvas_y
+        grid_x = self.view_x + offset_x / self.pixel_size
+        grid_y = self.view_y + offset_y / self.pixel_size
+        self.pixel_size = pixel_size
+        self.view_x = int(grid_x - offset_x / pixel_size)
+        self.view_y = int(grid_y - offset_y / pixel_size)
+        self._clamp_view()
+        self._canvas_dirty = True
+        self._grid_overlay = None
+    
+    def screen_to_grid(self, pos: Tuple[int, int], clamp: bool = False) -> Optional[Tuple[int, int]]:
+        """Sprite pixel under a screen position (None outside the visible grid unless clamped)"""
+        cols, rows = self._visible_cells()
+        cell_x = (pos[0] - self.canvas_x) // self.pixel_size
+        cell_y = (pos[1] - self.canvas_y) // self.pixel_size
+        if clamp:
+            cell_x = max(0, min(cols - 1, cell_x))
+            cell_y = max(0, min(rows - 1, cell_y))
+        if 0 <= cell_x < cols and 0 <= cell_y < rows:
+            return self.view_x + cell_x, self.view_y + cell_y
+        return None
+    
+    def _rebuild_canvas(self):
+        """Redraw the cached canvas for the visible part of the sprite (1px per pixel, then scaled)"""
+        cols, rows = self._visible_cells()
+        small = pygame.Surface((cols, rows))
+        small.fill(self.canvas_bg_color)
+        small.blit(self.current_sprite.to_surface(), (0, 0), (self.view_x, self.view_y, cols, rows))
+        self._canvas_surface = pygame.transform.scale(small, (cols * self.pixel_size, rows * self.pixel_size))
+        self._canvas_dirty = False
+    
+    def _update_canvas_pixel(self, grid_x: int, grid_y: int):
+        """Refresh one pixel of the cached canvas"""
+        if self._canvas_surface is None or self._canvas_dirty:
+            return  # Full rebuild pending anyway
+        cols, rows = self._visible_cells()
+        cell_x = grid_x - self.view_x
+        cell_y = grid_y - self.view_y
+        if not (0 <= cell_x < cols and 0 <= cell_y < rows):
+            return
+        color = self.current_sprite.get_pixel(grid_x, grid_y) or self.canvas_bg_color
+        self._canvas_surface.fill(color, (cell_x * self.pixel_size, cell_y * self.pixel_size,
+                                          self.pixel_size, self.pixel_size))
+    
+    def _build_grid_overlay(self) -> pygame.Surface:
+        """Grid lines drawn once onto a transparent overlay"""
+        cols, rows = self._visible_cells()
+        width = cols * self.pixel_size
+        height = rows * self.pixel_size
+        overlay = pygame.Surface((width + 1, height + 1), pygame.SRCALPHA)
+        for i in range(cols + 1):
+            # Vertical
+            pos = i * self.pixel_size
+            pygame.draw.line(overlay, self.grid_line_color, (pos, 0), (pos, height), 1)
+        for i in range(rows + 1):
+            # Horizontal
+            pos = i * self.pixel_size
+            pygame.draw.line(overlay, self.grid_line_color, (0, pos), (width, pos), 1)
+        return overlay
+    
+    def resize_sprite(self, size: int) -> bool:
+        """Resample the current sprite to size x size (undoable)"""
+        if not self.current_sprite or size not in SPRITE_SIZES:
+            return False
+        if self.current_sprite.width == size and self.current_sprite.height == size:
+            return False
+        self.undo_stack.append(self.current_sprite.copy())
+        self.redo_stack.clear()
+        self.current_sprite.restore(self.current_sprite.resized(size, size))
+        self._reset_view()
+        return True
+    
+    def handle_mouse_wheel(self, pos: Tuple[int, int], wheel_y: int):
+        """Zoom in/out around the mouse position"""
+        if not self.current_sprite:
+            return
+        if not (self.canvas_x <= pos[0] < self.canvas_x + self.canvas_size and
+                self.canvas_y <= pos[1] < self.canvas_y + self.canvas_size):
+            return
+        if wheel_y > 0:
+            self._set_zoom(self.pixel_size * 2, pos)
+        elif wheel_y < 0:
+            self._set_zoom(self.pixel_size // 2, pos)
+    
+    def start_pan(self, pos: Tuple[int, int]):
+        """Begin panning the canvas (middle mouse drag)"""
+        self.is_panning = True
+        self.pan_start_mouse = pos
+        self.pan_start_view = (self.view_x, self.view_y)
+    
+    def end_pan(self):
+        self.is_panning = False
+        self.pan_start_mouse = None
+        self.pan_start_view = None
     
     def handle_mouse_down(self, pos: Tuple[int, int]):
         """Handle mouse down"""
@@ -192,14 +562,41 @@ class PixelEditorPanel:
         if self.reset_button_rect and self.reset_button_rect.collidepoint(x, y):
             return "reset"  # Signal to editor to handle reset
         
+        # Check sprite size buttons
+        for size, rect in self.size_button_rects:
+            if rect.collidepoint(x, y):
+                if self.resize_sprite(size):
+                    return "resize"
+                return
+        
+        # Check tool and brush size buttons
+        for tool, rect in self.tool_button_rects:
+            if rect.collidepoint(x, y):
+                self.tool = tool
+                return
+        for size, rect in self.brush_button_rects:
+            if rect.collidepoint(x, y):
+                self.brush_size = size
+                return
+        
         # Check canvas
         if (self.canvas_x <= x < self.canvas_x + self.canvas_size and
             self.canvas_y <= y < self.canvas_y + self.canvas_size):
+            cell = self.screen_to_grid(pos)
+            if not self.current_sprite or not cell:
+                return
             # Save state before starting a new stroke
-            if self.current_sprite:
-                self.stroke_start_state = self.current_sprite.copy()
+            self.stroke_start_state = self.current_sprite.copy()
             self.is_drawing = True
-            self.paint_pixel(pos)
+            if self.tool == "pen":
+                self.last_grid = None
+                self.paint_pixel(pos)
+            elif self.tool == "fill":
+                if paint_tools.flood_fill(self.current_sprite, cell[0], cell[1], self._paint_word()):
+                    self._canvas_dirty = True
+            else:
+                self.shape_anchor = cell
+                self._draw_shape(cell)
         
         # Check palette
         elif self.palette_y <= y < self.palette_y + self.palette_cell_size:
@@ -225,28 +622,71 @@ class PixelEditorPanel:
             self.redo_stack.clear()
             self.stroke_start_state = None
         self.is_drawing = False
+        self.last_grid = None
+        self.shape_anchor = None
     
     def handle_mouse_motion(self, pos: Tuple[int, int]):
         """Handle mouse motion"""
-        if self.is_drawing:
-            self.paint_pixel(pos)
+        if self.is_panning and self.pan_start_mouse and self.pan_start_view:
+            new_view_x = self.pan_start_view[0] - (pos[0] - self.pan_start_mouse[0]) // self.pixel_size
+            new_view_y = self.pan_start_view[1] - (pos[1] - self.pan_start_mouse[1]) // self.pixel_size
+            if (new_view_x, new_view_y) != (self.view_x, self.view_y):
+                self.view_x, self.view_y = new_view_x, new_view_y
+                self._clamp_view()
+                self._canvas_dirty = True
+        elif self.is_drawing:
+            if self.tool == "pen":
+                self.paint_pixel(pos)
+            elif self.shape_anchor:
+                self._draw_shape(self.screen_to_grid(pos, clamp=True))
+    
+    def handle_mouse_path(self, path: List[Tuple[int, int]]):
+        """Handle coalesced mouse motion: the pen follows every point, pan and shapes only need the last"""
+        if self.is_drawing and self.tool == "pen" and not self.is_panning:
+            for pos in path:
+                self.paint_pixel(pos)
+        else:
+            self.handle_mouse_motion(path[-1])
+    
+    def _paint_word(self) -> int:
+        """Current color (or eraser) as a packed pixel"""
+        return paint_tools.color_word(None if self.eraser_mode else self.selected_color)
     
     def paint_pixel(self, pos: Tuple[int, int]):
-        """Paint pixel at mouse position"""
+        """Paint with the pen brush at mouse position"""
         if not self.current_sprite:
             return
         
-        x, y = pos
-        
         # Convert to grid coordinates
-        grid_x = (x - self.canvas_x) // self.pixel_size
-        grid_y = (y - self.canvas_y) // self.pixel_size
-        
-        if 0 <= grid_x < self.grid_size and 0 <= grid_y < self.grid_size:
-            if self.eraser_mode:
-                self.current_sprite.set_pixel(grid_x, grid_y, None)
-            else:
-                self.current_sprite.set_pixel(grid_x, grid_y, self.selected_color)
+        cell = self.screen_to_grid(pos)
+        if not cell:
+            self.last_grid = None
+            return
+        # Fast drags skip cells between motion events: join them with a line
+        if self.last_grid:
+            points = paint_tools.line_points(self.last_grid[0], self.last_grid[1], cell[0], cell[1])
+        else:
+            points = [cell]
+        self.last_grid = cell
+        paint_tools.stroke(self.current_sprite, points, self.brush_size, self._paint_word())
+        if self.brush_size == 1:
+            for grid_x, grid_y in points:
+                self._update_canvas_pixel(grid_x, grid_y)
+        else:
+            self._canvas_dirty = True
+    
+    def _draw_shape(self, cell: Tuple[int, int]):
+        """Redraw the line/rect/ellipse preview from the anchor to cell"""
+        self.current_sprite.restore(self.stroke_start_state)
+        x0, y0 = self.shape_anchor
+        if self.tool == "line":
+            points = paint_tools.line_points(x0, y0, cell[0], cell[1])
+        elif self.tool == "rect":
+            points = paint_tools.rect_points(x0, y0, cell[0], cell[1])
+        else:
+            points = paint_tools.ellipse_points(x0, y0, cell[0], cell[1])
+        paint_tools.stroke(self.current_sprite, points, self.brush_size, self._paint_word())
+        self._canvas_dirty = True
     
     def undo(self):
         """Undo last action"""
@@ -255,7 +695,7 @@ class PixelEditorPanel:
             self.redo_stack.append(self.current_sprite.copy())
             # Restore previous state
             restored_state = self.undo_stack.pop()
-            self.current_sprite.pixels = restored_state.pixels
+            self._restore_state(restored_state)
             return True
         return False
     
@@ -266,10 +706,19 @@ class PixelEditorPanel:
             self.undo_stack.append(self.current_sprite.copy())
             # Restore redo state
             restored_state = self.redo_stack.pop()
-            self.current_sprite.pixels = restored_state.pixels
+            self._restore_state(restored_state)
             return True
         return False
     
+    def _restore_state(self, state: PixelSprite):
+        """Apply an undo/redo state (refits the view if the size changed)"""
+        resized = (state.width, state.height) != (self.current_sprite.width, self.current_sprite.height)
+        self.current_sprite.restore(state)
+        if resized:
+            self._reset_view()
+        else:
+            self._canvas_dirty = True
+    
     def reset_to_default(self):
         """Reset sprite to default single color"""
         if self.current_sprite and self.default_color:
@@ -278,6 +727,7 @@ class PixelEditorPanel:
             self.redo_stack.clear()
             # Fill with default color
             self.current_sprite.fill(self.default_color)
+            self._canvas_dirty = True
             return True
         return False
     
@@ -286,8 +736,11 @@ class PixelEditorPanel:
         # Background
         pygame.draw.rect(screen, (40, 40, 40), (self.x, self.y, self.width, self.height))
         
-        # Title
-        title = font.render("Pixel Editor", True, (255, 255, 255))
+        # Title (with sprite size and zoom)
+        title_text = "Pixel Editor"
+        if self.current_sprite:
+            title_text += f"  {self.grid_width}x{self.grid_height}  zoom x{self.pixel_size}"
+        title = font.render(title_text, True, (255, 255, 255))
         screen.blit(title, (self.x + 10, self.y + 10))
         
         if not self.current_sprite:
@@ -296,34 +749,19 @@ class PixelEditorPanel:
             return
         
         # Canvas background
-        pygame.draw.rect(screen, (60, 60, 60), 
+        pygame.draw.rect(screen, self.canvas_bg_color, 
                         (self.canvas_x, self.canvas_y, self.canvas_size, self.canvas_size))
         
-        # Draw pixels
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                color = self.current_sprite.get_pixel(x, y)
-                if color:
-                    rect = pygame.Rect(
-                        self.canvas_x + x * self.pixel_size,
-                        self.canvas_y + y * self.pixel_size,
-                        self.pixel_size,
-                        self.pixel_size
-                    )
-                    pygame.draw.rect(screen, color, rect)
-        
-        # Grid lines
-        for i in range(self.grid_size + 1):
-            # Vertical
-            x_pos = self.canvas_x + i * self.pixel_size
-            pygame.draw.line(screen, (80, 80, 80),
-                           (x_pos, self.canvas_y),
-                           (x_pos, self.canvas_y + self.canvas_size), 1)
-            # Horizontal
-            y_pos = self.canvas_y + i * self.pixel_size
-            pygame.draw.line(screen, (80, 80, 80),
-                           (self.canvas_x, y_pos),
-                           (self.canvas_x + self.canvas_size, y_pos), 1)
+        # Pixels (cached canvas, rebuilt only after undo/redo/reset/new sprite)
+        if self._canvas_dirty or self._canvas_surface is None:
+            self._rebuild_canvas()
+        screen.blit(self._canvas_surface, (self.canvas_x, self.canvas_y))
+        
+        # Grid lines (cached overlay; skipped when cells are too small to see)
+        if self.pixel_size >= 4:
+            if self._grid_overlay is None:
+                self._grid_overlay = self._build_grid_overlay()
+            screen.blit(self._grid_overlay, (self.canvas_x, self.canvas_y))
         
         # Color palette
         palette_x = self.x + 20
@@ -358,6 +796,19 @@ class PixelEditorPanel:
                        (eraser_x + self.palette_cell_size - 5, self.palette_y + 5),
                        (eraser_x + 5, self.palette_y + self.palette_cell_size - 5), 2)
         
+        # Tool buttons (right of the palette)
+        self.tool_button_rects = []
+        tool_x = eraser_x + self.palette_cell_size + 20
+        for tool in paint_tools.TOOLS:
+            rect = pygame.Rect(tool_x, self.palette_y, 64, self.palette_cell_size)
+            is_current = tool == self.tool
+            pygame.draw.rect(screen, (80, 100, 150) if is_current else (70, 70, 70), rect)
+            pygame.draw.rect(screen, (255, 255, 0) if is_current else (200, 200, 200), rect, 2 if is_current else 1)
+            tool_text = font.render(tool.capitalize(), True, (255, 255, 255))
+            screen.blit(tool_text, tool_text.get_rect(center=rect.center))
+            self.tool_button_rects.append((tool, rect))
+            tool_x += 70
+        
         # Reset button (below palette)
         reset_button_y = self.palette_y + self.palette_cell_size + 15
         reset_button_width = 120
@@ -378,13 +829,41 @@ class PixelEditorPanel:
         self.reset_button_rect = pygame.Rect(reset_button_x, reset_button_y, 
                                              reset_button_width, reset_button_height)
         
+        # Sprite size buttons (right of reset)
+        self.size_button_rects = []
+        size_x = reset_button_x + reset_button_width + 20
+        for size in SPRITE_SIZES:
+            rect = pygame.Rect(size_x, reset_button_y, 44, reset_button_height)
+            is_current = (size == self.grid_width and size == self.grid_height)
+            pygame.draw.rect(screen, (80, 100, 150) if is_current else (70, 70, 70), rect)
+            pygame.draw.rect(screen, (255, 255, 0) if is_current else (200, 200, 200), rect, 2 if is_current else 1)
+            size_text = font.render(str(size), True, (255, 255, 255))
+            screen.blit(size_text, size_text.get_rect(center=rect.center))
+            self.size_button_rects.append((size, rect))
+            size_x += 50
+        
+        # Brush size buttons (left of reset)
+        self.brush_button_rects = []
+        brush_x = self.x + 20
+        for size in paint_tools.BRUSH_SIZES:
+            rect = pygame.Rect(brush_x, reset_button_y, 44, reset_button_height)
+            is_current = size == self.brush_size
+            pygame.draw.rect(screen, (80, 100, 150) if is_current else (70, 70, 70), rect)
+            pygame.draw.rect(screen, (255, 255, 0) if is_current else (200, 200, 200), rect, 2 if is_current else 1)
+            dot = max(2, size * 3)
+            pygame.draw.rect(screen, (255, 255, 255), (rect.centerx - dot // 2, rect.centery - dot // 2, dot, dot))
+            self.brush_button_rects.append((size, rect))
+            brush_x += 50
+        
         # Instructions and shortcuts
         instructions = [
-            "Left click/drag: Paint",
+            "Left click/drag: Paint with tool | Wheel: Zoom | Middle drag: Pan",
             "Ctrl+Z: Undo | Shift+Ctrl+Z: Redo",
         ]
         inst_y = reset_button_y + reset_button_height + 15
-        small_font = pygame.font.Font(None, 18)
+        if self._small_font is None:
+            self._small_font = pygame.font.Font(None, 18)
+        small_font = self._small_font
         for inst in instructions:
             text = small_font.render(inst, True, (200, 200, 200))
             screen.blit(text, (self.x + 20, inst_y))
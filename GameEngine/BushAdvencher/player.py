@@ -2,7 +2,7 @@
 플레이어 클래스
 """
 import pygame
-from typing import TYPE_CHECKING
+from typing import Callable, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from map_data import GameMap
@@ -27,6 +27,9 @@ class Player:
         self.target_tile_y = tile_y
         
         self.moving = False
+        
+        # 새 타일에 도착할 때마다 호출 (tile_x, tile_y) - 인카운터 판정 등
+        self.on_enter_tile: Optional[Callable[[int, int], None]] = None
     
     def try_move(self, dx: int, dy: int, game_map: 'GameMap'):
         """타일 단위로 이동 시도 (키 입력용)"""
@@ -67,6 +70,8 @@ class Player:
                 self.tile_x = self.target_tile_x
                 self.tile_y = self.target_tile_y
                 self.moving = False
+                if self.on_enter_tile:
+                    self.on_enter_tile(self.tile_x, self.tile_y)
         
         # 연속 키 입력 처리 (이동 중이 아닐 때만)
         if not self.moving:
@@ -0,0 +1,205 @@
+"""
+Editor session recording and replay (deterministic benchmarking)
+
+File layout: 4-byte magic, then records starting with a kind byte (u8)
+    frame:       time ms (u32) | frame ms (u16) | held move keys (u8) | mode (u8)
+    key down:    key (u32) | mod (u16)
+    button down: button (u8) | x (i16) | y (i16)     (button up: same layout)
+    motion:      x (i16) | y (i16) | rel x (i16) | rel y (i16) | buttons (u8)
+    wheel:       x (i8) | y (i8)
+    quit:        -
+Events are stored as the editor read them (before motion coalescing) and
+each frame record closes the events of one frame, so a replay feeds the
+same events to the same frames. The frame record also keeps the frame
+time (animation clock), the held movement keys (play mode polls the
+keyboard instead of using events) and the mode at the end of the frame,
+which replay checks to detect a diverging session.
+"""
+import os
+import shutil
+import struct
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterator, List, Sequence, Tuple
+
+import pygame
+
+SESSION_MAGIC = b"BAS1"
+
+KIND_FRAME = 0
+KIND_KEY_DOWN = 1
+KIND_BUTTON_DOWN = 2
+KIND_BUTTON_UP = 3
+KIND_MOTION = 4
+KIND_WHEEL = 5
+KIND_QUIT = 6
+
+KIND = struct.Struct("<B")
+PAYLOADS = {
+    KIND_FRAME: struct.Struct("<IHBB"),
+    KIND_KEY_DOWN: struct.Struct("<IH"),
+    KIND_BUTTON_DOWN: struct.Struct("<Bhh"),
+    KIND_BUTTON_UP: struct.Struct("<Bhh"),
+    KIND_MOTION: struct.Struct("<hhhhB"),
+    KIND_WHEEL: struct.Struct("<bb"),
+    KIND_QUIT: struct.Struct("<"),
+}
+
+# Keys the player polls every frame (bit i = MOVE_KEYS[i] held)
+MOVE_KEYS = (pygame.K_LEFT, pygame.K_a, pygame.K_RIGHT, pygame.K_d,
+             pygame.K_UP, pygame.K_w, pygame.K_DOWN, pygame.K_s)
+
+
+class HeldKeys:
+    """Stand-in for pygame.key.get_pressed() built from a recorded key mask"""
+    def __init__(self, keys: FrozenSet[int]):
+        self.keys = keys
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+class RecordedFrame:
+    """Events and state of one recorded frame"""
+    def __init__(self, time_ms: int, frame_ms: int, held: FrozenSet[int], mode: int,
+                 events: List[pygame.event.Event]):
+        self.time_ms = time_ms
+        self.frame_ms = frame_ms
+        self.held = held
+        self.mode = mode
+        self.events = events
+
+
+def _clamp16(value: int) -> int:
+    return max(-32768, min(32767, value))
+
+
+def _encode_event(event: pygame.event.Event) -> bytes:
+    if event.type == pygame.KEYDOWN:
+        return KIND.pack(KIND_KEY_DOWN) + PAYLOADS[KIND_KEY_DOWN].pack(event.key & 0xFFFFFFFF, event.mod & 0xFFFF)
+    if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        kind = KIND_BUTTON_DOWN if event.type == pygame.MOUSEBUTTONDOWN else KIND_BUTTON_UP
+        return KIND.pack(kind) + PAYLOADS[kind].pack(event.button, _clamp16(event.pos[0]), _clamp16(event.pos[1]))
+    if event.type == pygame.MOUSEMOTION:
+        buttons = sum(1 << i for i, pressed in enumerate(event.buttons) if pressed)
+        return KIND.pack(KIND_MOTION) + PAYLOADS[KIND_MOTION].pack(
+            _clamp16(event.pos[0]), _clamp16(event.pos[1]),
+            _clamp16(event.rel[0]), _clamp16(event.rel[1]), buttons)
+    if event.type == pygame.MOUSEWHEEL:
+        return KIND.pack(KIND_WHEEL) + PAYLOADS[KIND_WHEEL].pack(
+            max(-128, min(127, event.x)), max(-128, min(127, event.y)))
+    if event.type == pygame.QUIT:
+        return KIND.pack(KIND_QUIT)
+    return b""  # Not handled by the editor: nothing to replay
+
+
+def _decode_event(kind: int, fields: Tuple) -> pygame.event.Event:
+    if kind == KIND_KEY_DOWN:
+        return pygame.event.Event(pygame.KEYDOWN, key=fields[0], mod=fields[1])
+    if kind in (KIND_BUTTON_DOWN, KIND_BUTTON_UP):
+        event_type = pygame.MOUSEBUTTONDOWN if kind == KIND_BUTTON_DOWN else pygame.MOUSEBUTTONUP
+        return pygame.event.Event(event_type, button=fields[0], pos=(fields[1], fields[2]))
+    if kind == KIND_MOTION:
+        buttons = tuple(int(bool(fields[4] & (1 << i))) for i in range(3))
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(fields[0], fields[1]),
+                                  rel=(fields[2], fields[3]), buttons=buttons)
+    if kind == KIND_WHEEL:
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=fields[0], y=fields[1])
+    return pygame.event.Event(pygame.QUIT)
+
+
+def held_mask(keys_pressed) -> int:
+    """Bit mask of the movement keys held in a pygame.key.get_pressed() result"""
+    return sum(1 << i for i, key in enumerate(MOVE_KEYS) if keys_pressed[key])
+
+
+class SessionRecorder:
+    """Writes the editor's input, frame by frame, to a session file"""
+    def __init__(self, path: str):
+        self.path = path
+        self.frames = 0
+        self._file = open(path, 'wb')
+        self._file.write(SESSION_MAGIC)
+        self._start = time.perf_counter()
+        self._pending: List[bytes] = []
+
+    def record_events(self, events: Sequence[pygame.event.Event]):
+        """Events read this frame (before coalescing)"""
+        self._pending.extend(_encode_event(event) for event in events)
+
+    def end_frame(self, frame_ms: int, held: int, mode: int):
+        """Close the frame: its events, frame time, held movement keys and the mode after it"""
+        time_ms = int((time.perf_counter() - self._start) * 1000) & 0xFFFFFFFF
+        self._pending.append(KIND.pack(KIND_FRAME) +
+                             PAYLOADS[KIND_FRAME].pack(time_ms, min(frame_ms, 0xFFFF), held, mode))
+        self._file.write(b"".join(self._pending))
+        self._pending.clear()
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+
+def read_session(path: str) -> List[RecordedFrame]:
+    """All complete frames of a session file (a torn tail is ignored)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(SESSION_MAGIC)] != SESSION_MAGIC:
+        raise ValueError(f"{path}: not a session recording")
+    frames = []
+    events: List[pygame.event.Event] = []
+    pos = len(SESSION_MAGIC)
+    while pos < len(data):
+        kind = data[pos]
+        payload = PAYLOADS.get(kind)
+        if payload is None:
+            raise ValueError(f"{path}: unknown record kind {kind} at byte {pos}")
+        if pos + 1 + payload.size > len(data):
+            break
+        fields = payload.unpack_from(data, pos + 1)
+        pos += 1 + payload.size
+        if kind == KIND_FRAME:
+            held = frozenset(key for i, key in enumerate(MOVE_KEYS) if fields[2] & (1 << i))
+            frames.append(RecordedFrame(fields[0], fields[1], held, fields[3], events))
+            events = []
+        else:
+            events.append(_decode_event(kind, fields))
+    return frames
+
+
+def frame_time_stats(frame_times: List[float]) -> Dict[str, float]:
+    """Frame time summary in ms (mean and percentiles) from per-frame seconds"""
+    if not frame_times:
+        return {"frames": 0}
+    ordered = sorted(frame_times)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    total = sum(frame_times)
+    return {
+        "frames": len(frame_times),
+        "total_s": total,
+        "mean_ms": total / len(frame_times) * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+@contextmanager
+def replay_workdir(paths: Sequence[str]) -> Iterator[str]:
+    """Run inside a temporary copy of the given files, so a replayed Ctrl+S never touches the real ones"""
+    previous = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bush_replay_")
+    for path in paths:
+        if os.path.isfile(path):
+            shutil.copy2(path, os.path.join(workdir, os.path.basename(path)))
+    os.chdir(workdir)
+    try:
+        yield workdir
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
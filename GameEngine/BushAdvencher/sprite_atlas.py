@@ -0,0 +1,171 @@
+"""
+Sprite atlas: all sprites of one size packed into a single surface
+"""
+import pygame
+from typing import Dict, List, Optional, Tuple
+
+# Colorkey candidates for opaque atlases (first one no sprite uses wins)
+COLORKEY_CANDIDATES = [(255, 0, 255), (1, 254, 1), (254, 1, 253), (3, 2, 1), (0, 1, 2)]
+
+
+class SpriteAtlas:
+    """Packs equally sized sprites into one surface with a rect lookup table
+    
+    Every sprite gets a fixed cell in a grid of `columns` cells per row.
+    Updating a sprite only redraws its own cell; the surface grows by whole
+    rows when it runs out of cells, so existing rects never move.
+    
+    Sprites are drawn into `master` (SRCALPHA). `surface` is the blit source
+    converted to the display format: convert() + colorkey when every pixel
+    is fully opaque or fully transparent, convert_alpha() otherwise.
+    """
+    def __init__(self, cell_size: int, columns: int = 16):
+        self.cell_size = cell_size
+        self.columns = columns
+        self.rows = 1
+        self.master = pygame.Surface((columns * cell_size, cell_size), pygame.SRCALPHA)
+        self.surface = self.master
+        self.rects: Dict[str, pygame.Rect] = {}
+        self._free_cells: List[int] = []
+        self._next_cell = 0
+        
+        # Display format the surface was prepared for (None = not prepared)
+        self._prepared_format: Optional[Tuple] = None
+        self.colorkey: Optional[Tuple[int, int, int]] = None
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.rects
+    
+    def get_rect(self, key: str) -> Optional[pygame.Rect]:
+        """Sub-rect of a sprite inside the atlas surface"""
+        return self.rects.get(key)
+    
+    def _cell_rect(self, cell: int) -> pygame.Rect:
+        col = cell % self.columns
+        row = cell // self.columns
+        return pygame.Rect(col * self.cell_size, row * self.cell_size,
+                           self.cell_size, self.cell_size)
+    
+    def _grow(self, rows: int):
+        """Add rows to the atlas surface (keeps existing cells in place)"""
+        new_surface = pygame.Surface((self.columns * self.cell_size, rows * self.cell_size),
+                                     pygame.SRCALPHA)
+        new_surface.blit(self.master, (0, 0))
+        self.master = new_surface
+        self.rows = rows
+        self._prepared_format = None  # Size changed: full prepare on next use
+    
+    def _allocate(self) -> pygame.Rect:
+        if self._free_cells:
+            return self._cell_rect(self._free_cells.pop())
+        cell = self._next_cell
+        self._next_cell += 1
+        if cell >= self.rows * self.columns:
+            self._grow(self.rows * 2)
+        return self._cell_rect(cell)
+    
+    def set(self, key: str, sprite_surface: pygame.Surface):
+        """Insert or replace one sprite (only its cell is redrawn)"""
+        rect = self.rects.get(key)
+        if rect is None:
+            rect = self._allocate()
+            self.rects[key] = rect
+        self.master.fill((0, 0, 0, 0), rect)
+        self.master.blit(sprite_surface, rect.topleft)
+        self._refresh_cell(rect)
+    
+    def remove(self, key: str):
+        """Free a sprite's cell"""
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        self.master.fill((0, 0, 0, 0), rect)
+        self._refresh_cell(rect)
+        cell = (rect.y // self.cell_size) * self.columns + rect.x // self.cell_size
+        self._free_cells.append(cell)
+    
+    def clear(self):
+        """Remove all sprites"""
+        self.rects.clear()
+        self._free_cells.clear()
+        self._next_cell = 0
+        self.master.fill((0, 0, 0, 0))
+        self._prepared_format = None
+    
+    @staticmethod
+    def _display_format() -> Optional[Tuple]:
+        display = pygame.display.get_surface()
+        if display is None:
+            return None
+        return (display.get_size(), display.get_bitsize(), display.get_masks())
+    
+    @staticmethod
+    def _has_binary_alpha(surface: pygame.Surface) -> bool:
+        """True if every pixel is either fully opaque or fully transparent"""
+        visible = pygame.mask.from_surface(surface, 0).count()
+        opaque = pygame.mask.from_surface(surface, 254).count()
+        return visible == opaque
+    
+    @staticmethod
+    def _uses_color(surface: pygame.Surface, color: Tuple[int, int, int]) -> bool:
+        """True if any opaque pixel has exactly this color"""
+        return pygame.mask.from_threshold(surface, color + (255,), (1, 1, 1, 1)).count() > 0
+    
+    def _pick_colorkey(self, surface: pygame.Surface) -> Optional[Tuple[int, int, int]]:
+        """A color no opaque pixel uses"""
+        for key in COLORKEY_CANDIDATES:
+            if not self._uses_color(surface, key):
+                return key
+        return None
+    
+    def ensure_prepared(self):
+        """Convert to the current display format if not done yet or the mode changed"""
+        display_format = self._display_format()
+        if display_format is not None and display_format != self._prepared_format:
+            self.prepare()
+    
+    def prepare(self):
+        """Rebuild the display-format blit surface from the master"""
+        display_format = self._display_format()
+        if display_format is None:
+            # No display yet: blit straight from the master
+            self.surface = self.master
+            self.colorkey = None
+            self._prepared_format = None
+            return
+        
+        key = self._pick_colorkey(self.master) if self._has_binary_alpha(self.master) else None
+        if key is not None:
+            surface = pygame.Surface(self.master.get_size()).convert()
+            surface.fill(key)
+            surface.blit(self.master, (0, 0))
+            surface.set_colorkey(key, pygame.RLEACCEL)
+        else:
+            surface = self.master.convert_alpha()
+        self.surface = surface
+        self.colorkey = key
+        self._prepared_format = display_format
+    
+    def _refresh_cell(self, rect: pygame.Rect):
+        """Copy one master cell into the prepared surface"""
+        if self._prepared_format is None:
+            return
+        cell = self.master.subsurface(rect)
+        if self.colorkey is not None:
+            if not self._has_binary_alpha(cell) or self._uses_color(cell, self.colorkey):
+                # Cell no longer fits the colorkey surface: convert everything again
+                self.prepare()
+                return
+            self.surface.fill(self.colorkey, rect)
+            self.surface.blit(self.master, rect.topleft, rect)
+        else:
+            self.surface.fill((0, 0, 0, 0), rect)
+            # MAX onto zeroed pixels copies RGBA exactly (no alpha blending)
+            self.surface.blit(self.master, rect.topleft, rect, special_flags=pygame.BLEND_RGBA_MAX)
+    
+    def blit_item(self, key: str, dest: Tuple[int, int]) -> Optional[Tuple[pygame.Surface, Tuple[int, int], pygame.Rect]]:
+        """Blit sequence entry for Surface.blits (None if the sprite is missing)"""
+        rect = self.rects.get(key)
+        if rect is None:
+            return None
+        return (self.surface, dest, rect)
@@ -0,0 +1,25 @@
+"""
+Headless test setup: dummy SDL drivers, the flat BushAdvencher imports and
+an editor fixture running in a temporary folder
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+from editor import MapEditor
+
+
+@pytest.fixture
+def editor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Saves, autosaves and sprites.json stay in the test's folder
+    pygame.init()
+    editor = MapEditor(800, 600)
+    yield editor
+    editor.saver.shutdown()
+    pygame.quit()
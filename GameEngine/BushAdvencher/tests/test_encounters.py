@@ -0,0 +1,51 @@
+"""
+Bush regions stay equal to a full flood fill while tiles change
+"""
+import random
+
+from item_types import ENCOUNTER, ItemType
+from map_data import GameMap
+
+
+def flood_regions(game_map: GameMap):
+    bushes = {pos for chunk in game_map.chunks.values() for pos, code in chunk.items() if ENCOUNTER[code]}
+    regions = set()
+    while bushes:
+        start = bushes.pop()
+        region, stack = {start}, [start]
+        while stack:
+            x, y = stack.pop()
+            for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if n in bushes:
+                    bushes.discard(n)
+                    region.add(n)
+                    stack.append(n)
+        regions.add(frozenset(region))
+    return regions
+
+
+def test_regions_follow_random_edits():
+    rng = random.Random(1)
+    game_map = GameMap(24, 24)
+    for step in range(4000):
+        game_map.set_tile(rng.randrange(24), rng.randrange(24),
+                          rng.choice([ItemType.BUSH, ItemType.BUSH, ItemType.STONE, None]))
+        if step % 100 == 0:
+            regions = game_map.bush_regions
+            assert {frozenset(tiles) for tiles in regions.tiles.values()} == flood_regions(game_map)
+            assert all(regions.anchors[rid] in tiles for rid, tiles in regions.tiles.items())
+            assert all(regions.find(pos) == rid for rid, tiles in regions.tiles.items() for pos in tiles)
+
+
+def test_cutting_a_field_relabels_the_small_side():
+    game_map = GameMap(40, 10)
+    for y in range(10):
+        for x in range(40):
+            game_map.set_tile(x, y, ItemType.BUSH)
+    rid = game_map.bush_regions.find((20, 5))
+    for y in range(10):
+        game_map.set_tile(3, y, ItemType.STONE)
+    regions = game_map.bush_regions
+    assert len(regions) == 2
+    assert regions.find((20, 5)) == rid and regions.size(rid) == 36 * 10
+    assert regions.size(regions.find((0, 0))) == 3 * 10
@@ -0,0 +1,26 @@
+"""
+Field of view bitmap: lit around the player, cleared when they move on
+"""
+from fov import FogOfWar, compute_fov
+from item_types import ItemType
+from map_data import GameMap
+
+
+def test_open_field_is_a_disk():
+    game_map = GameMap(41, 41)
+    visible = compute_fov(game_map, 20, 20, 8)
+    lit = {(i % 41, i // 41) for i, value in enumerate(visible) if value}
+    assert lit == {(x, y) for x in range(41) for y in range(41) if (x - 20) ** 2 + (y - 20) ** 2 <= 64}
+
+
+def test_fog_moves_the_lit_area_and_keeps_explored_tiles():
+    game_map = GameMap(41, 41)
+    for y in range(15, 26):
+        game_map.set_tile(23, y, ItemType.STONE)
+    fog = FogOfWar(41, 41, radius=8)
+    fog.update(game_map, 20, 20)
+    assert fog.is_visible(23, 20) and not fog.is_visible(25, 20)  # The wall hides what is behind it
+    fog.update(game_map, 5, 5)
+    assert fog.is_visible(5, 5) and not fog.is_visible(20, 20)
+    assert fog.is_explored(20, 20) and not fog.is_explored(25, 20)
+    assert sum(fog.visible) == sum(compute_fov(game_map, 5, 5, 8))
@@ -0,0 +1,83 @@
+"""
+Edit journal: record format, item order and crash-recovery-only replay
+"""
+import pytest
+
+import map_journal
+from item_types import ITEM_TYPES_BY_CODE, ItemType
+from map_data import GameMap
+
+
+def saved_map_with_journal(tmp_path):
+    path = str(tmp_path / "map_save.json")
+    GameMap(8, 8).save_to_file(path)
+    journal = map_journal.journal_path(path)
+    map_journal.append_ops(journal, [(1, 1, ItemType.STONE)], commit=True)
+    map_journal.append_ops(journal, [(2, 2, ItemType.BUSH), (3, 3, ItemType.STONE)])
+    return path, journal
+
+
+def test_load_applies_committed_records_only(tmp_path):
+    path, _ = saved_map_with_journal(tmp_path)
+    game_map, unsaved = GameMap.load_with_journal(path)
+    assert unsaved == 2
+    assert game_map.get_code(1, 1) and not game_map.get_code(2, 2) and not game_map.get_code(3, 3)
+
+
+def test_recover_replays_unsaved_records(tmp_path):
+    path, _ = saved_map_with_journal(tmp_path)
+    game_map, _ = GameMap.load_with_journal(path, recover=True)
+    assert game_map.get_code(2, 2) and game_map.get_code(3, 3)
+    assert not game_map.pending_ops
+
+
+def test_drop_uncommitted_keeps_later_commits_clean(tmp_path):
+    path, journal = saved_map_with_journal(tmp_path)
+    assert map_journal.drop_uncommitted(journal) == 2
+    # A later save commits only its own edits
+    map_journal.append_ops(journal, [(4, 4, ItemType.STONE)], commit=True)
+    committed, uncommitted = map_journal.read_ops(journal)
+    assert [(x, y) for x, y, _ in committed] == [(1, 1), (4, 4)]
+    assert uncommitted == []
+
+
+def test_unchanged_tile_is_not_an_edit():
+    game_map = GameMap(8, 8)
+    game_map.set_tile(1, 1, ItemType.STONE)
+    game_map.take_pending_ops()
+    revision = game_map.revision
+    assert game_map.set_tile(1, 1, ItemType.STONE)
+    assert game_map.set_tile(2, 2, None)
+    assert game_map.pending_ops == [] and game_map.revision == revision
+
+
+def test_coordinates_beyond_16_bits_round_trip(tmp_path):
+    journal = str(tmp_path / "big.journal")
+    map_journal.append_ops(journal, [(70000, 3, ItemType.STONE), (-1, 5, None)], commit=True)
+    committed, _ = map_journal.read_ops(journal)
+    assert committed == [(70000, 3, ItemType.STONE), (-1, 5, None)]
+
+
+def test_journal_survives_reordered_items(tmp_path):
+    # Written by a build whose items.json listed the types in reverse order
+    ids = [item_type.value for item_type in ITEM_TYPES_BY_CODE[1:]][::-1]
+    header = "\n".join(ids).encode('utf-8')
+    journal = str(tmp_path / "old.journal")
+    with open(journal, 'wb') as f:
+        f.write(map_journal.JOURNAL_MAGIC + map_journal.HEADER_LENGTH.pack(len(header)) + header)
+        f.write(map_journal.RECORD.pack(map_journal.KIND_SET_TILE, 1, 2, ids.index("stone") + 1))
+        f.write(map_journal.RECORD.pack(map_journal.KIND_COMMIT, 0, 0, 0))
+    assert map_journal.read_ops(journal) == ([(1, 2, ItemType.STONE)], [])
+    # New records would be coded in the current order: never mixed into this file
+    assert not map_journal.matches_registry(journal)
+    with pytest.raises(ValueError):
+        map_journal.append_ops(journal, [(3, 3, ItemType.BUSH)])
+
+
+def test_editor_does_not_append_to_a_journal_of_another_item_order(editor):
+    GameMap(8, 8).save_to_file(editor.map_path)
+    header = "\n".join(["bush", "stone"]).encode('utf-8')  # Not the full current registry
+    with open(editor.journal_path, 'wb') as f:
+        f.write(map_journal.JOURNAL_MAGIC + map_journal.HEADER_LENGTH.pack(len(header)) + header)
+    editor.load_map()
+    assert not editor.journal_synced  # The next save rewrites the map and starts a new journal
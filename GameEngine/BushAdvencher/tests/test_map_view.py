@@ -0,0 +1,37 @@
+"""
+Play mode view: changes stay on the view and leave nothing behind
+"""
+from editor import EditorMode
+from item_types import ItemType
+from map_data import CHUNK_SIZE, GameMap
+
+
+def test_view_drops_chunks_it_emptied_itself():
+    game_map = GameMap(64, 64)
+    game_map.set_tile(1, 1, ItemType.STONE)
+    view = game_map.play_view()
+    view.set_tile(40, 40, ItemType.STONE)
+    view.set_tile(40, 40, None)
+    view.set_tile(1, 1, None)
+    # The base chunk stays hidden behind an empty one, the view-only chunk is gone
+    assert view.overlay == {(0, 0): {}}
+    assert view.get_code(1, 1) == 0 and game_map.get_code(1, 1)
+
+
+def test_view_records_no_journal_ops():
+    view = GameMap(64, 64).play_view()
+    for x in range(CHUNK_SIZE):
+        view.set_tile(x, 0, ItemType.BUSH)
+    assert view.pending_ops == []
+
+
+def test_load_during_play_restarts_play(editor):
+    saved = GameMap(20, 20)
+    saved.set_tile(5, 6, ItemType.PLAYER_START)
+    saved.save_to_file(editor.map_path)
+    editor.game_map.set_tile(1, 1, ItemType.PLAYER_START)
+    editor.switch_to_play_mode()
+    editor.load_map()
+    assert editor.mode == EditorMode.PLAY
+    assert editor.play_map.base is editor.game_map
+    assert (editor.player.tile_x, editor.player.tile_y) == (5, 6)
@@ -0,0 +1,49 @@
+"""
+Sprite downscaling: alpha-weighted box filter
+"""
+import random
+
+import pytest
+
+from pixel_editor import PixelSprite
+
+
+def random_sprite(width: int, height: int, seed: int) -> PixelSprite:
+    rng = random.Random(seed)
+    sprite = PixelSprite(width, height)
+    for i in range(0, len(sprite.data), 4):
+        if rng.random() < 0.7:
+            sprite.data[i:i + 4] = bytes(rng.randrange(256) for _ in range(4))
+    return sprite
+
+
+def reference_pixel(sprite: PixelSprite, target_w: int, target_h: int, tx: int, ty: int):
+    """One target pixel averaged by hand (source x goes to x * target // source)"""
+    block = [sprite.data[(y * sprite.width + x) * 4:(y * sprite.width + x) * 4 + 4]
+             for y in range(sprite.height) if y * target_h // sprite.height == ty
+             for x in range(sprite.width) if x * target_w // sprite.width == tx]
+    alpha_sum = sum(pixel[3] for pixel in block)
+    if not alpha_sum:
+        return (0, 0, 0, 0)
+    return tuple(sum(pixel[c] * pixel[3] for pixel in block) // alpha_sum for c in range(3)) + \
+        (alpha_sum // len(block),)
+
+
+@pytest.mark.parametrize("size, target", [((64, 64), (32, 32)), ((256, 256), (32, 32)),
+                                          ((48, 32), (32, 32)), ((100, 100), (7, 33))])
+def test_downsample_averages_blocks_by_alpha(size, target):
+    sprite = random_sprite(*size, seed=sum(size))
+    data = sprite._box_downsample(*target)
+    target_w, target_h = target
+    rng = random.Random(0)
+    for _ in range(20):
+        tx, ty = rng.randrange(target_w), rng.randrange(target_h)
+        k = (ty * target_w + tx) * 4
+        assert tuple(data[k:k + 4]) == reference_pixel(sprite, target_w, target_h, tx, ty)
+
+
+def test_transparent_pixels_do_not_darken_edges():
+    sprite = PixelSprite(32, 32)
+    sprite.set_pixel(0, 0, (200, 100, 50))
+    data = sprite._box_downsample(16, 16)
+    assert tuple(data[:4]) == (200, 100, 50, 255 // 4)
@@ -0,0 +1,31 @@
+"""
+Tiles of items without a custom sprite are drawn in their default color
+"""
+import json
+
+from editor import MapEditor
+from item_types import ItemType, get_item_definition
+
+
+def tile_center_color(editor: MapEditor, x: int, y: int):
+    tile_size = editor.game_map.tile_size
+    return editor.screen.get_at((editor.view_panel_x + x * tile_size + tile_size // 2,
+                                 editor.view_panel_y + y * tile_size + tile_size // 2))[:3]
+
+
+def test_tile_without_sprite_file_is_drawn(editor):
+    # No sprites.json in the working directory: every item uses its default tile
+    editor.game_map.set_tile(1, 1, ItemType.BUSH)
+    editor.render_tiles()
+    assert tile_center_color(editor, 1, 1) == get_item_definition(ItemType.BUSH).color
+
+
+def test_sprite_less_item_next_to_custom_sprites_is_drawn(editor):
+    # sprites.json with a sprite for another item only (player_start has none)
+    with open("sprites.json", "w") as f:
+        json.dump({"stone": {"width": 1, "height": 1, "pixels": [[[10, 20, 30, 255]]]}}, f)
+    editor.sprite_library.load()
+    editor._rebuild_sprite_cache()
+    editor.game_map.set_tile(2, 1, ItemType.PLAYER_START)
+    editor.render_tiles()
+    assert tile_center_color(editor, 2, 1) == get_item_definition(ItemType.PLAYER_START).color
@@ -1,8 +1,11 @@
 
-import tkinter as tk
 import math
+import random
+import sys
 import time
 
+from TkGame import Entity, GameApp, Scene
+
 
 class Ball:
 	def __init__(self, x, y, r=12, color="orange"):
@@ -94,27 +97,61 @@ class Obstacle:
 		return (dx * dx + dy * dy) <= (ball.r * ball.r)
 
 
-class Game:
+class SpatialGrid:
+	"""Uniform grid over static AABBs (broad phase).
+
+	Each box is registered in every cell it overlaps; a query returns the
+	indices of boxes sharing a cell with the query box, in insertion order,
+	so callers can resolve collisions in the same order as a full scan.
+	"""
+	def __init__(self, cell_size=128):
+		self.cell_size = cell_size
+		self.cells = {}  # (cx, cy) -> [index, ...]
+
+	def insert(self, index, x1, y1, x2, y2):
+		cs = self.cell_size
+		for cx in range(int(x1 // cs), int(x2 // cs) + 1):
+			for cy in range(int(y1 // cs), int(y2 // cs) + 1):
+				self.cells.setdefault((cx, cy), []).append(index)
+
+	def query(self, x1, y1, x2, y2):
+		cs = self.cell_size
+		cx1, cx2 = int(x1 // cs), int(x2 // cs)
+		cy1, cy2 = int(y1 // cs), int(y2 // cs)
+		if cx1 == cx2 and cy1 == cy2:
+			return self.cells.get((cx1, cy1), ())
+		found = set()
+		for cx in range(cx1, cx2 + 1):
+			for cy in range(cy1, cy2 + 1):
+				found.update(self.cells.get((cx, cy), ()))
+		return sorted(found)
+
+
+class Inputs:
+	"""Input state for one simulation step."""
+	def __init__(self, left=False, right=False):
+		self.left = left
+		self.right = right
+
+
+NO_INPUT = Inputs()
+
+
+class World:
+	"""Display-independent physics world: ball, platforms and obstacles.
+
+	Advanced with step(dt, inputs); nothing here touches Tk, so it can run
+	headless at any speed (tests, replays, tuning g / bounce_height / acc).
+	"""
 	def __init__(self, width=800, height=600):
 		self.width = width
 		self.height = height
 
 		# physics params
-		self.FPS = 60
-		self.dt = 1.0 / self.FPS
 		self.g = 1200.0  # px/s^2, tuneable
 		self.bounce_height = 140.0  # pixels the ball should reach after each bounce
-		# derived bounce velocity (upwards -> negative vy)
-		self.v_bounce = math.sqrt(2 * self.g * self.bounce_height)
-
 		self.acc = 1800.0  # horizontal acceleration px/s^2 when key is held
 
-		# tkinter
-		self.root = tk.Tk()
-		self.root.title("Bounce Ball - Tkinter")
-		self.canvas = tk.Canvas(self.root, width=self.width, height=self.height, bg="light sky blue")
-		self.canvas.pack()
-
 		# ball
 		self.ball = Ball(self.width // 2, 100)
 
@@ -123,28 +160,42 @@ class Game:
 		# obstacles (red boxes)
 		self.obstacles = []
 
-		self._create_terrain()
-
-
-		# keys
-		self.left_pressed = False
-		self.right_pressed = False
-
-		# drawing ids
-		self.ball_id = None
-		self.platform_ids = []
-		self.hud_id = None
-
-		# timing
-		self._running = False
-
-		# input
-		self.root.bind('<KeyPress-Left>', self._on_left_down)
-		self.root.bind('<KeyRelease-Left>', self._on_left_up)
-		self.root.bind('<KeyPress-Right>', self._on_right_down)
-		self.root.bind('<KeyRelease-Right>', self._on_right_up)
+		self.game_over = False
+		self.time = 0.0
+
+		# broad phase: only platforms/obstacles near the ball are tested
+		self.use_broadphase = True
+		self._platform_grid = None
+		self._obstacle_grid = None
+		self._grid_counts = None
+
+		# continuous collision detection (swept circle vs boxes, time-of-impact
+		# sub-steps); keeps low tick rates and high speeds from tunneling.
+		# False = plain discrete step (kept for the --tunnel comparison)
+		self.ccd = True
+		self.max_substeps = 4
+
+	def _sync_broadphase(self):
+		# added/removed objects are picked up automatically; moved ones need rebuild_broadphase
+		if self._grid_counts != (len(self.platforms), len(self.obstacles)):
+			self.rebuild_broadphase()
+
+	def rebuild_broadphase(self):
+		"""Rebuild the spatial grids (call after moving platforms/obstacles)."""
+		self._platform_grid = SpatialGrid()
+		for i, p in enumerate(self.platforms):
+			self._platform_grid.insert(i, p.x1, p.y1, p.x2, p.y2)
+		self._obstacle_grid = SpatialGrid()
+		for i, o in enumerate(self.obstacles):
+			self._obstacle_grid.insert(i, o.x1, o.y1, o.x2, o.y2)
+		self._grid_counts = (len(self.platforms), len(self.obstacles))
+
+	@property
+	def v_bounce(self):
+		# derived bounce velocity (upwards -> negative vy)
+		return math.sqrt(2 * self.g * self.bounce_height)
 
-	def _create_terrain(self):
+	def create_default_terrain(self):
 		w, h = self.width, self.height
 		# ground
 		self.platforms.append(Platform(0, h - 30, w, h, color="#4d2600"))
@@ -158,29 +209,24 @@ class Game:
 		# add a red obstacle (example)
 		self.obstacles.append(Obstacle(320, h - 320, 380, h - 280, color='red'))
 
+	def step(self, dt, inputs=NO_INPUT):
+		"""Advance the world by dt seconds. Returns False once the game is over."""
+		if self.game_over:
+			return False
+		self.time += dt
 
-	def _on_left_down(self, event):
-		self.left_pressed = True
-
-	def _on_left_up(self, event):
-		self.left_pressed = False
-
-	def _on_right_down(self, event):
-		self.right_pressed = True
-
-	def _on_right_up(self, event):
-		self.right_pressed = False
-
-	def _apply_physics(self):
 		# horizontal input
 		ax = 0.0
-		if self.left_pressed and not self.right_pressed:
+		if inputs.left and not inputs.right:
 			ax = -self.acc
-		elif self.right_pressed and not self.left_pressed:
+		elif inputs.right and not inputs.left:
 			ax = self.acc
 
 		# apply horizontal acceleration
-		self.ball.apply_force(ax, self.dt)
+		self.ball.apply_force(ax, dt)
+
+		if self.ccd:
+			return self._step_swept(dt)
 
 		# update motion
 		# store previous edges for collision detection
@@ -189,7 +235,7 @@ class Game:
 		prev_top = self.ball.top()
 		prev_bottom = self.ball.bottom()
 
-		self.ball.update(self.dt, self.g)
+		self.ball.update(dt, self.g)
 
 		# current edges after update
 		cur_left = self.ball.left()
@@ -205,12 +251,23 @@ class Game:
 			self.ball.x = self.width - self.ball.r
 			self.ball.vx = 0
 
+		# broad phase: platforms overlapping the swept ball box
+		if self.use_broadphase:
+			self._sync_broadphase()
+			platforms = self.platforms
+			nearby = [platforms[i] for i in self._platform_grid.query(
+				min(prev_left, cur_left), min(prev_top, cur_top),
+				max(prev_right, cur_right), max(prev_bottom, cur_bottom))]
+		else:
+			nearby = self.platforms
+
 		# collision with platforms (top, bottom, and side surfaces)
-		for p in self.platforms:
+		v_bounce = self.v_bounce
+		for p in nearby:
 			# top collision (landing from above)
 			if prev_bottom <= p.top() and cur_bottom >= p.top() and self.ball.vy > 0 and (cur_right >= p.left() and cur_left <= p.right()):
 				self.ball.y = p.top() - self.ball.r
-				self.ball.vy = -self.v_bounce
+				self.ball.vy = -v_bounce
 				self.ball.vx *= 0.98
 
 			# bottom collision (hitting underside while moving up)
@@ -232,54 +289,315 @@ class Game:
 					self.ball.vx = 0
 
 		# check obstacles (game over on touch)
-		for o in self.obstacles:
+		if self.use_broadphase:
+			b = self.ball
+			obstacles = self.obstacles
+			nearby = [obstacles[i] for i in self._obstacle_grid.query(b.left(), b.top(), b.right(), b.bottom())]
+		else:
+			nearby = self.obstacles
+		for o in nearby:
 			if o.intersects_ball(self.ball):
-				self._running = False
-				# draw immediate game over message
-				self.canvas.create_text(self.width//2, self.height//2, text='GAME OVER', fill='white', font=('Consolas', 36, 'bold'))
-				return
-					
-
-	def _draw(self):
-		c = self.canvas
-		# clear canvas items for redraw
-		c.delete('all')
-
-		# draw platforms
-		for p in self.platforms:
-			c.create_rectangle(p.x1, p.y1, p.x2, p.y2, fill=p.color, outline='black')
-
-		# draw obstacles
-		for o in self.obstacles:
-			c.create_rectangle(o.x1, o.y1, o.x2, o.y2, fill=o.color, outline='black')
-
-		# draw ball
-		b = self.ball
-		c.create_oval(b.left(), b.y - b.r, b.right(), b.y + b.r, fill=b.color, outline='black')
+				self.game_over = True
+				return False
+		return True
+
+	def _nearby(self, grid, items, x1, y1, x2, y2):
+		if not self.use_broadphase:
+			return items
+		return [items[i] for i in grid.query(x1, y1, x2, y2)]
 
-		# HUD
-		text = f"vx={b.vx:.1f} px/s  vy={b.vy:.1f} px/s  bounce_h={self.bounce_height:.0f}px"
-		c.create_text(10, 10, anchor='nw', text=text, fill='black', font=('Consolas', 12, 'bold'))
-		c.create_text(10, 30, anchor='nw', text='← / → : apply horizontal force', fill='black', font=('Consolas', 10))
+	def _step_swept(self, dt):
+		"""Move the ball along its path, stopping at each time of impact.
 
-	def start(self):
-		self._running = True
-		self._loop()
-		self.root.mainloop()
+		After a hit the bounce/stop response is applied and the rest of the
+		step continues with the new velocity (up to max_substeps contacts).
+		"""
+		b = self.ball
+		r = b.r
+		if self.use_broadphase:
+			self._sync_broadphase()
+		b.vy += self.g * dt
+		remaining = 1.0
+		for _ in range(self.max_substeps):
+			dx = b.vx * dt * remaining
+			dy = b.vy * dt * remaining
+			qx1, qx2 = min(b.x, b.x + dx) - r, max(b.x, b.x + dx) + r
+			qy1, qy2 = min(b.y, b.y + dy) - r, max(b.y, b.y + dy) + r
+
+			hit = None
+			for p in self._nearby(self._platform_grid, self.platforms, qx1, qy1, qx2, qy2):
+				h = sweep_circle_box(b.x, b.y, dx, dy, r, p.x1, p.y1, p.x2, p.y2)
+				if h and (hit is None or h[0] < hit[0]):
+					hit = (h[0], h[1], p)
+			for o in self._nearby(self._obstacle_grid, self.obstacles, qx1, qy1, qx2, qy2):
+				h = sweep_circle_box(b.x, b.y, dx, dy, r, o.x1, o.y1, o.x2, o.y2)
+				if (h and (hit is None or h[0] <= hit[0])) or o.intersects_ball(b):
+					# touching an obstacle ends the game
+					t = h[0] if h else 0.0
+					b.x += dx * t
+					b.y += dy * t
+					self.game_over = True
+					return False
+
+			if hit is None:
+				b.x += dx
+				b.y += dy
+				break
+			t, side, p = hit
+			b.x += dx * t
+			b.y += dy * t
+			remaining *= 1.0 - t
+			if side == 'top':
+				b.y = p.top() - r
+				b.vy = -self.v_bounce
+				b.vx *= 0.98
+			elif side == 'bottom':
+				b.y = p.bottom() + r
+				b.vy = -b.vy * 0.9
+			elif side == 'left':
+				b.x = p.left() - r
+				b.vx = 0
+			else:
+				b.x = p.right() + r
+				b.vx = 0
 
-	def _loop(self):
-		if not self._running:
+		# world bounds: left/right
+		if b.left() < 0:
+			b.x = r
+			b.vx = 0
+		if b.right() > self.width:
+			b.x = self.width - r
+			b.vx = 0
+		return True
+
+
+def sweep_circle_box(x, y, dx, dy, r, x1, y1, x2, y2):
+	"""Swept circle vs AABB: first contact of a circle (radius r, center (x, y))
+	moving by (dx, dy) with the box.
+
+	Returns (t, side) with t in [0, 1] and side in 'top'/'bottom'/'left'/'right'
+	(the box face that was hit), or None. Circles already overlapping the box
+	at t=0 are ignored, so a resting or separating ball never re-collides.
+	"""
+	# slab test against the box expanded by r
+	ex1, ey1, ex2, ey2 = x1 - r, y1 - r, x2 + r, y2 + r
+	if dx:
+		tx1 = (ex1 - x) / dx
+		tx2 = (ex2 - x) / dx
+		tx_in, tx_out = (tx1, tx2) if tx1 < tx2 else (tx2, tx1)
+	elif ex1 < x < ex2:
+		tx_in, tx_out = -math.inf, math.inf
+	else:
+		return None
+	if dy:
+		ty1 = (ey1 - y) / dy
+		ty2 = (ey2 - y) / dy
+		ty_in, ty_out = (ty1, ty2) if ty1 < ty2 else (ty2, ty1)
+	elif ey1 < y < ey2:
+		ty_in, ty_out = -math.inf, math.inf
+	else:
+		return None
+	t_in = max(tx_in, ty_in)
+	t_out = min(tx_out, ty_out)
+	if t_in >= t_out or t_in > 1 or t_out < 0:
+		return None
+
+	# entry point in a corner square of the expanded box: test the rounded corner.
+	# A circle that starts inside the expanded box can still be outside the box
+	# itself, in a corner square; only the corner circle can be ahead of it then.
+	if t_in < 0:
+		hx, hy = x, y
+	else:
+		hx = x + dx * t_in
+		hy = y + dy * t_in
+	cx = x1 if hx < x1 else (x2 if hx > x2 else None)
+	cy = y1 if hy < y1 else (y2 if hy > y2 else None)
+	if cx is not None and cy is not None:
+		fx = x - cx
+		fy = y - cy
+		a = dx * dx + dy * dy
+		b = 2 * (fx * dx + fy * dy)
+		c = fx * fx + fy * fy - r * r
+		disc = b * b - 4 * a * c
+		if c <= 0 or disc < 0:
+			return None
+		t = (-b - math.sqrt(disc)) / (2 * a)
+		if t < 0 or t > 1:
+			return None
+		nx = x + dx * t - cx
+		ny = y + dy * t - cy
+		if abs(ny) >= abs(nx):
+			return t, ('top' if ny < 0 else 'bottom')
+		return t, ('left' if nx < 0 else 'right')
+	if t_in < 0:
+		return None
+
+	# face hit: the axis that entered last (ties count as top/bottom)
+	if ty_in >= tx_in:
+		return t_in, ('top' if dy > 0 else 'bottom')
+	return t_in, ('left' if dx > 0 else 'right')
+
+
+def generate_level(count, seed=0, height=600, spacing=160):
+	"""World with `count` random floating platforms (plus obstacles) laid out left to right."""
+	rng = random.Random(seed)
+	world = World(count * spacing + 200, height)
+	h = height
+	# ground
+	world.platforms.append(Platform(0, h - 30, world.width, h, color="#4d2600"))
+	for i in range(count):
+		x1 = 100 + i * spacing + rng.randint(0, spacing // 4)
+		y1 = rng.randint(h - 420, h - 120)
+		world.platforms.append(Platform(x1, y1, x1 + rng.randint(60, spacing - 20), y1 + 20))
+		if i % 10 == 5:
+			ox = x1 + rng.randint(0, 40)
+			world.obstacles.append(Obstacle(ox, y1 - 200, ox + 30, y1 - 170, color='red'))
+	return world
+
+
+def run_headless(world, steps, dt=1.0 / 60, input_fn=None):
+	"""Run the simulation without a display as fast as possible.
+
+	input_fn(step_index, world) -> Inputs; defaults to no input.
+	Returns the number of steps actually simulated (stops at game over).
+	"""
+	for i in range(steps):
+		inputs = input_fn(i, world) if input_fn else NO_INPUT
+		if not world.step(dt, inputs):
+			return i + 1
+	return steps
+
+
+class BounceBallScene(Scene):
+	"""The playable game: World physics drawn with retained entities."""
+	def __init__(self, world=None):
+		super().__init__()
+		self.world = world
+
+	def enter(self):
+		if self.world is None:
+			self.world = World(self.app.width, self.app.height)
+			self.world.create_default_terrain()
+		add = self.entities.add
+
+		# controls (rebind with app.input.bind)
+		self.app.input.bind('left', 'Left', 'a')
+		self.app.input.bind('right', 'Right', 'd')
+
+		# static items: drawn once, never touched again per frame
+		for i, p in enumerate(self.world.platforms):
+			add(_box_entity(('platform', i), p, fill=p.color, outline='black'))
+		for i, o in enumerate(self.world.obstacles):
+			add(_box_entity(('obstacle', i), o, fill=o.color, outline='black'))
+		add(Entity('help', 'text', 10, 30, anchor='nw', text='← / → (A / D) : apply horizontal force', fill='black', font=('Consolas', 10)))
+
+		b = self.world.ball
+		self.ball = add(Entity('ball', 'oval', b.x, b.y, 2 * b.r, 2 * b.r, fill=b.color, outline='black'))
+		self.hud = add(Entity('hud', 'text', 10, 10, anchor='nw', text='', fill='black', font=('Consolas', 12, 'bold')))
+		self._hud_stats = ''
+
+	def update(self, dt, inputs):
+		world = self.world
+		if world.game_over:
 			return
-		start = time.time()
-		self._apply_physics()
-		self._draw()
-		elapsed = time.time() - start
-		delay = max(1, int((self.dt - elapsed) * 1000))
-		# schedule next frame
-		self.root.after(delay, self._loop)
+		step_inputs = Inputs(left=inputs.active('left'), right=inputs.active('right'))
+		alive = world.step(dt, step_inputs)
+		# ball: only its coords change (interpolated between the last two steps)
+		self.ball.move_to(world.ball.x, world.ball.y)
+		if not alive:
+			self.entities.add(Entity('game_over', 'text', self.app.width // 2, self.app.height // 2,
+									 text='GAME OVER', fill='white', font=('Consolas', 36, 'bold')))
+
+	def render(self, alpha):
+		# HUD (itemconfig only when the text changes; frame stats refresh twice a second)
+		scheduler = self.app.scheduler
+		if scheduler.renders % 30 == 0:
+			st = scheduler.stats()
+			self._hud_stats = f"  {st['fps']:.0f} fps  {st['worst_frame_ms']:.1f} ms worst"
+		b = self.world.ball
+		self.hud.set(text=f"vx={b.vx:.1f} px/s  vy={b.vy:.1f} px/s  bounce_h={self.world.bounce_height:.0f}px{self._hud_stats}")
+
+	def is_idle(self):
+		# the loop stops after game over
+		return self.world.game_over
+
+
+def _box_entity(key, box, **options):
+	return Entity(key, 'rect', (box.x1 + box.x2) / 2, (box.y1 + box.y2) / 2, box.x2 - box.x1, box.y2 - box.y1, **options)
+
+
+def _headless_main(steps):
+	world = World(800, 600)
+	world.create_default_terrain()
+	start = time.perf_counter()
+	done = run_headless(world, steps)
+	elapsed = time.perf_counter() - start
+	b = world.ball
+	print(f"{done} steps in {elapsed:.3f}s ({done / elapsed:.0f} steps/s), sim time {world.time:.1f}s")
+	print(f"ball x={b.x:.1f} y={b.y:.1f} vx={b.vx:.1f} vy={b.vy:.1f} game_over={world.game_over}")
+
+
+def _bench_main(steps):
+	# per-step cost vs level size, with and without the broad phase
+	print(f"{'platforms':>10} {'grid us/step':>13} {'scan us/step':>13}")
+	for count in (10, 100, 1000, 10000):
+		results = []
+		for use_broadphase in (True, False):
+			world = generate_level(count)
+			world.use_broadphase = use_broadphase
+			world.rebuild_broadphase()
+			world.ball.x = 150
+			hold_right = Inputs(right=True)
+			start = time.perf_counter()
+			done = run_headless(world, steps, input_fn=lambda i, w: hold_right)
+			results.append((time.perf_counter() - start) / done * 1e6)
+		print(f"{count:>10} {results[0]:>13.2f} {results[1]:>13.2f}")
+
+
+def _drop_hits(x, vx, fps, ccd):
+	# one ball shot down at a short 4px platform along a straight line
+	# (no gravity, so every tick rate follows the same path): does it stop on it?
+	world = World(800, 600)
+	world.platforms.append(Platform(380, 400, 420, 404))
+	world.g = 0.0  # also makes the bounce velocity 0: a hit leaves the ball resting on top
+	world.ccd = ccd
+	world.ball.x = x
+	world.ball.vx = vx
+	world.ball.vy = 900.0
+	dt = 1.0 / fps
+	for _ in range(int(fps * 0.6)):
+		world.step(dt)
+	return world.ball.y < 400
+
+
+def _tunnel_main(trials):
+	# straight-line shots at a thin platform, each tick rate vs a 1000 Hz swept reference
+	rng = random.Random(1)
+	drops = [(rng.uniform(340, 460), rng.uniform(-400, 400)) for _ in range(trials)]
+	reference = [_drop_hits(x, vx, 1000, True) for x, vx in drops]
+	print(f"{sum(reference)} of {trials} drops hit the platform at 1000 Hz")
+	print(f"{'tick rate':>9} {'discrete':>17} {'ccd':>17}")
+	print(f"{'':>9} {'missed / phantom':>17} {'missed / phantom':>17}")
+	for fps in (60, 20, 10, 5):
+		cols = []
+		for ccd in (False, True):
+			result = [_drop_hits(x, vx, fps, ccd) for x, vx in drops]
+			missed = sum(1 for ref, got in zip(reference, result) if ref and not got)
+			phantom = sum(1 for ref, got in zip(reference, result) if got and not ref)
+			cols.append(f"{missed:>8} / {phantom:<6}")
+		print(f"{fps:>6} Hz {cols[0]:>17} {cols[1]:>17}")
 
 
 if __name__ == '__main__':
-	game = Game(800, 600)
-	game.start()
-
+	if len(sys.argv) > 2 and sys.argv[1] == '--headless':
+		# python BounceBall.py --headless 100000
+		_headless_main(int(sys.argv[2]))
+	elif len(sys.argv) > 2 and sys.argv[1] == '--bench':
+		# python BounceBall.py --bench 5000
+		_bench_main(int(sys.argv[2]))
+	elif len(sys.argv) > 2 and sys.argv[1] == '--tunnel':
+		# python BounceBall.py --tunnel 2000
+		_tunnel_main(int(sys.argv[2]))
+	else:
+		app = GameApp(800, 600, "Bounce Ball - Tkinter", bg="light sky blue")
+		app.run(BounceBallScene())
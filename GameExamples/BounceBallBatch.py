@@ -0,0 +1,167 @@
+# Batched BounceBall simulation for AI/parameter sweeps (needs numpy; BounceBall.py itself does not)
+import sys
+import time
+
+import numpy as np
+
+from BounceBall import World
+
+
+class BatchWorld:
+	"""Many independent balls in one level, stepped together with NumPy.
+
+	Ball state (x, y, vx, vy) lives in arrays of length n, and so do the
+	tuning parameters (g, bounce_height, acc), so a whole parameter sweep
+	runs as one batch. Platforms are resolved one after another like
+	World.step, but each test covers every ball at once; the result for
+	ball i is the same as running World.step on that ball alone.
+	"""
+	def __init__(self, world, n):
+		self.width = world.width
+		self.height = world.height
+		self.n = n
+		self.max_vx = 400.0
+		self.r = float(world.ball.r)
+
+		self.x = np.full(n, float(world.ball.x))
+		self.y = np.full(n, float(world.ball.y))
+		self.vx = np.zeros(n)
+		self.vy = np.zeros(n)
+		self.alive = np.ones(n, dtype=bool)
+
+		# per-ball parameters (assign arrays for sweeps)
+		self.g = np.full(n, world.g)
+		self.bounce_height = np.full(n, world.bounce_height)
+		self.acc = np.full(n, world.acc)
+
+		self.platforms = [(p.x1, p.y1, p.x2, p.y2) for p in world.platforms]
+		self.obstacles = [(o.x1, o.y1, o.x2, o.y2) for o in world.obstacles]
+		self.time = 0.0
+
+	def step(self, dt, left=None, right=None):
+		"""Advance all live balls by dt. left/right: bool arrays of length n (or None)."""
+		self.time += dt
+		a = self.alive
+		all_alive = bool(a.all())
+		sel = slice(None) if all_alive else a
+		r = self.r
+		x, y, vx, vy = self.x[sel], self.y[sel], self.vx[sel], self.vy[sel]
+		g = self.g[sel]
+		if all_alive:
+			x, y, vx, vy = x.copy(), y.copy(), vx.copy(), vy.copy()
+
+		# horizontal input
+		ax = np.zeros(len(x))
+		if left is not None or right is not None:
+			lft = np.zeros(self.n, dtype=bool) if left is None else np.asarray(left, dtype=bool)
+			rgt = np.zeros(self.n, dtype=bool) if right is None else np.asarray(right, dtype=bool)
+			lft, rgt = lft[sel], rgt[sel]
+			acc = self.acc[sel]
+			ax = np.where(lft & ~rgt, -acc, np.where(rgt & ~lft, acc, 0.0))
+		vx += ax * dt
+		np.clip(vx, -self.max_vx, self.max_vx, out=vx)
+
+		prev_left, prev_right = x - r, x + r
+		prev_top, prev_bottom = y - r, y + r
+
+		vy += g * dt
+		x += vx * dt
+		y += vy * dt
+
+		cur_left, cur_right = x - r, x + r
+		cur_top, cur_bottom = y - r, y + r
+
+		# world bounds: left/right
+		hit = cur_left < 0
+		x[hit] = r
+		vx[hit] = 0
+		hit = x + r > self.width
+		x[hit] = self.width - r
+		vx[hit] = 0
+
+		# platforms, in order, each test vectorized over all balls
+		v_bounce = np.sqrt(2 * g * self.bounce_height[sel])
+		for p_left, p_top, p_right, p_bottom in self.platforms:
+			h_overlap = (cur_right >= p_left) & (cur_left <= p_right)
+			top = (prev_bottom <= p_top) & (cur_bottom >= p_top) & (vy > 0) & h_overlap
+			bottom = ~top & (prev_top >= p_bottom) & (cur_top <= p_bottom) & (vy < 0) & h_overlap
+			vertical_overlap = ~top & ~bottom & (cur_bottom > p_top) & (cur_top < p_bottom)
+			side_left = vertical_overlap & (prev_right <= p_left) & (cur_right >= p_left) & (vx > 0)
+			side_right = vertical_overlap & ~side_left & (prev_left >= p_right) & (cur_left <= p_right) & (vx < 0)
+
+			if top.any():
+				y[top] = p_top - r
+				vy[top] = -v_bounce[top]
+				vx[top] *= 0.98
+			if bottom.any():
+				y[bottom] = p_bottom + r
+				vy[bottom] = -vy[bottom] * 0.9
+			if side_left.any():
+				x[side_left] = p_left - r
+				vx[side_left] = 0
+			if side_right.any():
+				x[side_right] = p_right + r
+				vx[side_right] = 0
+
+		# obstacles: closest point on each box to the ball center
+		dead = np.zeros(len(x), dtype=bool)
+		r2 = r * r
+		for o_left, o_top, o_right, o_bottom in self.obstacles:
+			dx = x - np.clip(x, o_left, o_right)
+			dy = y - np.clip(y, o_top, o_bottom)
+			dead |= (dx * dx + dy * dy) <= r2
+
+		self.x[sel], self.y[sel], self.vx[sel], self.vy[sel] = x, y, vx, vy
+		if dead.any():
+			if all_alive:
+				self.alive[dead] = False
+			else:
+				idx = np.flatnonzero(a)
+				self.alive[idx[dead]] = False
+		return int(self.alive.sum())
+
+
+def run_batch(batch, steps, dt=1.0 / 60, policy=None):
+	"""Step the batch; policy(step_index, batch) -> (left, right) bool arrays."""
+	for i in range(steps):
+		left, right = policy(i, batch) if policy else (None, None)
+		if batch.step(dt, left, right) == 0:
+			return i + 1
+	return steps
+
+
+def _sweep_main(n, steps):
+	# random hold-left/hold-right policies over a sweep of horizontal acceleration
+	world = World(800, 600)
+	world.create_default_terrain()
+	batch = BatchWorld(world, n)
+	batch.acc = np.linspace(600.0, 3000.0, n)
+	rng = np.random.default_rng(0)
+	switch_every = rng.integers(30, 240, n)
+	direction = rng.integers(0, 2, n).astype(bool)
+
+	def policy(i, b):
+		flip = (i // switch_every) % 2 == 1
+		go_right = direction ^ flip
+		return ~go_right, go_right
+
+	start = time.perf_counter()
+	done = run_batch(batch, steps, policy=policy)
+	elapsed = time.perf_counter() - start
+	print(f"{n} balls x {done} steps in {elapsed:.3f}s "
+		  f"({elapsed / done * 1000:.2f} ms/step, {n * done / elapsed:.0f} ball-steps/s)")
+	print(f"survived: {int(batch.alive.sum())}/{n}")
+
+	# survival by acceleration band
+	bands = 5
+	for k in range(bands):
+		part = slice(k * n // bands, (k + 1) * n // bands)
+		print(f"  acc {batch.acc[part][0]:6.0f}..{batch.acc[part][-1]:6.0f}: "
+			  f"{batch.alive[part].mean() * 100:5.1f}% alive")
+
+
+if __name__ == '__main__':
+	# python BounceBallBatch.py [balls] [steps]
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	steps = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+	_sweep_main(n, steps)
@@ -0,0 +1,143 @@
+import math
+import time
+from collections import deque
+
+
+class FrameScheduler:
+	"""Fixed-step game loop driven by Tk's after(), paced by absolute deadlines.
+
+	update(dt) runs at update_hz with a constant dt; render(alpha) runs at
+	most fps times per second, where alpha in [0, 1] is how far the clock is
+	between the last update and the next one (for interpolating positions).
+	Deadlines advance by whole steps from the start time, so late wakeups
+	never accumulate into drift. When the loop falls behind, renders are
+	skipped (at most max_skip in a row) so updates can catch up, and if it is
+	more than max_updates steps behind the backlog is dropped.
+
+	If is_idle() returns True after a frame, the loop schedules nothing and
+	costs no CPU until wake() is called (e.g. from an input event or timer).
+	"""
+	def __init__(self, root, update, render, fps=60, update_hz=None, max_updates=5, max_skip=4,
+				 clock=time.perf_counter, is_idle=None):
+		self.root = root
+		self.update = update
+		self.render = render
+		self.step = 1.0 / (update_hz or fps)
+		self.frame_time = 1.0 / fps
+		self.max_updates = max_updates
+		self.max_skip = max_skip
+		self.clock = clock
+		self.is_idle = is_idle
+
+		self.running = False
+		self.sleeping = False
+		self._after_id = None
+		self._next_update = 0.0
+		self._next_render = 0.0
+		self._skipped = 0
+
+		# stats
+		self.updates = 0
+		self.renders = 0
+		self.skipped_renders = 0
+		self.dropped_updates = 0
+		self._render_times = deque(maxlen=max(2, int(fps)))
+		self._busy = deque(maxlen=max(2, int(fps)))
+
+	def start(self):
+		if self.running:
+			return
+		self.running = True
+		now = self.clock()
+		self._next_update = now + self.step
+		self._next_render = now
+		self._tick()
+
+	def stop(self):
+		self.running = False
+		self.sleeping = False
+		if self._after_id is not None:
+			self.root.after_cancel(self._after_id)
+			self._after_id = None
+
+	def wake(self):
+		"""Resume a loop that went idle; the first update runs right away."""
+		if not self.running or not self.sleeping:
+			return
+		self.sleeping = False
+		now = self.clock()
+		self._next_update = now
+		self._next_render = now
+		self._render_times.clear()
+		self._after_id = self.root.after(0, self._tick)
+
+	def _tick(self):
+		self._after_id = None
+		if not self.running:
+			return
+		now = self.clock()
+
+		# fixed-step updates up to now
+		n = 0
+		dropped = False
+		while self._next_update <= now and self.running:
+			if n == self.max_updates:
+				# too far behind: drop the backlog instead of spiralling
+				behind = int((now - self._next_update) / self.step) + 1
+				self.dropped_updates += behind
+				self._next_update += behind * self.step
+				dropped = True
+				break
+			self.update(self.step)
+			self._next_update += self.step
+			n += 1
+		self.updates += n
+
+		if not self.running:
+			# stopped from update() (the window may already be gone)
+			return
+
+		if self._next_render <= now:
+			t = self.clock()
+			if t >= self._next_update and self._skipped < self.max_skip and not dropped:
+				# already late for the next update: skip this render so it can catch up
+				self._skipped += 1
+				self.skipped_renders += 1
+			else:
+				alpha = 1.0 - (self._next_update - t) / self.step
+				self._render(min(1.0, max(0.0, alpha)))
+			self._next_render += self.frame_time
+			if self._next_render <= now:
+				self._next_render = now + self.frame_time
+		self._busy.append(self.clock() - now)
+
+		if self.is_idle is not None and self.is_idle():
+			self.sleeping = True
+			return
+
+		# sleep until the next deadline (ceil: waking early would only spin)
+		wake = min(self._next_update, self._next_render)
+		delay = max(0, math.ceil((wake - self.clock()) * 1000))
+		self._after_id = self.root.after(delay, self._tick)
+
+	def _render(self, alpha):
+		self.render(alpha)
+		self.renders += 1
+		self._skipped = 0
+		self._render_times.append(self.clock())
+
+	def stats(self):
+		"""Achieved FPS and frame times (ms) over the last ~second of renders."""
+		times = self._render_times
+		intervals = [b - a for a, b in zip(times, list(times)[1:])]
+		span = times[-1] - times[0] if len(times) > 1 else 0.0
+		return {
+			'fps': (len(times) - 1) / span if span > 0 else 0.0,
+			'frame_ms': span / len(intervals) * 1000 if intervals else 0.0,
+			'worst_frame_ms': max(intervals) * 1000 if intervals else 0.0,
+			'busy_ms': sum(self._busy) / len(self._busy) * 1000 if self._busy else 0.0,
+			'updates': self.updates,
+			'renders': self.renders,
+			'skipped_renders': self.skipped_renders,
+			'dropped_updates': self.dropped_updates,
+		}
@@ -1,44 +1,37 @@
-import tkinter as tk
+from TkGame import Entity, GameApp, Scene
 
 # 프레임 속도 설정 (초당 60 프레임)
 FPS = 60
-FRAME_DELAY = int(1000 / FPS)  # 한 프레임당 지연 시간 (밀리초)
+WIDTH, HEIGHT = 1280, 720
 
-# Tk 객체 생성
-root = tk.Tk()
-root.title("Simple Game Loop")
 
-# 캔버스 생성 (게임 화면)
-canvas = tk.Canvas(root, width=1280, height=720, bg="black")
-canvas.pack()
+# 공: 속도가 있는 엔티티는 매 스텝 자동으로 이동한다 (step 재정의로 벽 충돌 처리)
+class BouncingBall(Entity):
+    def step(self, dt):
+        super().step(dt)
 
-# 게임 상태 변수
-x, y = 200, 150  # 공의 초기 위치
-dx, dy = 15, 15    # 공의 이동 속도
+        # 벽 충돌 처리
+        if self.x <= 0 or self.x >= WIDTH:
+            self.vx = -self.vx
+        if self.y <= 0 or self.y >= HEIGHT:
+            self.vy = -self.vy
 
-# 게임 업데이트 함수
-def update_game():
-    global x, y, dx, dy
 
-    # 공 이동
-    x += dx
-    y += dy
+# 게임 화면 (씬)
+class MainScene(Scene):
+    def enter(self):
+        # 엔티티는 한 번만 만들고, 바뀐 것만 다시 그린다
+        self.entities.add(BouncingBall("ball", "oval", 200, 150, 20, 20,
+                                       vx=15 * FPS, vy=15 * FPS, fill="white"))  # 픽셀/초
+        self.fps_text = self.entities.add(Entity("fps", "text", 10, 10, anchor="nw", fill="white", text=""))
 
-    # 벽 충돌 처리
-    if x <= 0 or x >= 1280:
-        dx = -dx
-    if y <= 0 or y >= 720:
-        dy = -dy
+    # 화면 갱신 직전에 호출 (alpha: 직전 스텝과 현재 스텝 사이의 위치, 0~1)
+    def render(self, alpha):
+        # 실제 프레임 속도 표시
+        stats = self.app.scheduler.stats()
+        self.fps_text.set(text=f"{stats['fps']:.0f} fps / {stats['frame_ms']:.1f} ms")
 
-    # 화면 갱신
-    canvas.delete("all")  # 이전 프레임 지우기
-    canvas.create_oval(x-10, y-10, x+10, y+10, fill="white")  # 공 그리기
 
-    # 다음 프레임 예약
-    root.after(FRAME_DELAY, update_game)
-
-# 게임 루프 시작
-update_game()
-
-# 메인 루프 실행
-root.mainloop()
\ No newline at end of file
+# 게임 창 생성 후 게임 루프 실행 (절대 시각 기준 프레임 스케줄러)
+app = GameApp(WIDTH, HEIGHT, "Simple Game Loop", bg="black", fps=FPS)
+app.run(MainScene())
@@ -0,0 +1,276 @@
+import tkinter as tk
+
+from FrameScheduler import FrameScheduler
+from TkInput import InputTracker
+
+
+class RetainedCanvas:
+	"""Retained-mode layer over a tk.Canvas.
+
+	Each drawable is identified by a key and its canvas item is created once.
+	Later calls only touch Tk when the coords or options actually changed, so
+	static scenery costs nothing per frame and moving objects cost one
+	canvas.coords call.
+	"""
+	def __init__(self, canvas):
+		self.canvas = canvas
+		self._items = {}  # key -> [item_id, coords, options]
+
+	def _sync(self, kind, key, coords, options):
+		entry = self._items.get(key)
+		if entry is None:
+			create = getattr(self.canvas, 'create_' + kind)
+			self._items[key] = [create(*coords, **options), coords, options]
+			return
+		item_id, old_coords, old_options = entry
+		if coords != old_coords:
+			self.canvas.coords(item_id, *coords)
+			entry[1] = coords
+		if options != old_options:
+			changed = {k: v for k, v in options.items() if old_options.get(k) != v}
+			self.canvas.itemconfig(item_id, **changed)
+			entry[2] = options
+
+	def rect(self, key, x1, y1, x2, y2, **options):
+		self._sync('rectangle', key, (x1, y1, x2, y2), options)
+
+	def oval(self, key, x1, y1, x2, y2, **options):
+		self._sync('oval', key, (x1, y1, x2, y2), options)
+
+	def text(self, key, x, y, **options):
+		self._sync('text', key, (x, y), options)
+
+	def remove(self, key):
+		entry = self._items.pop(key, None)
+		if entry is not None:
+			self.canvas.delete(entry[0])
+
+	def clear(self):
+		self.canvas.delete('all')
+		self._items.clear()
+
+
+class Entity:
+	"""A shape on the canvas with a position and a velocity.
+
+	kind is 'rect', 'oval' or 'text'; (x, y) is the centre of a w x h
+	rect/oval, or the anchor point of a text. Change state through
+	move_to()/set() so the registry knows what to redraw. Entities with a
+	velocity (or active = True) are stepped every update; override step()
+	for custom motion.
+	"""
+	active = False
+
+	def __init__(self, key, kind, x, y, w=0, h=0, vx=0.0, vy=0.0, **options):
+		self.key = key
+		self.kind = kind
+		self.x = self.prev_x = x
+		self.y = self.prev_y = y
+		self.w = w
+		self.h = h
+		self.vx = vx
+		self.vy = vy
+		self.options = options
+		self.registry = None
+
+	@property
+	def moving(self):
+		return bool(self.active or self.vx or self.vy)
+
+	def step(self, dt):
+		self.move_to(self.x + self.vx * dt, self.y + self.vy * dt)
+
+	def move_to(self, x, y):
+		"""Move, drawing the way there interpolated over the next frame."""
+		self.prev_x, self.prev_y = self.x, self.y
+		self.x, self.y = x, y
+		self._changed()
+
+	def set(self, **changes):
+		"""Update attributes (x, y, w, h, vx, vy) or canvas options; x/y jump without interpolation."""
+		for name, value in changes.items():
+			if name in ('x', 'y', 'w', 'h', 'vx', 'vy'):
+				setattr(self, name, value)
+			else:
+				self.options = dict(self.options, **{name: value})
+		if 'x' in changes:
+			self.prev_x = self.x
+		if 'y' in changes:
+			self.prev_y = self.y
+		self._changed()
+
+	def _changed(self):
+		if self.registry is not None:
+			self.registry.touch(self)
+
+	def coords(self, alpha=1.0):
+		x = self.prev_x + (self.x - self.prev_x) * alpha
+		y = self.prev_y + (self.y - self.prev_y) * alpha
+		if self.kind == 'text':
+			return (x, y)
+		hw = self.w / 2
+		hh = self.h / 2
+		return (x - hw, y - hh, x + hw, y + hh)
+
+	def contains(self, x, y):
+		return abs(x - self.x) <= self.w / 2 and abs(y - self.y) <= self.h / 2
+
+
+class EntityRegistry:
+	"""Entities of one scene, drawn through a RetainedCanvas.
+
+	Moving entities are stepped together once per update and only entities
+	that changed are redrawn in the frame, so a scene where nothing moves
+	does no work at all (idle).
+	"""
+	def __init__(self, view):
+		self.view = view
+		self.entities = {}  # key -> Entity
+		self.moving = {}
+		self.dirty = {}
+		self.in_transit = {}  # moved this step: drawn interpolated
+
+	def __getitem__(self, key):
+		return self.entities[key]
+
+	def __contains__(self, key):
+		return key in self.entities
+
+	def __iter__(self):
+		return iter(self.entities.values())
+
+	def add(self, entity):
+		self.remove(entity.key)
+		entity.registry = self
+		self.entities[entity.key] = entity
+		self.touch(entity)
+		return entity
+
+	def remove(self, key):
+		entity = self.entities.pop(key, None)
+		if entity is not None:
+			entity.registry = None
+			self.moving.pop(key, None)
+			self.dirty.pop(key, None)
+			self.in_transit.pop(key, None)
+			self.view.remove(key)
+
+	def touch(self, entity):
+		self.dirty[entity.key] = entity
+		if entity.x != entity.prev_x or entity.y != entity.prev_y:
+			self.in_transit[entity.key] = entity
+		if entity.moving:
+			self.moving[entity.key] = entity
+		else:
+			self.moving.pop(entity.key, None)
+
+	@property
+	def idle(self):
+		return not self.moving and not self.dirty and not self.in_transit
+
+	def settle(self):
+		"""Start of an update step: last step's moves become the new start points."""
+		for entity in self.in_transit.values():
+			entity.prev_x, entity.prev_y = entity.x, entity.y
+			self.dirty[entity.key] = entity
+		self.in_transit.clear()
+
+	def step(self, dt):
+		for entity in list(self.moving.values()):
+			entity.step(dt)
+			if not entity.moving:
+				self.moving.pop(entity.key, None)
+
+	def flush(self, alpha=1.0):
+		"""Draw changed entities; ones still in transit are redrawn next frame."""
+		draw = {'rect': self.view.rect, 'oval': self.view.oval, 'text': self.view.text}
+		for key, entity in self.dirty.items():
+			draw[entity.kind](key, *entity.coords(alpha), **entity.options)
+		self.dirty = dict(self.in_transit)
+
+
+class Scene:
+	"""One screen of a game (title, level, game over ...).
+
+	The app calls enter() when the scene becomes current, update(dt, inputs)
+	at a fixed step, render(alpha) before its entities are drawn and exit()
+	when it is replaced. While is_idle() is True and no entity moves, the
+	loop sleeps until input arrives or a timer from app.after() fires.
+	"""
+	def __init__(self):
+		self.app = None
+		self.entities = None
+
+	def enter(self):
+		pass
+
+	def exit(self):
+		pass
+
+	def update(self, dt, inputs):
+		pass
+
+	def render(self, alpha):
+		pass
+
+	def is_idle(self):
+		return True
+
+
+class GameApp:
+	"""Tk window + canvas running one Scene at a time on a FrameScheduler."""
+	def __init__(self, width=800, height=600, title="Game", bg="black", fps=60):
+		self.width = width
+		self.height = height
+		self.root = tk.Tk()
+		self.root.title(title)
+		self.canvas = tk.Canvas(self.root, width=width, height=height, bg=bg)
+		self.canvas.pack()
+		self.view = RetainedCanvas(self.canvas)
+		self.input = InputTracker(self.root, self.canvas, on_event=self.wake)
+		self.scheduler = FrameScheduler(self.root, self._update, self._render, fps=fps, is_idle=self._idle)
+		self.scene = None
+
+	def run(self, scene):
+		self.switch(scene)
+		self.scheduler.start()
+		self.root.mainloop()
+
+	def switch(self, scene):
+		if self.scene is not None:
+			self.scene.exit()
+		self.view.clear()
+		scene.app = self
+		scene.entities = EntityRegistry(self.view)
+		self.scene = scene
+		scene.enter()
+		self.wake()
+
+	def after(self, ms, callback):
+		"""Tk timer that also wakes the loop, for scenes that sleep while idle."""
+		def fire():
+			callback()
+			self.wake()
+		return self.root.after(ms, fire)
+
+	def wake(self):
+		self.scheduler.wake()
+
+	def quit(self):
+		self.scheduler.stop()
+		self.root.destroy()
+
+	def _update(self, dt):
+		scene = self.scene
+		scene.entities.settle()
+		scene.update(dt, self.input.poll())
+		if scene is self.scene:
+			scene.entities.step(dt)
+
+	def _render(self, alpha):
+		self.scene.render(alpha)
+		self.scene.entities.flush(alpha)
+
+	def _idle(self):
+		scene = self.scene
+		return scene.is_idle() and scene.entities.idle and not self.input.pending
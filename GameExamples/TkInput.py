@@ -0,0 +1,132 @@
+import time
+
+
+class InputFrame:
+	"""Input state for one update step: held keys plus this step's edges and clicks."""
+	def __init__(self, down=frozenset(), pressed=(), released=(), clicks=(), bindings=None):
+		self.down = down  # keysyms held down
+		self.pressed = pressed  # keysyms pressed since the last frame
+		self.released = released
+		self.clicks = clicks  # (x, y) canvas clicks since the last frame
+		self.bindings = bindings or {}  # action -> keysyms
+
+	def is_down(self, key):
+		return key in self.down
+
+	def active(self, action):
+		"""True while any key bound to the action is held."""
+		return any(key in self.down for key in self.bindings.get(action, ()))
+
+	def triggered(self, action):
+		"""True if a key bound to the action went down during this frame."""
+		return any(key in self.pressed for key in self.bindings.get(action, ()))
+
+
+class InputTracker:
+	"""Collects Tk key and mouse events between frames.
+
+	Event handlers only record what happened; the game reads it once per
+	update step through poll(), which returns an InputFrame and clears the
+	edges (a second poll in the same tick sees the held keys only).
+	on_event() is called for every recorded event so a sleeping game loop
+	can be woken up.
+
+	Held keys auto-repeat as release/press pairs on X11. A release is only
+	committed by poll() once release_delay seconds have passed without the
+	key being pressed again (a Tk timer wakes the loop for that), so repeats
+	never show up as edges and never wake the loop. Keys can be grouped into
+	named actions with bind().
+	"""
+	def __init__(self, root, canvas=None, on_event=None, release_delay=0.03, clock=time.perf_counter):
+		self.root = root
+		self.on_event = on_event
+		self.release_delay = release_delay
+		self.clock = clock
+		self.down = set()
+		self.bindings = {}  # action -> tuple of keysyms
+		self.repeats_suppressed = 0
+		self._pressed = []
+		self._released = []
+		self._pending_release = {}  # keysym -> time the release arrived
+		self._release_timer = None
+		self._clicks = []
+		root.bind('<KeyPress>', self._on_press, add='+')
+		root.bind('<KeyRelease>', self._on_release, add='+')
+		root.bind('<FocusOut>', self._on_focus_out, add='+')
+		if canvas is not None:
+			canvas.bind('<Button-1>', self._on_click, add='+')
+
+	def bind(self, action, *keys):
+		"""Bind an action to keysyms (replaces the previous binding)."""
+		self.bindings[action] = tuple(_normalize(key) for key in keys)
+
+	def unbind(self, action):
+		self.bindings.pop(action, None)
+
+	@property
+	def pending(self):
+		"""True if events arrived since the last poll()."""
+		return bool(self._pressed or self._released or self._clicks)
+
+	def _notify(self):
+		if self.on_event is not None:
+			self.on_event()
+
+	def _on_press(self, event):
+		key = _normalize(event.keysym)
+		if self._pending_release.pop(key, None) is not None or key in self.down:
+			# auto-repeat: the key never really went up
+			self.repeats_suppressed += 1
+			return
+		self.down.add(key)
+		self._pressed.append(key)
+		self._notify()
+
+	def _on_release(self, event):
+		key = _normalize(event.keysym)
+		if key in self.down and key not in self._pending_release:
+			self._pending_release[key] = self.clock()
+			if self._release_timer is None:
+				self._release_timer = self.root.after(int(self.release_delay * 1000) + 1, self._release_due)
+
+	def _release_due(self):
+		self._release_timer = None
+		if not self._pending_release:
+			return
+		wait = min(self._pending_release.values()) + self.release_delay - self.clock()
+		if wait > 0:
+			self._release_timer = self.root.after(int(wait * 1000) + 1, self._release_due)
+		else:
+			self._notify()
+
+	def _on_focus_out(self, event):
+		# releases that happen while another window has focus never arrive
+		if self.down:
+			self._released.extend(self.down)
+			self.down.clear()
+			self._pending_release.clear()
+			self._notify()
+
+	def _on_click(self, event):
+		self._clicks.append((event.x, event.y))
+		self._notify()
+
+	def poll(self):
+		if self._pending_release:
+			deadline = self.clock() - self.release_delay
+			for key, t in list(self._pending_release.items()):
+				if t <= deadline:
+					del self._pending_release[key]
+					self.down.discard(key)
+					self._released.append(key)
+		frame = InputFrame(frozenset(self.down), tuple(self._pressed), tuple(self._released), tuple(self._clicks),
+						   self.bindings)
+		self._pressed.clear()
+		self._released.clear()
+		self._clicks.clear()
+		return frame
+
+
+def _normalize(keysym):
+	# 'A' (with Shift) and 'a' are the same key; a release may arrive as either
+	return keysym.lower() if len(keysym) == 1 else keysym
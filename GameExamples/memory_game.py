@@ -1,119 +1,103 @@
-import tkinter as tk
 from random import choice
 
-root = tk.Tk()
-buttons = [[None for _ in range(3)] for _ in range(3)]
+from TkGame import Entity, GameApp, Scene
 
-# 중앙 라벨: 시퀀스를 색으로 보여줄 영역
-label1 = tk.Label(
-    root,
-    width=14,
-    height=7,
-    bg="white",
-    fg="white",
-    relief="flat",
-    font=("Arial", 12),
-)
+CELL = 150  # 칸 크기 (픽셀)
 
 colors = ["red", "blue", "green", "yellow", "orange", "pink", "brown", "gray"]
-color_index = 0
-memory_color = []
-input_index = 0
-is_waiting_for_input = False
-
-
-def start_next_round():
-    # 라운드마다 색 하나 추가 후 표시 시작
-    new_color = choice(colors)
-    memory_color.append(new_color)
-    set_buttons_state(False)
-    show_sequence(0)
-
-
-def show_sequence(index=0):
-    # 라벨 배경색을 번갈아 바꿔 시퀀스를 보여줌
-    if index < len(memory_color):
-        label1.config(bg=memory_color[index])
-        root.after(
-            350,
-            lambda: (
-                label1.config(bg="white"),
-                root.after(100, lambda: show_sequence(index + 1)),
-            ),
-        )
-    else:
-        global is_waiting_for_input, input_index
-        label1.config(bg="white")
-        # 표시가 끝나면 입력 단계로 전환
-        set_buttons_state(True)
-        is_waiting_for_input = True
-        input_index = 0
-
-
-def reset_game():
-    global memory_color, is_waiting_for_input, input_index
-    memory_color = []
-    is_waiting_for_input = False
-    input_index = 0
-    root.after(500, start_next_round)
-
 
-def button_click(color):
-    global input_index, is_waiting_for_input
-    # 시퀀스 표시 중에는 입력 무시
-    if not is_waiting_for_input:
-        return
-    # 현재 기대하는 색과 비교
-    expected_color = memory_color[input_index]
-    if color == expected_color:
-        input_index += 1
-        if input_index == len(memory_color):
-            # 전부 맞히면 다음 라운드로 진행
-            is_waiting_for_input = False
-            set_buttons_state(False)
-            root.after(100, start_next_round)
-    else:
-        # 오답이면 종료
-        is_waiting_for_input = False
-        root.destroy()
 
-
-for row in range(3):
-    for col in range(3):
-        if row == 1 and col == 1:
-            label1.grid(row=row, column=col)
-            buttons[row][col] = label1
-        else:
-            current_color = colors[color_index % len(colors)]
-            btn = tk.Button(
-                root,
-                width=14,
-                height=7,
-                bg=current_color,
-                activebackground=current_color,
-                font=("Arial", 12),
-                command=lambda color=current_color: button_click(color),
+class MemoryScene(Scene):
+    # 입력이나 타이머가 없을 때는 게임 루프가 완전히 쉰다 (is_idle 기본값 True)
+
+    def enter(self):
+        self.memory_color = []
+        self.input_index = 0
+        self.is_waiting_for_input = False
+
+        # 3x3 칸: 가운데는 시퀀스를 색으로 보여줄 영역, 나머지는 색 버튼
+        self.buttons = []
+        color_index = 0
+        for row in range(3):
+            for col in range(3):
+                x = col * CELL + CELL // 2
+                y = row * CELL + CELL // 2
+                if row == 1 and col == 1:
+                    self.label = self.entities.add(
+                        Entity("label", "rect", x, y, CELL - 4, CELL - 4, fill="white", outline="")
+                    )
+                else:
+                    current_color = colors[color_index % len(colors)]
+                    btn = Entity(("button", current_color), "rect", x, y, CELL - 4, CELL - 4,
+                                 fill=current_color, outline="black")
+                    btn.color = current_color
+                    self.buttons.append(self.entities.add(btn))
+                    color_index += 1
+        self.set_buttons_state(False)
+        self.app.after(300, self.start_next_round)
+
+    def start_next_round(self):
+        # 라운드마다 색 하나 추가 후 표시 시작
+        new_color = choice(colors)
+        self.memory_color.append(new_color)
+        self.set_buttons_state(False)
+        self.show_sequence(0)
+
+    def show_sequence(self, index=0):
+        # 라벨 배경색을 번갈아 바꿔 시퀀스를 보여줌
+        if index < len(self.memory_color):
+            self.label.set(fill=self.memory_color[index])
+            self.app.after(
+                350,
+                lambda: (
+                    self.label.set(fill="white"),
+                    self.app.after(100, lambda: self.show_sequence(index + 1)),
+                ),
             )
-            btn.grid(row=row, column=col)
-            btn.config(state=tk.DISABLED)
-            buttons[row][col] = btn
-            color_index += 1
-
-
-def set_buttons_state(is_enabled: bool) -> None:
-    state = tk.NORMAL if is_enabled else tk.DISABLED
-    for row_widgets in buttons:
-        for widget in row_widgets:
-            if isinstance(widget, tk.Button):
-                widget.config(state=state)
-
+        else:
+            self.label.set(fill="white")
+            # 표시가 끝나면 입력 단계로 전환
+            self.set_buttons_state(True)
+            self.is_waiting_for_input = True
+            self.input_index = 0
+
+    def update(self, dt, inputs):
+        # 클릭한 칸의 색을 입력으로 처리
+        for x, y in inputs.clicks:
+            for btn in self.buttons:
+                if btn.contains(x, y):
+                    self.button_click(btn.color)
+
+    def button_click(self, color):
+        # 시퀀스 표시 중에는 입력 무시
+        if not self.is_waiting_for_input:
+            return
+        # 현재 기대하는 색과 비교
+        expected_color = self.memory_color[self.input_index]
+        if color == expected_color:
+            self.input_index += 1
+            if self.input_index == len(self.memory_color):
+                # 전부 맞히면 다음 라운드로 진행
+                self.is_waiting_for_input = False
+                self.set_buttons_state(False)
+                self.app.after(100, self.start_next_round)
+        else:
+            # 오답이면 종료
+            self.is_waiting_for_input = False
+            self.app.quit()
 
-root.after(300, start_next_round)
+    def set_buttons_state(self, is_enabled: bool) -> None:
+        # 비활성 버튼은 흐리게 표시
+        stipple = "" if is_enabled else "gray50"
+        for btn in self.buttons:
+            btn.set(stipple=stipple)
 
 
-root.mainloop()
+scene = MemoryScene()
+app = GameApp(3 * CELL, 3 * CELL, "Memory Game", bg="white")
+app.run(scene)
 
 print(
-    f"""your score: {len(memory_color) - 1}
-last color: {" → ".join(memory_color)}"""
+    f"""your score: {len(scene.memory_color) - 1}
+last color: {" → ".join(scene.memory_color)}"""
 )